@@ -0,0 +1,184 @@
+"""
+Teste de carga da API de leitura (src/api_leitura.py).
+
+Grava um banco sintético, sobe a API em outro processo e dispara consultas de vários
+processos clientes ao mesmo tempo, cada um com uma conexão persistente. A mistura de
+consultas cobre todas as rotas: por número, último, intervalo, data, dezenas, Mega da
+Virada e revalidação com If-None-Match. O resultado sai em JSON, com a latência vista
+pelo cliente (p50, p95, p99 e máximo) por tipo de consulta.
+
+Uso:
+    python -m benchmarks.bench_api [--sorteios 3000] [--clientes 8] [--duracao 10] [--saida resultado.json]
+    python -m benchmarks.bench_api --url http://127.0.0.1:8080   # contra uma API já em execução
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks.bench_escrita_db import gerar_sorteios
+from src.database import DbSorteios, criar_engine
+
+
+def percentis(tempos):
+    """
+    :param tempos: Lista de durações em segundos.
+    :return: Dicionário com amostras, média, p50, p95, p99 e máximo em milissegundos.
+    """
+    ordenados = sorted(tempos)
+    quantidade = len(ordenados)
+
+    def percentil(q):
+        return 1000 * ordenados[min(quantidade - 1, int(quantidade * q))]
+
+    return {
+        "amostras": quantidade,
+        "media_ms": 1000 * sum(ordenados) / quantidade,
+        "p50_ms": percentil(0.5),
+        "p95_ms": percentil(0.95),
+        "p99_ms": percentil(0.99),
+        "max_ms": 1000 * ordenados[-1],
+    }
+
+
+def sortear_consulta(aleatorio, ultimo):
+    """
+    :return: Tupla (tipo, caminho) de uma consulta da mistura.
+    """
+    nr_sorteio = aleatorio.randint(1, ultimo)
+    tipo = aleatorio.choices(
+        ("numero", "ultimo", "intervalo", "data", "dezenas", "virada", "revalidacao"),
+        weights=(40, 15, 10, 10, 10, 5, 10),
+    )[0]
+    match tipo:
+        case "numero" | "revalidacao":
+            return tipo, f"/sorteios/{nr_sorteio}"
+        case "ultimo":
+            return tipo, "/sorteios/ultimo"
+        case "intervalo":
+            return tipo, f"/sorteios?inicio={nr_sorteio}&fim={nr_sorteio + 9}"
+        case "data":
+            ano = aleatorio.randint(1996, 2023)
+            return tipo, f"/sorteios?data_inicio={ano}-01-01&data_fim={ano}-01-31"
+        case "dezenas":
+            dezenas = aleatorio.sample(range(1, 61), 2)
+            return tipo, f"/sorteios?dezenas={dezenas[0]},{dezenas[1]}"
+        case "virada":
+            return tipo, "/sorteios?virada=1"
+
+
+def cliente(argumentos):
+    """
+    Dispara consultas em sequência por uma conexão persistente até o fim da duração.
+
+    :param argumentos: Tupla (url, duracao, semente).
+    :return: Dicionário tipo -> latências em segundos, e a quantidade de erros.
+    """
+    url, duracao, semente = argumentos
+    partes = urlsplit(url)
+    conexao = http.client.HTTPConnection(partes.hostname, partes.port)
+    conexao.request("GET", "/saude")
+    ultimo = json.loads(conexao.getresponse().read())["ultimo_sorteio"] or 1
+    aleatorio = random.Random(semente)
+    etags, tempos, erros = {}, {}, 0
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        tipo, caminho = sortear_consulta(aleatorio, ultimo)
+        cabecalhos = {"If-None-Match": etags[caminho]} if tipo == "revalidacao" and caminho in etags else {}
+        inicio = time.perf_counter()
+        conexao.request("GET", caminho, headers=cabecalhos)
+        resposta = conexao.getresponse()
+        resposta.read()
+        duracao_requisicao = time.perf_counter() - inicio
+        if resposta.status not in (200, 304, 404):
+            erros += 1
+            continue
+        if resposta.status == 200 and tipo == "numero":
+            etags[caminho] = resposta.getheader("ETag")
+        tempos.setdefault(tipo, []).append(duracao_requisicao)
+    conexao.close()
+    return tempos, erros
+
+
+def preparar_banco(caminho, sorteios):
+    repository = DbSorteios(criar_engine(caminho), tamanho_lote=5_000)
+    aleatorio = random.Random(7)
+    for dicionario in gerar_sorteios(sorteios):
+        dicionario["mega_da_virada"] = aleatorio.random() < 0.01
+        repository.adicionar(dicionario)
+    repository.descarregar()
+    repository.engine.dispose()
+
+
+def iniciar_api(caminho_db):
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "src.api_leitura", "--db", str(caminho_db), "--porta", "0"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    return processo, processo.stdout.readline().strip()
+
+
+def medir(url, clientes, duracao):
+    with multiprocessing.Pool(clientes) as pool:
+        resultados = pool.map(cliente, [(url, duracao, semente) for semente in range(clientes)])
+    por_tipo, erros = {}, 0
+    for tempos, erros_cliente in resultados:
+        erros += erros_cliente
+        for tipo, lista in tempos.items():
+            por_tipo.setdefault(tipo, []).extend(lista)
+    todos = [tempo for lista in por_tipo.values() for tempo in lista]
+    return {
+        "requisicoes": len(todos),
+        "requisicoes_por_s": len(todos) / duracao,
+        "erros": erros,
+        "geral": percentis(todos),
+        "por_tipo": {tipo: percentis(lista) for tipo, lista in sorted(por_tipo.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API de leitura.")
+    parser.add_argument("--url", help="API já em execução (sem isto, sobe uma sobre um banco sintético)")
+    parser.add_argument("--sorteios", type=int, default=3_000)
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--duracao", type=float, default=10.0)
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão é a saída padrão)")
+    args = parser.parse_args()
+
+    resultado = {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "clientes": args.clientes,
+        "duracao_s": args.duracao,
+    }
+    if args.url:
+        resultado.update(medir(args.url, args.clientes, args.duracao))
+    else:
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho_db = Path(diretorio) / "bench.db"
+            preparar_banco(caminho_db, args.sorteios)
+            processo, url = iniciar_api(caminho_db)
+            try:
+                resultado["sorteios"] = args.sorteios
+                resultado.update(medir(url, args.clientes, args.duracao))
+            finally:
+                processo.terminate()
+                processo.wait()
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        Path(args.saida).write_text(texto, encoding="utf-8")
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark offline do coletor, sem acessar o site da Caixa.
+
+Mede a vazão de tratar_texto_acertos, a latência por sorteio de inserir_no_db e do
+envio ao PipelineSorteios (com o tempo total até o pipeline esvaziar) e,
+com --navegador, de coletar_valores e navegar_para_o_proximo contra a réplica local
+da página de resultados (ferramentas/servidor_stub.py). O resultado sai em JSON,
+para comparar execuções e detectar regressões.
+
+Uso:
+    python -m benchmarks.bench_coleta [--navegador] [--sorteios 50] [--atraso 100] [--saida resultado.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from ferramentas.servidor_stub import gerar_respostas, iniciar_servidor
+from src.config import config
+from src.database import DbSorteios, criar_engine
+from src.extracao import tratar_texto_acertos
+from src.pipeline import PipelineSorteios
+
+TEXTOS_ACERTOS = (
+    "6 acertos\nNão houve ganhadores",
+    "5 acertos\n1 aposta ganhadora, R$ 54.321,09",
+    "4 acertos\n12.345 apostas ganhadoras, R$ 1.234,56",
+)
+
+
+def resumir(tempos):
+    """
+    :param tempos: Lista de durações em segundos.
+    :return: Dicionário com amostras, média, mediana, p95 e máximo em milissegundos.
+    """
+    ordenados = sorted(tempos)
+    return {
+        "amostras": len(ordenados),
+        "media_ms": 1000 * statistics.fmean(ordenados),
+        "p50_ms": 1000 * ordenados[len(ordenados) // 2],
+        "p95_ms": 1000 * ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))],
+        "max_ms": 1000 * ordenados[-1],
+    }
+
+
+def medir_tratar_texto_acertos(repeticoes=100_000):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for texto in TEXTOS_ACERTOS:
+            tratar_texto_acertos(texto)
+    tempo = time.perf_counter() - inicio
+    return {"chamadas": repeticoes * len(TEXTOS_ACERTOS), "chamadas_por_s": repeticoes * len(TEXTOS_ACERTOS) / tempo}
+
+
+def medir_inserir_no_db(loterias, sorteios):
+    tempos = []
+    for nr_sorteio in range(1, sorteios + 1):
+        dicionario = {
+            "nr_sorteio": nr_sorteio,
+            "mega_da_virada": False,
+            "data_sorteio": "11/03/1996",
+            "dezenas": "04, 05, 30, 33, 41, 52",
+            "local_do_sorteio": "SÃO PAULO, SP",
+            "ganhadores_seis_dezenas": 0,
+            "premio_seis_dezenas": 0.0,
+            "ganhadores_cinco_dezenas": 17,
+            "premio_cinco_dezenas": 39158.92,
+            "ganhadores_quatro_dezenas": 2016,
+            "premio_quatro_dezenas": 330.21,
+        }
+        inicio = time.perf_counter()
+        loterias.inserir_no_db(dicionario)
+        tempos.append(time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    loterias.obter_repositorio().descarregar()
+    tempos[-1] += time.perf_counter() - inicio
+    return resumir(tempos)
+
+
+def medir_pipeline(sorteios):
+    repository = DbSorteios(criar_engine(config.caminho_db + ".pipeline"), tamanho_lote=config.tamanho_lote)
+    tempos = []
+    inicio_total = time.perf_counter()
+    with PipelineSorteios(repository, tamanho_lote=config.tamanho_lote) as pipeline:
+        for nr_sorteio in range(1, sorteios + 1):
+            campos = {
+                "numero_do_sorteio": [f"Concurso {nr_sorteio} (11/03/1996)"],
+                "dezenas": ["04", "05", "30", "33", "41", "52"],
+                "local": ["Sorteio realizado no CAMINHÃO DA SORTE em SÃO PAULO, SP"],
+                "seis_acertos": [TEXTOS_ACERTOS[0]],
+                "cinco_acertos": [TEXTOS_ACERTOS[1]],
+                "quatro_acertos": [TEXTOS_ACERTOS[2]],
+            }
+            inicio = time.perf_counter()
+            pipeline.enviar(campos)
+            tempos.append(time.perf_counter() - inicio)
+    return {**resumir(tempos), "total_ms": 1000 * (time.perf_counter() - inicio_total)}
+
+
+def medir_navegador(loterias, url_pagina, sorteios, atraso):
+    loterias.url = f"{url_pagina}?atraso={atraso}"
+    driver = loterias.abrir_navegador()
+    try:
+        loterias.acessar_site_loterias_caixa(driver)
+        loterias.esperar_sorteio(driver, lambda nr: True)
+        loterias.navegar_para_sorteio(driver, 1)
+        coleta, navegacao = [], []
+        for nr_sorteio in range(1, sorteios + 1):
+            inicio = time.perf_counter()
+            loterias.coletar_valores(driver)
+            coleta.append(time.perf_counter() - inicio)
+            if nr_sorteio == sorteios:
+                break
+            inicio = time.perf_counter()
+            loterias.navegar_para_o_proximo(driver, nr_sorteio)
+            navegacao.append(time.perf_counter() - inicio)
+    finally:
+        loterias.fechar_navegador(driver)
+    return {"coletar_valores": resumir(coleta), "navegar_para_o_proximo": resumir(navegacao)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do coletor.")
+    parser.add_argument("--sorteios", type=int, default=50)
+    parser.add_argument("--navegador", action="store_true", help="mede também o Selenium (requer Chrome)")
+    parser.add_argument("--atraso", type=int, default=100, help="ms de #loading na réplica")
+    parser.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        diretorio = Path(diretorio)
+        config.caminho_db = str(diretorio / "bench.db")
+        config.caminho_arquivo = str(diretorio / "arquivo")
+        config.caminho_colunar = str(diretorio / "sorteios.bin")
+        gerar_respostas(diretorio / "respostas", args.sorteios)
+        servidor, _ = iniciar_servidor(diretorio / "respostas")
+
+        resultado = {
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sorteios": args.sorteios,
+            "tratar_texto_acertos": medir_tratar_texto_acertos(),
+        }
+
+        # depende do Selenium: importado só depois do benchmark de parsing
+        from src.coleta_de_dados import LoteriasCaixa
+
+        resultado["inserir_no_db"] = medir_inserir_no_db(LoteriasCaixa(), args.sorteios)
+        resultado["pipeline_enviar"] = medir_pipeline(args.sorteios)
+        if args.navegador:
+            resultado["atraso_loading_ms"] = args.atraso
+            resultado.update(
+                medir_navegador(LoteriasCaixa(), servidor.url_pagina, args.sorteios, args.atraso)
+            )
+        servidor.shutdown()
+
+    saida = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        Path(args.saida).write_text(saida + "\n", encoding="utf-8")
+    else:
+        print(saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Mede a vazão do ConferidorApostas em apostas × sorteios por segundo.
+
+Uso:
+    python -m benchmarks.bench_conferencia [--apostas 1000000] [--sorteios 2800] [--processos N]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.conferencia import ConferidorApostas
+from src.estatisticas import QTD_DEZENAS
+
+
+def gerar_mascaras(quantidade, qtd_dezenas, gerador):
+    # escolhe qtd_dezenas dezenas distintas por linha pegando os menores de valores aleatórios
+    escolhas = np.argpartition(gerador.random((quantidade, QTD_DEZENAS)), qtd_dezenas, axis=1)
+    bits = np.uint64(1) << escolhas[:, :qtd_dezenas].astype(np.uint64)
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão da conferência de apostas.")
+    parser.add_argument("--apostas", type=int, default=1_000_000)
+    parser.add_argument("--sorteios", type=int, default=2_800)
+    parser.add_argument("--dezenas", type=int, default=6, help="dezenas por aposta (6 a 15)")
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    gerador = np.random.default_rng(42)
+    sorteios = gerar_mascaras(args.sorteios, 6, gerador)
+    premios = gerador.uniform(0, 1e6, (args.sorteios, 3))
+    apostas = gerar_mascaras(args.apostas, args.dezenas, gerador)
+
+    conferidor = ConferidorApostas(sorteios, premios)
+    inicio = time.perf_counter()
+    resultado = conferidor.conferir(apostas, processos=args.processos)
+    tempo = time.perf_counter() - inicio
+
+    print(f"apostas:  {args.apostas:,} de {args.dezenas} dezenas × {args.sorteios:,} sorteios")
+    print(f"tempo:    {tempo:.2f} s")
+    print(f"vazão:    {args.apostas * args.sorteios / tempo:,.0f} apostas×sorteios/s")
+    print(f"senas:    {int(resultado['senas'].sum())}")
+
+
+if __name__ == "__main__":
+    main()
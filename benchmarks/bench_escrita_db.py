@@ -0,0 +1,83 @@
+"""
+Compara a vazão de escrita (linhas/s) do caminho antigo, um INSERT com commit
+por sorteio, com a escrita em lote de DbSorteios.create_many.
+
+Uso:
+    python -m benchmarks.bench_escrita_db [--linhas 100000] [--linhas-antes 2000]
+
+O caminho antigo é medido sobre uma amostra (--linhas-antes), já que gravar
+100 mil linhas uma a uma leva minutos.
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+
+from src.database import Base, DataBase, DbSorteios, criar_engine
+
+
+def gerar_sorteios(quantidade, semente=42):
+    aleatorio = random.Random(semente)
+    for nr_sorteio in range(1, quantidade + 1):
+        dezenas = sorted(aleatorio.sample(range(1, 61), 6))
+        yield {
+            "nr_sorteio": nr_sorteio,
+            "mega_da_virada": False,
+            "data_sorteio": f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/{aleatorio.randint(1996, 2023)}",
+            "dezenas": ", ".join(f"{d:02d}" for d in dezenas),
+            "local_do_sorteio": "SÃO PAULO, SP",
+            "ganhadores_seis_dezenas": aleatorio.randint(0, 3),
+            "premio_seis_dezenas": aleatorio.uniform(0, 1e8),
+            "ganhadores_cinco_dezenas": aleatorio.randint(0, 300),
+            "premio_cinco_dezenas": aleatorio.uniform(0, 1e5),
+            "ganhadores_quatro_dezenas": aleatorio.randint(0, 20000),
+            "premio_quatro_dezenas": aleatorio.uniform(0, 1e3),
+        }
+
+
+def medir_antes(caminho, sorteios):
+    """Reproduz o inserir_no_db original: engine, create_all e commit a cada linha."""
+    inicio = time.perf_counter()
+    for dicionario in sorteios:
+        engine = create_engine(f"sqlite:///{caminho}", future=True)
+        Base.metadata.create_all(engine)
+        with engine.connect() as conn:
+            conn.execute(insert(DataBase).values(**dicionario))
+            conn.commit()
+        engine.dispose()
+    return time.perf_counter() - inicio
+
+
+def medir_depois(caminho, sorteios, tamanho_lote):
+    inicio = time.perf_counter()
+    repository = DbSorteios(criar_engine(caminho), tamanho_lote=tamanho_lote)
+    for dicionario in sorteios:
+        repository.adicionar(dicionario)
+    repository.descarregar()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--linhas-antes", type=int, default=2_000)
+    parser.add_argument("--tamanho-lote", type=int, default=5_000)
+    args = parser.parse_args()
+
+    sorteios = list(gerar_sorteios(args.linhas))
+    with tempfile.TemporaryDirectory() as diretorio:
+        tempo_antes = medir_antes(Path(diretorio) / "antes.db", sorteios[: args.linhas_antes])
+        tempo_depois = medir_depois(Path(diretorio) / "depois.db", sorteios, args.tamanho_lote)
+
+    vazao_antes = min(args.linhas_antes, args.linhas) / tempo_antes
+    vazao_depois = args.linhas / tempo_depois
+    print(f"antes:  {vazao_antes:12,.0f} linhas/s ({min(args.linhas_antes, args.linhas)} linhas)")
+    print(f"depois: {vazao_depois:12,.0f} linhas/s ({args.linhas} linhas, lote {args.tamanho_lote})")
+    print(f"ganho:  {vazao_depois / vazao_antes:12,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
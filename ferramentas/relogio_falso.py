@@ -0,0 +1,66 @@
+"""
+Relógio falso para testar o daemon (src.daemon) sem esperar os horários reais dos sorteios.
+
+dormir só avança a hora, e as ações agendadas rodam quando a hora passa do momento delas,
+por exemplo para publicar um sorteio novo na pasta do servidor stub:
+
+    brasilia = timezone(timedelta(hours=-3))
+    relogio = RelogioFalso(datetime(2024, 5, 7, 19, 0, tzinfo=brasilia))
+    relogio.agendar(datetime(2024, 5, 7, 20, 25, tzinfo=brasilia), lambda: publicar_sorteio(pasta, 2720, "07/05/2024"))
+    DaemonSorteios(coletor, relogio=relogio).executar(ate=datetime(2024, 5, 8, 1, 0, tzinfo=brasilia))
+"""
+from datetime import timedelta
+
+
+class RelogioFalso:
+    """
+    Relógio com a mesma interface de src.daemon.Relogio, controlado pelo teste.
+
+    Atributos:
+        atual (datetime): Hora atual do relógio.
+        dormidas (list[float]): Duração de cada chamada a dormir, em segundos.
+    """
+
+    def __init__(self, inicio):
+        """
+        :param inicio: Hora inicial, com fuso.
+        """
+        self.atual = inicio
+        self.dormidas = []
+        self._agenda = []
+
+    def agora(self):
+        return self.atual
+
+    def agendar(self, momento, acao):
+        """
+        Agenda uma ação para quando a hora do relógio chegar a momento.
+
+        :param momento: Hora da ação, com fuso.
+        :param acao: Função sem argumentos.
+        """
+        self._agenda.append((momento, acao))
+        self._agenda.sort(key=lambda item: item[0])
+
+    def avancar(self, segundos):
+        """
+        Avança a hora e executa, em ordem, as ações agendadas até a nova hora.
+
+        :param segundos: Quanto avançar.
+        """
+        self.atual += timedelta(seconds=segundos)
+        while self._agenda and self._agenda[0][0] <= self.atual:
+            _, acao = self._agenda.pop(0)
+            acao()
+
+    def dormir(self, segundos, interromper=None):
+        """
+        Registra a dormida e avança a hora, sem esperar de verdade.
+
+        :param segundos: Tempo a dormir.
+        :param interromper: Ignorado se ainda não sinalizado; se já estiver, não avança.
+        """
+        if interromper is not None and interromper.is_set():
+            return
+        self.dormidas.append(segundos)
+        self.avancar(segundos)
@@ -0,0 +1,136 @@
+"""
+Servidor HTTP local que devolve respostas gravadas da API da Caixa e uma réplica
+estática da página de resultados da Mega-Sena.
+
+Cada sorteio fica em <diretorio>/<nr_sorteio>.json. A rota base devolve o
+sorteio de maior número, como a API real faz para o mais recente. A réplica
+(pagina_megasena.html) usa os mesmos ids de LoteriasCaixa.locators e lê os
+sorteios da mesma API.
+
+Uso:
+    python -m ferramentas.servidor_stub <diretorio> [porta]
+
+e aponte o coletor HTTP para http://127.0.0.1:<porta>/api/megasena ou o
+navegador para http://127.0.0.1:<porta>/Paginas/Mega-Sena.aspx?atraso=<ms>.
+"""
+import json
+import random
+import sys
+import threading
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROTA_API = "/api/megasena"
+ROTA_PAGINA = "/Paginas/Mega-Sena.aspx"
+PAGINA = Path(__file__).with_name("pagina_megasena.html")
+
+
+class ApiStubHandler(BaseHTTPRequestHandler):
+    def __init__(self, *args, diretorio, **kwargs):
+        self.diretorio = Path(diretorio)
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+    def responder(self, status, corpo, tipo="application/json"):
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        caminho = self.path.split("?")[0].rstrip("/")
+        if caminho == ROTA_PAGINA:
+            return self.responder(200, PAGINA.read_text(encoding="utf-8"), "text/html")
+        if not caminho.startswith(ROTA_API):
+            return self.responder(404, json.dumps({"erro": "rota inexistente"}))
+        resto = caminho[len(ROTA_API):].strip("/")
+        if resto:
+            arquivo = self.diretorio / f"{resto}.json"
+        else:
+            numeros = [int(p.stem) for p in self.diretorio.glob("*.json") if p.stem.isdigit()]
+            arquivo = self.diretorio / f"{max(numeros)}.json" if numeros else None
+        if arquivo is None or not arquivo.exists():
+            return self.responder(404, json.dumps({"erro": "sorteio inexistente"}))
+        self.responder(200, arquivo.read_text(encoding="utf-8"))
+
+
+def _resposta(numero, aleatorio, data=None):
+    ganhadores = [aleatorio.choice([0, 0, 1, 2]), aleatorio.randint(0, 300), aleatorio.randint(0, 20000)]
+    return {
+        "numero": numero,
+        "dataApuracao": data or f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/{aleatorio.randint(1996, 2023)}",
+        "listaDezenas": [f"{d:02d}" for d in sorted(aleatorio.sample(range(1, 61), 6))],
+        "nomeMunicipioUFSorteio": "SÃO PAULO, SP",
+        "listaRateioPremio": [
+            {
+                "faixa": faixa,
+                "numeroDeGanhadores": qtd,
+                "valorPremio": round(aleatorio.uniform(100, 1e7), 2) if qtd else 0.0,
+            }
+            for faixa, qtd in enumerate(ganhadores, start=1)
+        ],
+    }
+
+
+def gerar_respostas(diretorio, quantidade, semente=42):
+    """
+    Grava respostas sintéticas no formato da API, para testes e benchmarks.
+
+    :param diretorio: Diretório de destino.
+    :param quantidade: Quantidade de sorteios (1 a quantidade).
+    :param semente: Semente do gerador aleatório.
+    """
+    aleatorio = random.Random(semente)
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    for numero in range(1, quantidade + 1):
+        dados = _resposta(numero, aleatorio)
+        (diretorio / f"{numero}.json").write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+
+
+def publicar_sorteio(diretorio, numero, data, semente=None):
+    """
+    Grava a resposta de um sorteio novo com a data informada, para simular a publicação
+    de um resultado (por exemplo, nos testes do daemon com o relógio falso).
+
+    :param diretorio: Diretório das respostas.
+    :param numero: Número do sorteio.
+    :param data: Data do sorteio, 'dd/mm/aaaa'.
+    :param semente: Semente do gerador aleatório (padrão é o número do sorteio).
+    """
+    dados = _resposta(numero, random.Random(numero if semente is None else semente), data)
+    Path(diretorio, f"{numero}.json").write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+
+
+def iniciar_servidor(diretorio, porta=0):
+    """
+    Sobe o servidor em uma thread daemon.
+
+    O servidor retornado também tem os atributos url_api e url_pagina.
+
+    :param diretorio: Diretório com as respostas gravadas.
+    :param porta: Porta TCP (0 escolhe uma livre).
+    :return: Tupla (servidor, url_api).
+    """
+    servidor = ThreadingHTTPServer(
+        ("127.0.0.1", porta), partial(ApiStubHandler, diretorio=diretorio)
+    )
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.url_api = f"{base}{ROTA_API}"
+    servidor.url_pagina = f"{base}{ROTA_PAGINA}"
+    return servidor, servidor.url_api
+
+
+if __name__ == "__main__":
+    servidor, url = iniciar_servidor(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+    print(url)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
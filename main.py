@@ -1,24 +1,53 @@
 import logging
-import os
 from pathlib import Path
-from src.coleta_de_dados import LoteriasCaixa
+from src.config import config
+from src.database import apagar_sorteios, criar_engine
+from src.jogos import obter_jogo
+from src.metricas import metricas
 
 FORMAT = '%(asctime)s %(message)s'
 logging.basicConfig(filename='result.log', format=FORMAT, level=logging.INFO)
 
 def deletar_db_anterior():
-    caminho = Path("db_sorteios.db")
-    if caminho.exists():
-        os.remove(caminho)
+    # o banco guarda todos os jogos: apaga só as tabelas dos jogos que serão coletados
+    if Path(config.caminho_db).exists():
+        engine = criar_engine(config.caminho_db)
+        for jogo in config.jogos:
+            apagar_sorteios(engine, obter_jogo(jogo))
+        engine.dispose()
+
+def coletar():
+    # importa só o coletor escolhido: o de HTTP não precisa do Selenium
+    if config.coletor == 'http':
+        from src.coleta_http import LoteriasCaixaHttp
+        # cada jogo já faz as requisições em paralelo; os jogos são coletados um após o outro
+        for jogo in config.jogos:
+            LoteriasCaixaHttp(jogo=jogo).coletar_dados()
+        return
+    from src.coleta_de_dados import LoteriasCaixa, coletar_jogos
+    coletar_jogos([LoteriasCaixa(jogo) for jogo in config.jogos])
+
+def exportar_metricas(status):
+    try:
+        metricas.exportar(
+            config.caminho_metricas, config.caminho_resumo,
+            status=status, coletor=config.coletor, jogos=list(config.jogos),
+        )
+    except OSError as e:
+        logging.exception(e)
 
 def main():
+    status = 'erro'
     try:
-        deletar_db_anterior()
-        loterias = LoteriasCaixa()
-        loterias.coletar_dados()
+        if not config.incremental:
+            deletar_db_anterior()
+        coletar()
+        status = 'ok'
         logging.info('ok')
     except Exception as e:
         logging.exception(e)
+    finally:
+        exportar_metricas(status)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,538 @@
+"""
+API HTTP local, somente leitura, dos sorteios de um jogo, servida de índices em memória.
+
+Os sorteios são lidos do banco uma vez e indexados por número, data, dezena e Mega da
+Virada, com o JSON de cada sorteio já serializado, então as requisições não abrem
+conexão com o banco. Uma thread confere a cada config.intervalo_recarga_api segundos se
+o banco mudou (PRAGMA data_version) e, se mudou, monta índices novos e os troca pelos
+atuais de uma só vez.
+
+Rotas (respostas em JSON com ETag e Last-Modified; com If-None-Match ou If-Modified-Since
+a resposta é 304 se nada mudou):
+    GET /sorteios/ultimo
+    GET /sorteios/<nr_sorteio>
+    GET /sorteios?inicio=&fim=&data_inicio=&data_fim=&dezenas=&virada=&limite=
+        inicio e fim são números de sorteio; data_inicio e data_fim, datas 'aaaa-mm-dd' ou
+        'dd/mm/aaaa'; dezenas, como '5,10', seleciona os sorteios com todas elas; virada=1
+        seleciona só a Mega da Virada; limite devolve só os mais recentes. Os filtros se
+        combinam e os limites são inclusivos.
+    GET /saude
+
+O ETag é o hash do corpo da resposta e o Last-Modified, a modificação do arquivo do banco
+na carga em que o conteúdo mudou pela última vez: um sorteio que não mudou mantém os dois
+entre recargas e reinícios da API.
+
+Uso:
+    python -m src.api_leitura [--jogo megasena] [--db db_sorteios.db] [--porta 8080]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from sqlalchemy import select
+
+from src.config import config
+from src.database import DbSorteios, calcular_data_ordinal, converter_dezenas, criar_engine
+from src.jogos import JOGOS, MEGA_SENA, obter_jogo
+from src.metricas import metricas
+
+
+class IndiceSorteios:
+    """
+    Índices em memória dos sorteios de um jogo. São imutáveis: uma recarga monta outra
+    instância, que substitui a anterior.
+
+    Atributos:
+        jogo (Jogo): Jogo dos sorteios.
+        nr_sorteios (list[int]): Números dos sorteios, em ordem crescente.
+        etag (str): ETag do conteúdo (muda se qualquer sorteio mudar).
+        ultima_modificacao (float): Momento (epoch) da última mudança no conteúdo.
+    """
+
+    def __init__(self, linhas, jogo=None, modificacao=None, anterior=None):
+        """
+        Args:
+            linhas (Iterable[Mapping]): Registros da tabela de sorteios do jogo.
+            jogo (str | Jogo): Jogo dos sorteios (padrão é a Mega-Sena).
+            modificacao (float): Momento (epoch) em que os dados foram gravados (padrão é agora).
+            anterior (IndiceSorteios): Índices da carga anterior; os sorteios que não mudaram
+                mantêm a última modificação que tinham neles.
+        """
+        modificacao = time.time() if modificacao is None else modificacao
+        self.jogo = obter_jogo(jogo)
+        linhas = sorted(linhas, key=lambda linha: linha["nr_sorteio"])
+        self.nr_sorteios = [linha["nr_sorteio"] for linha in linhas]
+        self._json = {}
+        self._etags = {}
+        self._modificacao = {}
+        self._por_dezena = {}
+        self._virada = set()
+        por_data = []
+        resumo = hashlib.blake2b(digest_size=8)
+        for linha in linhas:
+            nr_sorteio = linha["nr_sorteio"]
+            corpo = json.dumps({coluna: linha[coluna] for coluna in self.jogo.colunas}, ensure_ascii=False)
+            self._json[nr_sorteio] = corpo.encode("utf-8")
+            resumo.update(self._json[nr_sorteio])
+            self._etags[nr_sorteio] = calcular_etag(self._json[nr_sorteio])
+            if anterior is not None and anterior._etags.get(nr_sorteio) == self._etags[nr_sorteio]:
+                self._modificacao[nr_sorteio] = anterior._modificacao[nr_sorteio]
+            else:
+                self._modificacao[nr_sorteio] = modificacao
+            por_data.append((calcular_data_ordinal(linha["data_sorteio"]), nr_sorteio))
+            for sufixo in self.jogo.sufixos:
+                for dezena in converter_dezenas(linha[f"dezenas{sufixo}"]):
+                    self._por_dezena.setdefault(dezena, set()).add(nr_sorteio)
+            if self.jogo.mega_da_virada and linha["mega_da_virada"]:
+                self._virada.add(nr_sorteio)
+        por_data.sort()
+        self._datas = [ordinal for ordinal, _ in por_data]
+        self._nr_por_data = [nr_sorteio for _, nr_sorteio in por_data]
+        self.etag = f'"{resumo.hexdigest()}"'
+        if anterior is not None and anterior.etag == self.etag:
+            self.ultima_modificacao = anterior.ultima_modificacao
+        else:
+            self.ultima_modificacao = modificacao
+        self.last_modified = formatdate(self.ultima_modificacao, usegmt=True)
+
+    @classmethod
+    def carregar(cls, repository, anterior=None):
+        """
+        Carrega todos os sorteios do jogo do repositório com uma única consulta.
+
+        Args:
+            repository (DbSorteios): Repositório do jogo.
+            anterior (IndiceSorteios): Índices da carga anterior, se houver.
+
+        Returns:
+            IndiceSorteios: Índices dos sorteios gravados, com a modificação do arquivo do
+                banco como momento das mudanças.
+        """
+        # lida antes da consulta: uma escrita entre as duas deixa a modificação adiantada, não atrasada
+        modificacao = modificacao_banco(repository.engine)
+        with repository.engine.connect() as conn:
+            linhas = conn.execute(select(repository.tabela)).mappings().all()
+        return cls(linhas, repository.jogo, modificacao, anterior)
+
+    @property
+    def quantidade(self):
+        return len(self.nr_sorteios)
+
+    def sorteio(self, nr_sorteio):
+        """
+        Returns:
+            bytes | None: JSON do sorteio (None se ele não existe).
+        """
+        return self._json.get(nr_sorteio)
+
+    def validadores(self, nr_sorteio):
+        """
+        Returns:
+            tuple[str, float]: ETag e última modificação (epoch) de um sorteio existente.
+        """
+        return self._etags[nr_sorteio], self._modificacao[nr_sorteio]
+
+    def ultimo(self):
+        """
+        Returns:
+            bytes | None: JSON do sorteio mais recente (None se não houver sorteios).
+        """
+        return self._json[self.nr_sorteios[-1]] if self.nr_sorteios else None
+
+    def consultar(self, inicio=None, fim=None, data_inicio=None, data_fim=None, dezenas=(), virada=False,
+                  limite=None):
+        """
+        Seleciona sorteios pelos índices. Os limites são inclusivos e os filtros se combinam.
+
+        Args:
+            inicio (int): Primeiro número de sorteio.
+            fim (int): Último número de sorteio.
+            data_inicio (int): Data mínima, como date.toordinal().
+            data_fim (int): Data máxima, como date.toordinal().
+            dezenas (Iterable[int]): Dezenas que o sorteio deve conter.
+            virada (bool): Só os sorteios da Mega da Virada.
+            limite (int): Devolve no máximo esta quantidade, dos sorteios mais recentes.
+
+        Returns:
+            list[int]: Números dos sorteios, em ordem crescente.
+
+        Raises:
+            ValueError: Se virada for pedido para um jogo sem a Mega da Virada.
+        """
+        filtros = []
+        if data_inicio is not None or data_fim is not None:
+            esquerda = 0 if data_inicio is None else bisect_left(self._datas, data_inicio)
+            direita = len(self._datas) if data_fim is None else bisect_right(self._datas, data_fim)
+            filtros.append(set(self._nr_por_data[esquerda:direita]))
+        for dezena in set(dezenas):
+            filtros.append(self._por_dezena.get(dezena, set()))
+        if virada:
+            if not self.jogo.mega_da_virada:
+                raise ValueError(f"O filtro virada não está disponível para a {self.jogo.titulo}.")
+            filtros.append(self._virada)
+
+        esquerda = 0 if inicio is None else bisect_left(self.nr_sorteios, inicio)
+        direita = len(self.nr_sorteios) if fim is None else bisect_right(self.nr_sorteios, fim)
+        if not filtros:
+            selecionados = self.nr_sorteios[esquerda:direita]
+        else:
+            comuns = set.intersection(*filtros)
+            if len(comuns) < direita - esquerda:
+                selecionados = sorted(
+                    nr_sorteio for nr_sorteio in comuns
+                    if (inicio is None or nr_sorteio >= inicio) and (fim is None or nr_sorteio <= fim)
+                )
+            else:
+                selecionados = [nr_sorteio for nr_sorteio in self.nr_sorteios[esquerda:direita] if nr_sorteio in comuns]
+        if limite is not None:
+            selecionados = selecionados[-limite:] if limite > 0 else []
+        return selecionados
+
+    def lista(self, nr_sorteios):
+        """
+        Returns:
+            bytes: Array JSON com os sorteios informados.
+        """
+        return b"[" + b",".join(self._json[nr_sorteio] for nr_sorteio in nr_sorteios) + b"]"
+
+    def etag_lista(self, nr_sorteios):
+        """
+        ETag do array de lista: o array é determinado pelos sorteios e pelo JSON de cada um,
+        então o hash dos ETags deles basta, sem percorrer o corpo inteiro.
+
+        Returns:
+            str: ETag forte, entre aspas.
+        """
+        return calcular_etag("[" + ",".join(self._etags[nr_sorteio] for nr_sorteio in nr_sorteios) + "]")
+
+
+def calcular_etag(conteudo):
+    """
+    Args:
+        conteudo (bytes | str): Corpo da resposta, ou texto que o determina.
+
+    Returns:
+        str: ETag forte, entre aspas, derivado só do conteúdo.
+    """
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("ascii")
+    return f'"{hashlib.blake2b(conteudo, digest_size=8).hexdigest()}"'
+
+
+@lru_cache(maxsize=64)
+def _data_http(momento):
+    # há poucos momentos distintos (um por carga que mudou o conteúdo)
+    return formatdate(momento, usegmt=True)
+
+
+def modificacao_banco(engine):
+    """
+    Momento da última escrita no arquivo do banco, inclusive no WAL, onde ficam as escritas
+    ainda não levadas ao arquivo principal.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine do banco.
+
+    Returns:
+        float: Modificação (epoch) mais recente entre o banco e o WAL; agora, se o banco
+            não for um arquivo.
+    """
+    caminho = engine.url.database
+    if not caminho or caminho == ":memory:":
+        return time.time()
+    modificacoes = []
+    for arquivo in (caminho, f"{caminho}-wal"):
+        try:
+            modificacoes.append(os.stat(arquivo).st_mtime)
+        except FileNotFoundError:
+            pass
+    return max(modificacoes, default=time.time())
+
+
+def _inteiro(valor, nome):
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"{nome} inválido: {valor!r}") from None
+
+
+def _data(valor, nome):
+    try:
+        if "-" in valor:
+            return date.fromisoformat(valor).toordinal()
+        return calcular_data_ordinal(valor)
+    except ValueError:
+        raise ValueError(f"{nome} inválida: {valor!r} (use 'aaaa-mm-dd' ou 'dd/mm/aaaa')") from None
+
+
+def montar_filtros(query):
+    """
+    Converte a query string de /sorteios nos argumentos de IndiceSorteios.consultar.
+    Parâmetros desconhecidos são ignorados.
+
+    Args:
+        query (str): Query string, sem o '?'.
+
+    Returns:
+        dict: Argumentos de IndiceSorteios.consultar.
+
+    Raises:
+        ValueError: Se algum valor for inválido.
+    """
+    filtros = {}
+    for chave, valor in parse_qsl(query):
+        match chave:
+            case "inicio" | "fim" | "limite":
+                filtros[chave] = _inteiro(valor, chave)
+            case "data_inicio" | "data_fim":
+                filtros[chave] = _data(valor, chave)
+            case "dezenas":
+                filtros[chave] = [_inteiro(dezena, chave) for dezena in valor.split(",") if dezena.strip()]
+            case "virada":
+                filtros[chave] = valor.lower() in ("1", "true", "sim")
+    return filtros
+
+
+class ManipuladorLeitura(BaseHTTPRequestHandler):
+    # conexões persistentes: o cliente não paga um handshake TCP por consulta
+    protocol_version = "HTTP/1.1"
+    # cabeçalhos e corpo saem em escritas separadas: com o Nagle ligado, a segunda espera o
+    # ACK atrasado do cliente (~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def responder(self, status, corpo, etag=None, modificacao=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        if etag is not None:
+            self.enviar_validadores(etag, modificacao)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def enviar_validadores(self, etag, modificacao):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", _data_http(modificacao))
+
+    def responder_erro(self, status, mensagem):
+        self.responder(status, json.dumps({"erro": mensagem}, ensure_ascii=False).encode("utf-8"))
+
+    def nao_modificado(self, etag, modificacao):
+        """
+        Returns:
+            bool: True se as validações condicionais da requisição batem com a resposta.
+        """
+        etags = self.headers.get("If-None-Match")
+        if etags is not None:
+            return etags.strip() == "*" or etag in (
+                item.strip().removeprefix("W/") for item in etags.split(",")
+            )
+        desde = self.headers.get("If-Modified-Since")
+        if desde is not None:
+            try:
+                return int(modificacao) <= parsedate_to_datetime(desde).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def do_GET(self):
+        # um único acesso ao índice: uma recarga no meio da requisição não mistura versões
+        indice = self.server.indice
+        url = urlsplit(self.path)
+        try:
+            # um sorteio tem validadores próprios; as demais respostas dependem de quais sorteios
+            # entram nelas e usam a última modificação do conteúdo todo
+            modificacao = indice.ultima_modificacao
+            etag = None
+            match url.path.strip("/").split("/"):
+                case ["sorteios", "ultimo"]:
+                    corpo = indice.ultimo()
+                    if corpo is not None:
+                        etag = indice.validadores(indice.nr_sorteios[-1])[0]
+                case ["sorteios", nr_sorteio]:
+                    nr_sorteio = _inteiro(nr_sorteio, "nr_sorteio")
+                    corpo = indice.sorteio(nr_sorteio)
+                    if corpo is not None:
+                        etag, modificacao = indice.validadores(nr_sorteio)
+                case ["sorteios"]:
+                    nr_sorteios = indice.consultar(**montar_filtros(url.query))
+                    corpo = indice.lista(nr_sorteios)
+                    etag = indice.etag_lista(nr_sorteios)
+                case ["saude"]:
+                    return self.responder(200, json.dumps(self.server.saude(), ensure_ascii=False).encode("utf-8"))
+                case _:
+                    return self.responder_erro(404, "rota inexistente")
+        except ValueError as e:
+            return self.responder_erro(400, str(e))
+        if corpo is None:
+            return self.responder_erro(404, "sorteio inexistente")
+        if self.nao_modificado(etag, modificacao):
+            self.send_response(304)
+            self.enviar_validadores(etag, modificacao)
+            self.end_headers()
+            return
+        self.responder(200, corpo, etag, modificacao)
+
+
+class ServidorLeitura(ThreadingHTTPServer):
+    """
+    Servidor da API de leitura de um jogo, com recarga dos índices quando o banco muda.
+
+    Atributos:
+        indice (IndiceSorteios): Índices atuais, trocados inteiros a cada recarga.
+        recargas (int): Quantidade de recargas que trocaram os índices.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, repository, endereco=None, porta=None, intervalo_recarga=None):
+        """
+        Args:
+            repository (DbSorteios): Repositório do jogo servido.
+            endereco (str): Endereço de escuta (padrão é config.endereco_api).
+            porta (int): Porta TCP (padrão é config.porta_api; 0 escolhe uma livre).
+            intervalo_recarga (float): Segundos entre as verificações de mudança no banco
+                (padrão é config.intervalo_recarga_api).
+        """
+        self.repository = repository
+        self.intervalo_recarga = config.intervalo_recarga_api if intervalo_recarga is None else intervalo_recarga
+        self.recargas = 0
+        self._conexao = None
+        self._parar = threading.Event()
+        # a versão é lida antes da carga para que uma escrita entre as duas não passe despercebida
+        self._versao = self._versao_banco()
+        self.indice = IndiceSorteios.carregar(repository)
+        self._recarregador = threading.Thread(target=self._acompanhar_banco, name="recarga-api", daemon=True)
+        super().__init__(
+            (config.endereco_api if endereco is None else endereco, config.porta_api if porta is None else porta),
+            ManipuladorLeitura,
+        )
+
+    @property
+    def url(self):
+        endereco, porta = self.server_address[:2]
+        return f"http://{endereco}:{porta}"
+
+    def servir(self):
+        """
+        Atende as requisições até shutdown ser chamado, recarregando os índices em segundo plano.
+        """
+        self._recarregador.start()
+        self.serve_forever()
+
+    def server_close(self):
+        self._parar.set()
+        if self._recarregador.is_alive():
+            self._recarregador.join()
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+        super().server_close()
+
+    def _versao_banco(self):
+        # data_version muda a cada commit feito por outra conexão ao banco
+        if self._conexao is None:
+            self._conexao = self.repository.engine.connect()
+        versao = self._conexao.exec_driver_sql("PRAGMA data_version").scalar()
+        self._conexao.rollback()
+        return versao
+
+    def recarregar(self, forcar=False):
+        """
+        Monta índices novos se o banco mudou desde a última carga.
+
+        Args:
+            forcar (bool): Recarrega mesmo sem mudança no banco.
+
+        Returns:
+            bool: True se os índices foram trocados (o conteúdo mudou).
+        """
+        versao = self._versao_banco()
+        if versao == self._versao and not forcar:
+            return False
+        inicio = time.perf_counter()
+        novo = IndiceSorteios.carregar(self.repository, self.indice)
+        self._versao = versao
+        if novo.etag == self.indice.etag:
+            return False
+        self.indice = novo
+        self.recargas += 1
+        metricas.incrementar("recargas_api", jogo=novo.jogo.nome)
+        logging.info(
+            "índices da %s recarregados: %d sorteios em %.0f ms",
+            novo.jogo.titulo, novo.quantidade, 1000 * (time.perf_counter() - inicio),
+        )
+        return True
+
+    def _acompanhar_banco(self):
+        while not self._parar.wait(self.intervalo_recarga):
+            try:
+                self.recarregar()
+            except Exception as e:
+                # o banco pode estar sendo recriado: mantém os índices atuais e tenta de novo
+                logging.warning("recarga dos índices falhou: %r", e)
+
+    def saude(self):
+        """
+        Returns:
+            dict: Situação dos índices servidos.
+        """
+        indice = self.indice
+        return {
+            "jogo": indice.jogo.nome,
+            "sorteios": indice.quantidade,
+            "ultimo_sorteio": indice.nr_sorteios[-1] if indice.nr_sorteios else None,
+            "etag": indice.etag,
+            "ultima_modificacao": indice.last_modified,
+            "recargas": self.recargas,
+        }
+
+
+def criar_servidor(jogo=None, caminho_db=None, endereco=None, porta=None, intervalo_recarga=None):
+    """
+    Cria o servidor da API de leitura sobre o banco de sorteios.
+
+    Args:
+        jogo (str | Jogo): Jogo servido (padrão é a Mega-Sena).
+        caminho_db (str): Banco de dados (padrão é config.caminho_db).
+        endereco (str): Endereço de escuta (padrão é config.endereco_api).
+        porta (int): Porta TCP (padrão é config.porta_api; 0 escolhe uma livre).
+        intervalo_recarga (float): Segundos entre as verificações de mudança no banco.
+
+    Returns:
+        ServidorLeitura: O servidor, a ser iniciado com servir.
+    """
+    repository = DbSorteios(criar_engine(caminho_db or config.caminho_db), jogo=jogo)
+    return ServidorLeitura(repository, endereco, porta, intervalo_recarga)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(asctime)s %(message)s", level=logging.INFO)
+    parser = argparse.ArgumentParser(description="API HTTP local, somente leitura, dos sorteios.")
+    parser.add_argument("--jogo", choices=list(JOGOS), default=MEGA_SENA.nome)
+    parser.add_argument("--db", default=config.caminho_db)
+    parser.add_argument("--endereco", default=config.endereco_api)
+    parser.add_argument("--porta", type=int, default=config.porta_api)
+    args = parser.parse_args()
+    servidor = criar_servidor(args.jogo, args.db, args.endereco, args.porta)
+    # a primeira linha da saída é a URL, para quem iniciou o servidor com porta 0
+    print(servidor.url, flush=True)
+    try:
+        servidor.servir()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
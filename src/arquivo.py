@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# mkstemp cria o temporário com modo 0600; os arquivos gravados recebem o modo padrão do
+# processo (lido uma vez, na importação, porque os.umask não é seguro entre threads)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def gravar_atomico(caminho, dados):
+    """
+    Grava bytes em um arquivo temporário no mesmo diretório e o renomeia para o destino,
+    mantendo o modo do arquivo anterior (ou o padrão do processo, se ele não existia).
+
+    :param caminho: Caminho final do arquivo.
+    :param dados: Conteúdo em bytes.
+    """
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(dados)
+        try:
+            modo = os.stat(caminho).st_mode & 0o7777
+        except FileNotFoundError:
+            modo = 0o666 & ~_UMASK
+        os.chmod(temporario, modo)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+class ArquivoSorteios:
+    """
+    Arquivo em disco, endereçado por conteúdo, dos textos lidos de cada página de sorteio.
+
+    Os textos ficam comprimidos em objetos/<hh>/<sha256>.json.gz e o índice
+    indice/<nr_sorteio> aponta para o hash da versão mais recente de cada sorteio.
+    Páginas idênticas são gravadas uma única vez.
+    """
+
+    def __init__(self, raiz):
+        """
+        :param raiz: Diretório raiz do arquivo.
+        """
+        self.raiz = Path(raiz)
+        self.objetos = self.raiz / "objetos"
+        self.indice = self.raiz / "indice"
+
+    def caminho_objeto(self, hash_conteudo):
+        return self.objetos / hash_conteudo[:2] / f"{hash_conteudo}.json.gz"
+
+    def salvar(self, nr_sorteio, campos):
+        """
+        Guarda os textos de uma página e atualiza o índice do sorteio.
+
+        :param nr_sorteio: Número do sorteio.
+        :param campos: Dicionário {campo: [textos]} lido da página.
+        :return: Hash do conteúdo gravado.
+        """
+        conteudo = json.dumps(campos, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+        caminho = self.caminho_objeto(hash_conteudo)
+        if not caminho.exists():
+            gravar_atomico(caminho, gzip.compress(conteudo, mtime=0))
+        gravar_atomico(self.indice / str(nr_sorteio), hash_conteudo.encode("ascii"))
+        return hash_conteudo
+
+    def carregar_objeto(self, hash_conteudo):
+        """
+        :param hash_conteudo: Hash de um objeto gravado.
+        :return: Dicionário {campo: [textos]}.
+        """
+        return json.loads(gzip.decompress(self.caminho_objeto(hash_conteudo).read_bytes()))
+
+    def carregar(self, nr_sorteio):
+        """
+        :param nr_sorteio: Número do sorteio.
+        :return: Dicionário {campo: [textos]} da última página gravada para o sorteio.
+        """
+        hash_conteudo = (self.indice / str(nr_sorteio)).read_text(encoding="ascii")
+        return self.carregar_objeto(hash_conteudo)
+
+    def listar(self):
+        """
+        :return: Lista de tuplas (nr_sorteio, hash) ordenada pelo número do sorteio.
+        """
+        if not self.indice.exists():
+            return []
+        itens = [
+            (int(caminho.name), caminho.read_text(encoding="ascii"))
+            for caminho in self.indice.iterdir()
+            if caminho.name.isdigit()
+        ]
+        return sorted(itens)
@@ -1,10 +1,17 @@
-from time import sleep
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import cache
+from itertools import chain, zip_longest
+from pathlib import Path
+from time import perf_counter, time
 
 from selenium.common.exceptions import (
     ElementClickInterceptedException,
     NoSuchElementException,
     StaleElementReferenceException,
     TimeoutException,
+    WebDriverException,
 )
 from selenium.webdriver import ActionChains as AC
 from selenium.webdriver import Chrome
@@ -14,26 +21,68 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
-from sqlalchemy import create_engine
-from sqlalchemy.exc import IntegrityError
-from webdriver_manager.chrome import ChromeDriverManager
 
-from src.database import DbSorteios
+from src.database import DbSorteios, criar_engine
 from src.config import config
+from src import extracao
+from src.arquivo import ArquivoSorteios
+from src.jogos import MEGA_SENA, obter_jogo
+from src.metricas import TODOS_JOGOS, metricas
+from src.pipeline import PipelineSorteios
+from src.pool_navegadores import PoolNavegadores
 
 
-class LoteriasCaixa:
+@cache
+def resolver_chromedriver():
     """
-    Classe para automatizar a coleta de dados dos sorteios da Loteria Caixa.
+    Retorna o caminho do chromedriver, resolvendo-o uma única vez por processo.
+
+    Usa config.caminho_chromedriver se estiver definido; caso contrário, consulta o
+    webdriver-manager, que só é importado (e só acessa a rede) neste momento.
+
+    :return: Caminho do executável do chromedriver.
     """
+    if config.caminho_chromedriver:
+        return config.caminho_chromedriver
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    with metricas.medir("resolver_chromedriver", jogo=TODOS_JOGOS):
+        return ChromeDriverManager().install()
+
 
-    url = config.url
+def _padroes_extensoes(*extensoes):
+    return tuple(padrao for ext in extensoes for padrao in (f"*.{ext}", f"*.{ext}?*"))
 
-    options = Options()
 
-    service = Service(executable_path=ChromeDriverManager().install())
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
+class LoteriasCaixa:
+    """
+    Classe para automatizar a coleta de dados dos sorteios de um jogo da Loteria Caixa.
+    """
+
+    # padrões de URL bloqueados por tipo de recurso (ver config.bloquear_recursos)
+    padroes_bloqueados = {
+        "imagens": _padroes_extensoes("png", "jpg", "jpeg", "gif", "svg", "webp", "ico"),
+        "fontes": _padroes_extensoes("woff", "woff2", "ttf", "otf", "eot"),
+        "css": _padroes_extensoes("css"),
+        "analytics": (
+            "*google-analytics.com*",
+            "*googletagmanager.com*",
+            "*doubleclick.net*",
+            "*facebook.net*",
+            "*hotjar.com*",
+            "*clarity.ms*",
+        ),
+    }
+
+    # erros de um sorteio específico: depois das tentativas, o sorteio é registrado como falha e
+    # pulado; os demais WebDriverException indicam que a sessão do navegador caiu
+    erros_sorteio = (
+        NoSuchElementException,
+        StaleElementReferenceException,
+        ElementClickInterceptedException,
+        TimeoutException,
+        ValueError,
+    )
 
     locators = {
         "loading": (By.XPATH, '//*[@id="loading"]/div'),
@@ -46,14 +95,52 @@ class LoteriasCaixa:
         ),
         "imput_nr_sorteio": (By.XPATH, '//*[@id="buscaConcurso"]'),
         "local": (By.XPATH, '//*[@id="wp_resultados"]/div[2]/div/div/p'),
-        "seis_acertos": (By.XPATH, '//*[@id="wp_resultados"]/div[3]/div/p[1]'),
-        "seis_acertos2": (By.XPATH, '//*[@id="wp_resultados"]/div[3]/div[2]/p[1]'),
-        "cinco_acertos": (By.XPATH, '//*[@id="wp_resultados"]/div[3]/div/p[2]'),
-        "cinco_acertos2": (By.XPATH, '//*[@id="wp_resultados"]/div[3]/div[2]/p[2]'),
-        "quatro_acertos": (By.XPATH, '//*[@id="wp_resultados"]/div[3]/div/p[3]'),
-        "quatro_acertos2": (By.XPATH, '//*[@id="wp_resultados"]/div[3]/div[2]/p[3]'),
     }
 
+    # XPath do texto da faixa de premiação (posição na lista de faixas, a partir de 1) de cada
+    # sorteio do concurso: o bloco de premiação do primeiro sorteio é o div[3] e o do segundo, o div[4]
+    xpath_faixa = '//*[@id="wp_resultados"]/div[{bloco}]/div/p[{posicao}]'
+    xpath_faixa2 = '//*[@id="wp_resultados"]/div[{bloco}]/div[2]/p[{posicao}]'
+
+    def __init__(self, jogo=None, diretorio_perfil=None):
+        """
+        :param jogo: Nome ou definição do jogo coletado (padrão é a Mega-Sena).
+        :param diretorio_perfil: Diretório do perfil do Chrome (padrão é config.diretorio_perfil).
+        """
+        self.jogo = obter_jogo(jogo)
+        self.url = self.jogo.url
+        self.locators = self.montar_locators(self.jogo)
+        self.repository = None
+        self.pipeline = None
+        # navegador aberto pelo último reiniciar_navegador, para voltar ao pool se a coleta falhar
+        self.navegador = None
+        self.ultimo_coletado = None
+        self.reinicios = 0
+        self.diretorio_perfil = diretorio_perfil or config.diretorio_perfil
+        caminho_arquivo = self.jogo.caminho_proprio(config.caminho_arquivo)
+        self.arquivo = ArquivoSorteios(caminho_arquivo) if caminho_arquivo else None
+
+    @classmethod
+    def montar_locators(cls, jogo):
+        """
+        Monta a tabela de locators de um jogo: os locators comuns da classe, os das faixas
+        de premiação de cada sorteio do concurso e os XPaths próprios do jogo.
+
+        :param jogo: Definição do jogo.
+        :return: Dicionário {campo: (By.XPATH, xpath)}.
+        """
+        locators = dict(cls.locators)
+        for bloco, sufixo in enumerate(jogo.sufixos, start=3):
+            for posicao, faixa in enumerate(jogo.faixas, start=1):
+                locators[f"{faixa}_acertos{sufixo}"] = (
+                    By.XPATH, cls.xpath_faixa.format(bloco=bloco, posicao=posicao)
+                )
+                locators[f"{faixa}_acertos{sufixo}2"] = (
+                    By.XPATH, cls.xpath_faixa2.format(bloco=bloco, posicao=posicao)
+                )
+        locators.update((campo, (By.XPATH, xpath)) for campo, xpath in jogo.xpaths.items())
+        return locators
+
     def find_element(
         self, driver, locator, timer=10, condition=EC.presence_of_element_located
     ):
@@ -82,23 +169,76 @@ class LoteriasCaixa:
         """
         return WebDriverWait(driver, timer).until(condition(locator))
 
+    def criar_opcoes(self):
+        """
+        Monta as opções do Chrome conforme a configuração: headless, estratégia de
+        carregamento, bloqueio de imagens e diretório de perfil.
+
+        :return: Instância de Options.
+        """
+        options = Options()
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.page_load_strategy = config.estrategia_carregamento
+        if config.navegador_headless:
+            options.add_argument('--headless=new')
+            options.add_argument('--window-size=1920,1080')
+        if "imagens" in config.bloquear_recursos:
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+        if self.diretorio_perfil:
+            options.add_argument(f'--user-data-dir={Path(self.diretorio_perfil).resolve()}')
+        return options
+
+    def bloquear_recursos(self, driver):
+        """
+        Bloqueia pelo DevTools as requisições dos tipos de recurso em config.bloquear_recursos.
+
+        :param driver: Instância do driver do Selenium.
+        """
+        padroes = [
+            padrao for tipo in config.bloquear_recursos for padrao in self.padroes_bloqueados[tipo]
+        ]
+        if padroes:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+
     def abrir_navegador(self):
         """
-        Abre uma nova instância do navegador Chrome e a maximiza.
+        Abre uma nova instância do navegador Chrome (maximizada, se não for headless)
+        e registra o tempo de inicialização.
 
         :return: Instância do driver do Selenium.
         """
-        driver = Chrome(service=self.service, options=self.options)
-        driver.maximize_window()
+        service = Service(executable_path=resolver_chromedriver())
+        inicio = perf_counter()
+        driver = Chrome(service=service, options=self.criar_opcoes())
+        if not config.navegador_headless:
+            driver.maximize_window()
+        self.bloquear_recursos(driver)
+        duracao = perf_counter() - inicio
+        metricas.observar("abrir_navegador", duracao, jogo=self.jogo.nome)
+        logging.info("navegador aberto em %.0f ms", 1000 * duracao)
         return driver
 
     def acessar_site_loterias_caixa(self, driver):
         """
-        Acessa o site da Loteria Caixa no navegador.
+        Acessa a página de resultados do jogo no navegador e registra o tempo de carregamento.
 
         :param driver: Instância do driver do Selenium.
         """
+        inicio = perf_counter()
         driver.get(self.url)
+        duracao = perf_counter() - inicio
+        metricas.observar("acessar_site", duracao, jogo=self.jogo.nome)
+        dom_carregado = driver.execute_script(extracao.SCRIPT_CARREGAMENTO)
+        if dom_carregado:
+            metricas.observar("dom_content_loaded", dom_carregado / 1000, jogo=self.jogo.nome)
+        logging.info(
+            "página da %s carregada em %.0f ms (DOMContentLoaded em %.0f ms)",
+            self.jogo.titulo, 1000 * duracao, dom_carregado or 0,
+        )
 
     def coletar_nr_sorteio(self, driver):
         """
@@ -110,32 +250,85 @@ class LoteriasCaixa:
         texto_sorteio = self.find_element(
             driver, self.locators["numero_do_sorteio"]
         ).text.strip()
-        valor = int(
-            texto_sorteio[texto_sorteio.index(" ") + 1 : texto_sorteio.index("(") - 1]
-        )
-        return valor
+        return extracao.extrair_nr_sorteio(texto_sorteio)
 
     def esperar_loading(self, driver):
-        sleep(0.5)
-        self.find_element(driver, self.locators["loading"], timer=60, condition=EC.invisibility_of_element)
+        """
+        Espera o overlay de loading desaparecer.
 
-    def navegar_para_primeiro_sorteio(self, driver):
+        :param driver: Instância do driver do Selenium.
         """
-        Navega para a página do sorteio de número 1.
+        with metricas.medir("esperar_loading", jogo=self.jogo.nome):
+            WebDriverWait(driver, 60, poll_frequency=config.intervalo_espera).until(
+                EC.invisibility_of_element(self.locators["loading"])
+            )
+
+    def esperar_sorteio(self, driver, condicao, timer=60):
+        """
+        Espera a transição de página: consulta o título do sorteio e o loading em
+        intervalos curtos até o loading sumir e o número exibido satisfazer a condição.
 
         :param driver: Instância do driver do Selenium.
+        :param condicao: Função que recebe o número exibido e retorna True quando a transição terminou.
+        :param timer: Tempo máximo para aguardar (padrão é 60 segundos).
+        :return: O número do sorteio exibido.
+        """
+        xpath_numero = self.locators["numero_do_sorteio"][1]
+        xpath_loading = self.locators["loading"][1]
+
+        def transicao_concluida(driver):
+            texto, carregando = driver.execute_script(
+                extracao.SCRIPT_ESTADO, xpath_numero, xpath_loading
+            )
+            if carregando or not texto:
+                return False
+            try:
+                nr_sorteio = extracao.extrair_nr_sorteio(texto)
+            except ValueError:
+                return False
+            return nr_sorteio if condicao(nr_sorteio) else False
+
+        try:
+            with metricas.medir("esperar_sorteio", jogo=self.jogo.nome):
+                return WebDriverWait(driver, timer, poll_frequency=config.intervalo_espera).until(
+                    transicao_concluida
+                )
+        except TimeoutException:
+            metricas.incrementar("timeouts_transicao", jogo=self.jogo.nome)
+            raise
+
+    def navegar_para_sorteio(self, driver, nr_sorteio, tentativas=10):
+        """
+        Navega para a página de um sorteio usando o campo de busca.
+
+        :param driver: Instância do driver do Selenium.
+        :param nr_sorteio: Número do sorteio de destino.
+        :param tentativas: Quantidade de buscas antes de desistir (padrão é 10).
+        :raises TimeoutException: Se o sorteio não for exibido depois das tentativas.
         """
         ac = AC(driver)
-        while self.coletar_nr_sorteio(driver=driver) != 1:
+        for _ in range(tentativas):
+            if self.coletar_nr_sorteio(driver=driver) == nr_sorteio:
+                return
             campo = self.find_element(driver, self.locators["imput_nr_sorteio"])
             campo.click()
-            sleep(0.5)
             ac.key_down(Keys.CONTROL).send_keys("A").key_up(Keys.CONTROL).perform()
-            sleep(0.5)
-            campo.send_keys("1")
-            sleep(0.5)
+            campo.send_keys(str(nr_sorteio))
             ac.send_keys(Keys.ENTER).perform()
-            self.esperar_loading(driver=driver)
+            try:
+                self.esperar_sorteio(driver, lambda nr: nr == nr_sorteio, timer=10)
+                return
+            except TimeoutException:
+                metricas.incrementar("tentativas", etapa="busca_sorteio", jogo=self.jogo.nome)
+        raise TimeoutException(f"Sorteio {nr_sorteio} não foi exibido após {tentativas} buscas.")
+
+    def navegar_para_primeiro_sorteio(self, driver):
+        """
+        Navega para a página do sorteio de número 1.
+
+        :param driver: Instância do driver do Selenium.
+        """
+        self.navegar_para_sorteio(driver, 1)
 
     def coletar_data_sorteio(self, driver):
         """
@@ -147,7 +340,7 @@ class LoteriasCaixa:
         texto_sorteio = self.find_element(
             driver, self.locators["numero_do_sorteio"]
         ).text.strip()
-        return texto_sorteio[texto_sorteio.index("(") + 1 : texto_sorteio.index(")")]
+        return extracao.extrair_data_sorteio(texto_sorteio)
 
     def coletar_dezenas(self, driver):
         """
@@ -170,10 +363,7 @@ class LoteriasCaixa:
         local_do_sorteio = self.find_element(
             driver, self.locators["local"]
         ).text.strip()
-        try:
-            return local_do_sorteio[local_do_sorteio.index(" em ") + 4 :]
-        except ValueError:
-            return "Não informado"
+        return extracao.extrair_local(local_do_sorteio)
 
     def tratar_texto_acertos(self, texto):
         """
@@ -182,14 +372,7 @@ class LoteriasCaixa:
         :param texto: O texto que contém informações sobre ganhadores e prêmios.
         :return: Uma tupla contendo a quantidade de ganhadores e o valor do prêmio.
         """
-        texto = texto[texto.index("\n") + 1 :]
-        if texto == "Não houve ganhadores":
-            return 0, 0.0
-        qtd_ganhadores = int(texto[: texto.index(" ")].replace(".", ""))
-        premio = float(
-            texto[texto.rindex(" ") + 1 :].replace(".", "").replace(",", ".")
-        )
-        return qtd_ganhadores, premio
+        return extracao.tratar_texto_acertos(texto)
 
     def coletar_ganhadores_premio(self, driver, locator, locator2):
         """
@@ -205,44 +388,195 @@ class LoteriasCaixa:
             texto = self.find_element(driver, locator=locator2).text.strip()
         return self.tratar_texto_acertos(texto)
 
+    def coletar_campos_por_script(self, driver):
+        """
+        Lê os textos de todos os campos do sorteio atual com uma única chamada execute_script.
+
+        :param driver: Instância do driver do Selenium.
+        :return: Dicionário {campo: [textos]} com as chaves de extracao.campos_extracao(jogo).
+        """
+        xpaths = {campo: self.locators[campo][1] for campo in extracao.campos_extracao(self.jogo)}
+        return driver.execute_script(extracao.SCRIPT_EXTRACAO, xpaths)
+
+    def coletar_campos_por_elemento(self, driver):
+        """
+        Lê os textos dos campos do sorteio atual com uma busca do WebDriver para cada elemento.
+
+        :param driver: Instância do driver do Selenium.
+        :return: Dicionário {campo: [textos]} no mesmo formato de coletar_campos_por_script.
+        """
+        campos = {
+            "numero_do_sorteio": [
+                self.find_element(driver, self.locators["numero_do_sorteio"]).text.strip()
+            ],
+            "local": [self.find_element(driver, self.locators["local"]).text.strip()],
+        }
+        for sufixo in self.jogo.sufixos:
+            campos[f"dezenas{sufixo}"] = [
+                i.text.strip() for i in self.find_elements(driver, self.locators[f"dezenas{sufixo}"])
+            ]
+            for faixa in self.jogo.faixas:
+                chave = f"{faixa}_acertos{sufixo}"
+                texto = self.find_element(driver, self.locators[chave]).text.strip()
+                campos[chave] = [texto]
+                if "\n" not in texto:
+                    campos[f"{chave}2"] = [
+                        self.find_element(driver, self.locators[f"{chave}2"]).text.strip()
+                    ]
+        return campos
+
     def coletar_valores(self, driver):
-        nr_sorteio_atual = self.coletar_nr_sorteio(driver=driver)
-        data_sorteio = self.coletar_data_sorteio(driver=driver)
-        virada = True if data_sorteio.startswith("31/12") and int(data_sorteio[-4:]) >= 2008 else False
-        dezenas = self.coletar_dezenas(driver=driver)
-        local_do_sorteio = self.coletar_local(driver=driver)
-        qtd_6, premio_6 = self.coletar_ganhadores_premio(
-            driver, self.locators["seis_acertos"], self.locators["seis_acertos2"]
-        )
-        qtd_5, premio_5 = self.coletar_ganhadores_premio(
-            driver, self.locators["cinco_acertos"], self.locators["cinco_acertos2"]
-        )
-        qtd_4, premio_4 = self.coletar_ganhadores_premio(
-            driver, self.locators["quatro_acertos"], self.locators["quatro_acertos2"]
-        )
-        return (
-            nr_sorteio_atual,
-            virada,
-            data_sorteio,
-            dezenas,
-            local_do_sorteio,
-            qtd_6,
-            premio_6,
-            qtd_5,
-            premio_5,
-            qtd_4,
-            premio_4,
-        )
+        """
+        Coleta os valores do sorteio atual pelo script de extração e, se ele falhar,
+        pelo caminho elemento a elemento. Registra a latência de cada modo nas métricas
+        e guarda os textos lidos no arquivo de páginas antes de convertê-los.
+
+        :param driver: Instância do driver do Selenium.
+        :return: Tupla com os valores do sorteio.
+        """
+        if config.extracao_por_script:
+            inicio = perf_counter()
+            try:
+                campos = self.coletar_campos_por_script(driver)
+                self.arquivar_campos(campos)
+                valores = extracao.montar_valores(campos, self.jogo)
+                metricas.observar("coletar_valores", perf_counter() - inicio, modo="script", jogo=self.jogo.nome)
+                return valores
+            except (WebDriverException, ValueError, KeyError, TypeError, AttributeError, IndexError):
+                metricas.incrementar("fallbacks_extracao", jogo=self.jogo.nome)
+        inicio = perf_counter()
+        campos = self.coletar_campos_por_elemento(driver)
+        self.arquivar_campos(campos)
+        valores = extracao.montar_valores(campos, self.jogo)
+        metricas.observar("coletar_valores", perf_counter() - inicio, modo="elemento", jogo=self.jogo.nome)
+        return valores
+
+    def arquivar_campos(self, campos):
+        """
+        Guarda os textos de uma página no arquivo de páginas, pelo número do sorteio lido
+        sem converter os demais campos: uma página que o parser não entende fica arquivada
+        para ser recuperada por src.reparse depois da correção.
+
+        :param campos: Dicionário {campo: [textos]} no formato de coletar_campos_por_script.
+        :return: O número do sorteio.
+        """
+        nr_sorteio = extracao.verificar_campos(campos, self.jogo)
+        if self.arquivo is not None:
+            self.arquivo.salvar(nr_sorteio, campos)
+        return nr_sorteio
+
+    def coletar_campos(self, driver):
+        """
+        Lê os textos do sorteio atual sem convertê-los, para o pipeline: pelo script de
+        extração e, se ele falhar ou vier incompleto, elemento a elemento.
+
+        :param driver: Instância do driver do Selenium.
+        :return: Tupla (nr_sorteio, campos), com campos no formato de coletar_campos_por_script.
+        """
+        if config.extracao_por_script:
+            inicio = perf_counter()
+            try:
+                campos = self.coletar_campos_por_script(driver)
+                nr_sorteio = extracao.verificar_campos(campos, self.jogo)
+                metricas.observar("coletar_valores", perf_counter() - inicio, modo="script", jogo=self.jogo.nome)
+                return nr_sorteio, campos
+            except (WebDriverException, ValueError, KeyError, TypeError, IndexError):
+                metricas.incrementar("fallbacks_extracao", jogo=self.jogo.nome)
+        inicio = perf_counter()
+        campos = self.coletar_campos_por_elemento(driver)
+        nr_sorteio = extracao.verificar_campos(campos, self.jogo)
+        metricas.observar("coletar_valores", perf_counter() - inicio, modo="elemento", jogo=self.jogo.nome)
+        return nr_sorteio, campos
+
+    def coletar_sorteio_atual(self, driver):
+        """
+        Coleta o sorteio atual e o encaminha para gravação: pelo pipeline, se houver um
+        ativo, ou pelo buffer do repositório.
+
+        :param driver: Instância do driver do Selenium.
+        :return: O número do sorteio coletado.
+        """
+        if self.pipeline is None:
+            valores = self.coletar_valores(driver=driver)
+            self.inserir_no_db(extracao.montar_dicionario(valores, self.jogo))
+            return valores[0]
+        nr_sorteio, campos = self.coletar_campos(driver)
+        self.pipeline.enviar(campos)
+        return nr_sorteio
+
+    def relatar_latencias(self):
+        """
+        Registra no log a latência média de extração por sorteio em cada modo.
+        """
+        for modo in ("script", "elemento"):
+            histograma = metricas.histograma("coletar_valores", modo=modo, jogo=self.jogo.nome)
+            if histograma is not None:
+                logging.info(
+                    "extração por %s: %d sorteios, %.1f ms/sorteio",
+                    modo, histograma.quantidade, 1000 * histograma.soma / histograma.quantidade,
+                )
+
+    def obter_repositorio(self):
+        """
+        Retorna o repositório do banco de dados, criando-o na primeira chamada.
+
+        :return: Instância de DbSorteios do jogo, reaproveitada durante toda a coleta.
+        """
+        if self.repository is None:
+            self.repository = DbSorteios(
+                criar_engine(config.caminho_db),
+                tamanho_lote=config.tamanho_lote,
+                caminho_colunar=config.caminho_colunar if self.jogo is MEGA_SENA else None,
+                jogo=self.jogo,
+            )
+        return self.repository
+
+    def coletar_intervalos_pendentes(self, mais_recente):
+        """
+        Consulta o banco de dados e retorna os intervalos de sorteios que ainda faltam,
+        deixando de fora os sorteios do registro de falhas, que ficam para
+        coletar_falhas_vencidas.
+
+        :param mais_recente: O número do sorteio mais recente.
+        :return: Lista de tuplas (inicio, fim) a serem coletadas.
+        """
+        repository = self.obter_repositorio()
+        falhas = [falha["nr_sorteio"] for falha in repository.coletar_falhas()]
+        return repository.coletar_intervalos_faltantes(mais_recente, ignorar=falhas)
+
+    def intervalos_de_falhas_vencidas(self, mais_recente, agora=None):
+        """
+        Lista os sorteios do registro de falhas cujo backoff já passou, um intervalo por sorteio.
+
+        :param mais_recente: O número do sorteio mais recente.
+        :param agora: Momento atual em epoch (padrão é time()).
+        :return: Lista de tuplas (nr_sorteio, nr_sorteio).
+        """
+        return [
+            (falha["nr_sorteio"], falha["nr_sorteio"])
+            for falha in self.obter_repositorio().coletar_falhas(vencidas_ate=time() if agora is None else agora)
+            if falha["nr_sorteio"] <= mais_recente
+        ]
+
+    def coletar_falhas_vencidas(self, pool, mais_recente):
+        """
+        Tenta de novo, um a um, os sorteios do registro de falhas cujo backoff já passou.
+
+        :param pool: PoolNavegadores de onde o navegador é emprestado, se houver o que coletar.
+        :param mais_recente: O número do sorteio mais recente.
+        """
+        intervalos = self.intervalos_de_falhas_vencidas(mais_recente)
+        if intervalos:
+            logging.info("%s: tentando de novo %d sorteios com falha", self.jogo.nome, len(intervalos))
+            self.coletar_shard(pool, intervalos)
 
     def inserir_no_db(self, dicionario):
         """
-        Insere os dados coletados no banco de dados SQLite.
+        Acumula os dados coletados para gravação em lote no banco de dados SQLite.
 
         :param dicionario: Um dicionário contendo os dados a serem inseridos no banco de dados.
         """
-        engine = create_engine(f"sqlite:///{config.caminho_db}", future=True)
-        repository = DbSorteios(engine)
-        repository.create(dicionario)
+        self.obter_repositorio().adicionar(dicionario)
 
     def navegar_para_o_proximo(self, driver, anterior):
         """
@@ -250,73 +584,61 @@ class LoteriasCaixa:
 
         :param driver: Instância do driver do Selenium.
         :anterior: Último número de sorteio que foi coletado
+        :raises TimeoutException: Se a página não mudar depois de 10 cliques.
         """
-        while self.coletar_nr_sorteio(driver=driver) == anterior:
+        for _ in range(10):
+            if self.coletar_nr_sorteio(driver=driver) != anterior:
+                return
             for i in range (10):
                 try:
                     self.find_element(driver, self.locators["btn_proximo"]).click()
                     break
                 except ElementClickInterceptedException:
+                    metricas.incrementar("tentativas", etapa="clique_proximo", jogo=self.jogo.nome)
                     if i == 9:
                         raise
-                    sleep(0.5)
-            self.esperar_loading(driver=driver)
+                    self.esperar_loading(driver=driver)
+            try:
+                self.esperar_sorteio(driver, lambda nr: nr != anterior)
+                return
+            except TimeoutException:
+                continue
+        raise TimeoutException(f"A página não saiu do sorteio {anterior} após 10 cliques.")
 
     def scrapping(self, driver, limite):
         """
-        Coleta dados dos sorteios e insere no banco de dados.
+        Coleta dados dos sorteios e insere no banco de dados, guardando em ultimo_coletado
+        o último sorteio coletado.
 
         :param driver: Instância do driver do Selenium.
-        :param sorteio_mais_recente: O número do sorteio mais recente.
-        :param sorteio_inicial: O número do sorteio inicial a ser coletado.
+        :param limite: O número do último sorteio a ser coletado.
         """
         while True:
+            inicio = perf_counter()
             for i in range(10):  # tenta 10x caso encontre algum erro
                 try:
-                    (
-                        nr_sorteio,
-                        virada,
-                        data_sorteio,
-                        dezenas,
-                        local_do_sorteio,
-                        qtd_6,
-                        premio_6,
-                        qtd_5,
-                        premio_5,
-                        qtd_4,
-                        premio_4,
-                    ) = self.coletar_valores(driver=driver)
+                    nr_sorteio = self.coletar_sorteio_atual(driver)
+                    self.ultimo_coletado = nr_sorteio
                     break
                 except (
                     NoSuchElementException,
                     StaleElementReferenceException,
                     TimeoutException,
                 ):
+                    metricas.incrementar("tentativas", etapa="coletar_valores", jogo=self.jogo.nome)
                     if i == 9:
                         raise
                     continue
 
-            self.inserir_no_db(
-                {
-                    "nr_sorteio": nr_sorteio,
-                    "mega_da_virada": virada,
-                    "data_sorteio": data_sorteio,
-                    "dezenas": dezenas,
-                    "local_do_sorteio": local_do_sorteio,
-                    "ganhadores_seis_dezenas": qtd_6,
-                    "premio_seis_dezenas": premio_6,
-                    "ganhadores_cinco_dezenas": qtd_5,
-                    "premio_cinco_dezenas": premio_5,
-                    "ganhadores_quatro_dezenas": qtd_4,
-                    "premio_quatro_dezenas": premio_4,
-                }
-            )
-
+            if nr_sorteio != limite:
+                self.navegar_para_o_proximo(driver, nr_sorteio)
+            duracao = perf_counter() - inicio
+            logging.info("%s %d: %.0f ms", self.jogo.nome, nr_sorteio, 1000 * duracao)
+            metricas.observar("sorteio", duracao, jogo=self.jogo.nome)
+            metricas.incrementar("sorteios_coletados", jogo=self.jogo.nome)
             if nr_sorteio == limite:
                 break
 
-            self.navegar_para_o_proximo(driver, nr_sorteio)
-
     def fechar_navegador(self, driver):
         """
         Fecha o navegador Chrome.
@@ -325,13 +647,262 @@ class LoteriasCaixa:
         """
         driver.quit()
 
-    def coletar_dados(self):
+    def reiniciar_navegador(self, driver, erro):
+        """
+        Substitui um navegador cuja sessão caiu por um novo, já na página de resultados.
+
+        :param driver: Instância do driver do Selenium com a sessão perdida (ou None).
+        :param erro: O erro que indicou a queda.
+        :raises WebDriverException: O próprio erro, se config.reinicios_navegador já foi atingido.
+        :return: Nova instância do driver do Selenium.
+        """
+        self.reinicios += 1
+        if self.reinicios > config.reinicios_navegador:
+            raise erro
+        metricas.incrementar("reinicios_navegador", jogo=self.jogo.nome)
+        logging.warning("reiniciando o navegador (%d/%d): %s", self.reinicios, config.reinicios_navegador, erro)
+        if driver is not None:
+            try:
+                self.fechar_navegador(driver)
+            except WebDriverException:
+                pass
+        self.navegador = None
+        # grava o que já foi coletado antes de arriscar uma nova sessão
+        self.obter_repositorio().descarregar()
+        driver = self.navegador = self.abrir_navegador()
+        self.acessar_site_loterias_caixa(driver)
+        return driver
+
+    def registrar_falha(self, nr_sorteio, erro):
         """
-        Orquestra o processo de coleta de dados dos sorteios da Loteria Caixa.
+        Registra no banco um sorteio que continuou falhando, com backoff para a próxima tentativa.
+
+        :param nr_sorteio: Número do sorteio.
+        :param erro: O erro (ou a mensagem do erro) da última tentativa.
         """
-        driver = self.abrir_navegador()
-        self.acessar_site_loterias_caixa(driver)
-        mais_recente = self.coletar_nr_sorteio(driver=driver)
-        self.navegar_para_primeiro_sorteio(driver)
-        self.scrapping(driver, mais_recente)
-        self.fechar_navegador(driver)
+        if isinstance(erro, Exception):
+            erro = f"{type(erro).__name__}: {getattr(erro, 'msg', None) or erro}"
+        tentativas = self.obter_repositorio().registrar_falha(
+            nr_sorteio, erro, config.backoff_falhas, config.backoff_maximo_falhas
+        )
+        metricas.incrementar("falhas_sorteio", jogo=self.jogo.nome)
+        logging.warning(
+            "%s %d falhou (%d vezes), adiado: %s", self.jogo.nome, nr_sorteio, tentativas, erro
+        )
+
+    def coletar_intervalo(self, driver, inicio, fim):
+        """
+        Coleta os sorteios de inicio a fim sem abortar por causa de um sorteio: o que
+        continuar falhando depois das tentativas de scrapping é registrado como falha e
+        pulado. Se a sessão do navegador cair, ou se config.falhas_consecutivas sorteios
+        falharem em seguida, o navegador é reiniciado e a coleta continua após o último
+        sorteio coletado.
+
+        :param driver: Instância do driver do Selenium.
+        :param inicio: Primeiro sorteio do intervalo.
+        :param fim: Último sorteio do intervalo.
+        :return: O driver em uso ao final (outro, se o navegador foi reiniciado).
+        """
+        proximo, consecutivas, queda_anterior = inicio, 0, None
+        while proximo <= fim:
+            self.ultimo_coletado = None
+            try:
+                self.navegar_para_sorteio(driver, proximo)
+                self.scrapping(driver, fim)
+                return driver
+            except self.erros_sorteio as e:
+                falho = proximo if self.ultimo_coletado is None else self.ultimo_coletado + 1
+                consecutivas = 1 if self.ultimo_coletado is not None else consecutivas + 1
+                self.registrar_falha(falho, e)
+                proximo = falho + 1
+                if consecutivas >= config.falhas_consecutivas and proximo <= fim:
+                    driver, consecutivas = self.reiniciar_navegador(driver, e), 0
+            except WebDriverException as e:
+                if self.ultimo_coletado is not None:
+                    proximo, consecutivas = self.ultimo_coletado + 1, 0
+                    queda_anterior = proximo
+                elif proximo == queda_anterior:
+                    # a sessão caiu duas vezes no mesmo sorteio: trata-o como falha do sorteio
+                    self.registrar_falha(proximo, e)
+                    proximo, queda_anterior = proximo + 1, None
+                else:
+                    queda_anterior = proximo
+                driver = self.reiniciar_navegador(driver, e)
+        return driver
+
+    def dividir_intervalos(self, intervalos, partes):
+        """
+        Divide os intervalos pendentes em shards com quantidades parecidas de sorteios.
+
+        :param intervalos: Lista de tuplas (inicio, fim) a serem coletadas.
+        :param partes: Quantidade máxima de shards.
+        :return: Lista de shards, cada um uma lista de tuplas (inicio, fim).
+        """
+        total = sum(fim - inicio + 1 for inicio, fim in intervalos)
+        if total == 0:
+            return []
+        tamanho = -(-total // partes)
+        shards, atual, ocupado = [], [], 0
+        for inicio, fim in intervalos:
+            while inicio <= fim:
+                fim_pedaco = min(fim, inicio + tamanho - ocupado - 1)
+                atual.append((inicio, fim_pedaco))
+                ocupado += fim_pedaco - inicio + 1
+                inicio = fim_pedaco + 1
+                if ocupado == tamanho:
+                    shards.append(atual)
+                    atual, ocupado = [], 0
+        if atual:
+            shards.append(atual)
+        return shards
+
+    def coletar_intervalos(self, driver, intervalos):
+        """
+        Coleta os sorteios de cada intervalo, buscando o início de cada um pelo campo de busca.
+        Com config.pipeline, o parsing e a gravação rodam em threads próprias enquanto o
+        navegador segue para o próximo sorteio.
+
+        :param driver: Instância do driver do Selenium.
+        :param intervalos: Lista de tuplas (inicio, fim) a serem coletadas.
+        :return: O driver em uso ao final (outro, se o navegador foi reiniciado).
+        """
+        if config.pipeline:
+            self.pipeline = PipelineSorteios(
+                self.obter_repositorio(),
+                arquivo=self.arquivo,
+                tamanho_fila=config.tamanho_fila,
+                tamanho_lote=config.tamanho_lote,
+                jogo=self.jogo,
+            )
+        try:
+            for inicio, fim in intervalos:
+                driver = self.coletar_intervalo(driver, inicio, fim)
+        finally:
+            if self.pipeline is not None:
+                pipeline, self.pipeline = self.pipeline, None
+                try:
+                    pipeline.fechar()
+                finally:
+                    for nr_sorteio, erro in pipeline.falhas:
+                        if nr_sorteio is not None:
+                            self.registrar_falha(nr_sorteio, erro)
+            self.obter_repositorio().descarregar()
+            self.relatar_latencias()
+        return driver
+
+    def perfil_da_vaga(self, vaga):
+        """
+        :param vaga: Vaga do navegador no pool.
+        :return: Diretório de perfil exclusivo da vaga (None se o perfil for temporário).
+        """
+        return f"{self.diretorio_perfil}_{vaga}" if self.diretorio_perfil else None
+
+    def criar_pool(self, navegadores):
+        """
+        Cria um pool de navegadores em que cada vaga tem seu próprio diretório de perfil.
+
+        :param navegadores: Quantidade máxima de navegadores abertos.
+        :return: Instância de PoolNavegadores.
+        """
+        return PoolNavegadores(
+            lambda vaga: type(self)(self.jogo, self.perfil_da_vaga(vaga)).abrir_navegador(),
+            navegadores,
+            fechar=self.fechar_navegador,
+        )
+
+    @contextmanager
+    def emprestar_navegador(self, pool):
+        """
+        Empresta um navegador do pool, já na página do jogo, junto com um coletor novo do
+        jogo para usá-lo: o estado da coleta (pipeline, buffer, reinícios) não é
+        compartilhado entre threads. Se o coletor reiniciar o navegador, o novo é o que
+        volta para o pool.
+
+        :param pool: Instância de PoolNavegadores.
+        :return: Gerenciador de contexto que produz a tupla (coletor, emprestimo).
+        """
+        with pool.emprestar(self.url, self.jogo.nome) as emprestimo:
+            coletor = type(self)(self.jogo, self.perfil_da_vaga(emprestimo.vaga))
+            coletor.url = self.url
+            try:
+                if emprestimo.pagina != self.url:
+                    coletor.acessar_site_loterias_caixa(emprestimo.driver)
+                    emprestimo.pagina = self.url
+                yield coletor, emprestimo
+            except BaseException:
+                emprestimo.driver = coletor.navegador or emprestimo.driver
+                raise
+
+    def consultar_mais_recente(self, pool):
+        """
+        Lê o número do sorteio mais recente do jogo com um navegador do pool.
+
+        :param pool: Instância de PoolNavegadores.
+        :return: Número do sorteio mais recente.
+        """
+        with self.emprestar_navegador(pool) as (coletor, emprestimo):
+            return coletor.coletar_nr_sorteio(driver=emprestimo.driver)
+
+    def coletar_shard(self, pool, intervalos):
+        """
+        Coleta um shard com um navegador do pool e um repositório próprio.
+
+        :param pool: Instância de PoolNavegadores.
+        :param intervalos: Lista de tuplas (inicio, fim) do shard.
+        """
+        with self.emprestar_navegador(pool) as (coletor, emprestimo):
+            emprestimo.driver = coletor.coletar_intervalos(emprestimo.driver, intervalos)
+
+    def coletar_dados(self, navegadores=None):
+        """
+        Orquestra o processo de coleta de dados dos sorteios do jogo: coleta os sorteios
+        que faltam no banco e, no fim, tenta de novo os que falharam.
+
+        :param navegadores: Quantidade de navegadores em paralelo (padrão é config.navegadores).
+        """
+        coletar_jogos([self], navegadores)
+
+
+def coletar_jogos(coletores, navegadores=None):
+    """
+    Coleta vários jogos ao mesmo tempo, com um único pool de navegadores compartilhado.
+
+    O sorteio mais recente de cada jogo é consultado primeiro; depois os sorteios que
+    faltam de cada jogo são divididos em shards, que são intercalados entre os jogos para
+    que todos avancem juntos, e por fim os sorteios com falha vencida são tentados de novo.
+    O erro de um shard não interrompe os demais: ele é registrado no log e levantado
+    quando todos terminarem, sem a etapa das falhas vencidas.
+
+    :param coletores: Instâncias de LoteriasCaixa, uma por jogo.
+    :param navegadores: Quantidade máxima de navegadores abertos (padrão é config.navegadores).
+    """
+    navegadores = navegadores or config.navegadores
+    with coletores[0].criar_pool(navegadores) as pool, ThreadPoolExecutor(navegadores) as executor:
+
+        def executar(tarefas):
+            futuros = [executor.submit(tarefa, *args) for tarefa, *args in tarefas]
+            wait(futuros)
+            erros = [futuro.exception() for futuro in futuros if futuro.exception() is not None]
+            for erro in erros:
+                logging.error("erro na coleta: %r", erro)
+            if erros:
+                raise erros[0]
+            return [futuro.result() for futuro in futuros]
+
+        mais_recentes = executar(
+            (coletor.consultar_mais_recente, pool) for coletor in coletores
+        )
+        shards = [
+            [
+                (coletor.coletar_shard, pool, shard)
+                for shard in coletor.dividir_intervalos(
+                    coletor.coletar_intervalos_pendentes(mais_recente), navegadores
+                )
+            ]
+            for coletor, mais_recente in zip(coletores, mais_recentes)
+        ]
+        executar(tarefa for tarefa in chain.from_iterable(zip_longest(*shards)) if tarefa)
+        executar(
+            (coletor.coletar_falhas_vencidas, pool, mais_recente)
+            for coletor, mais_recente in zip(coletores, mais_recentes)
+        )
@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from src.database import DbSorteios, criar_engine
+from src.config import config
+from src.extracao import eh_mega_da_virada
+from src.jogos import MEGA_SENA, obter_jogo
+from src.metricas import metricas
+
+
+class SessoesHttp:
+    """
+    Pool de threads das requisições de uma coleta, com uma requests.Session por thread:
+    a Session guarda cookies e o estado dos adaptadores a cada requisição e não é segura
+    para uso simultâneo por várias threads.
+    """
+
+    def __init__(self, criar_sessao, threads):
+        """
+        :param criar_sessao: Função sem argumentos que cria a sessão de cada thread.
+        :param threads: Quantidade de threads do pool.
+        """
+        self.criar_sessao = criar_sessao
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="coleta-http")
+        self._local = threading.local()
+        self._sessoes = []
+        self._trava = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def atual(self):
+        """
+        :return: A sessão da thread atual, criada no primeiro uso.
+        """
+        sessao = getattr(self._local, "sessao", None)
+        if sessao is None:
+            sessao = self._local.sessao = self.criar_sessao()
+            with self._trava:
+                self._sessoes.append(sessao)
+        return sessao
+
+    def get(self, url, **kwargs):
+        """
+        Faz um GET pela sessão da thread atual, com a assinatura de requests.Session.get.
+        """
+        return self.atual().get(url, **kwargs)
+
+    def close(self):
+        """
+        Espera as requisições em andamento, encerra o pool e fecha as sessões.
+        """
+        self.executor.shutdown(wait=True)
+        with self._trava:
+            sessoes, self._sessoes = self._sessoes, []
+        for sessao in sessoes:
+            sessao.close()
+
+
+class LoteriasCaixaHttp:
+    """
+    Classe para coletar os sorteios de um jogo pela API JSON da Caixa, sem navegador.
+    """
+
+    repository = None
+
+    # lista de dezenas da API de cada sorteio do concurso, pelo sufixo das colunas
+    chaves_dezenas = {"": "listaDezenas", "_segundo": "listaDezenasSegundoSorteio"}
+
+    def __init__(self, url_api=None, concorrencia=None, tentativas=None, backoff=None, jogo=None):
+        """
+        :param url_api: URL base da API (padrão é a do jogo).
+        :param concorrencia: Máximo de requisições simultâneas.
+        :param tentativas: Quantidade de tentativas por sorteio.
+        :param backoff: Espera inicial, em segundos, entre as tentativas (dobra a cada falha).
+        :param jogo: Nome ou definição do jogo coletado (padrão é a Mega-Sena).
+        """
+        self.jogo = obter_jogo(jogo)
+        # faixa da API (numeradas a partir de 1, seguindo no segundo sorteio) -> colunas
+        self.faixas = dict(enumerate(self.jogo.colunas_premiacao(), start=1))
+        self.url_api = (url_api or self.jogo.url_api).rstrip("/")
+        self.concorrencia = concorrencia or config.requisicoes_simultaneas
+        self.tentativas = tentativas or config.tentativas_http
+        self.backoff = config.backoff_http if backoff is None else backoff
+
+    def criar_sessao(self):
+        """
+        Cria a sessão HTTP de uma thread, com uma conexão persistente.
+
+        :return: Instância de requests.Session.
+        """
+        sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        sessao.mount("http://", adaptador)
+        sessao.mount("https://", adaptador)
+        sessao.headers["Accept"] = "application/json"
+        return sessao
+
+    def abrir_sessoes(self):
+        """
+        Cria o pool de threads e sessões de uma coleta, com self.concorrencia threads.
+
+        :return: Instância de SessoesHttp, a ser fechada ao fim da coleta.
+        """
+        return SessoesHttp(self.criar_sessao, self.concorrencia)
+
+    def buscar_json(self, sessao, nr_sorteio=None):
+        """
+        Faz a requisição de um sorteio na API.
+
+        :param sessao: Sessão HTTP (requests.Session ou SessoesHttp).
+        :param nr_sorteio: Número do sorteio (None para o mais recente).
+        :return: O JSON do sorteio como dicionário.
+        """
+        url = self.url_api if nr_sorteio is None else f"{self.url_api}/{nr_sorteio}"
+        with metricas.medir("requisicao_http", jogo=self.jogo.nome):
+            resposta = sessao.get(url, timeout=30)
+        resposta.raise_for_status()
+        return resposta.json()
+
+    async def buscar_sorteio(self, sessoes, semaforo, nr_sorteio):
+        """
+        Busca um sorteio no pool de threads da coleta, respeitando o limite de concorrência,
+        com novas tentativas e backoff exponencial em caso de erro.
+
+        :param sessoes: SessoesHttp da coleta.
+        :param semaforo: asyncio.Semaphore que limita as requisições simultâneas.
+        :param nr_sorteio: Número do sorteio (None para o mais recente).
+        :return: O JSON do sorteio como dicionário.
+        """
+        loop = asyncio.get_running_loop()
+        for i in range(self.tentativas):
+            try:
+                async with semaforo:
+                    return await loop.run_in_executor(sessoes.executor, self.buscar_json, sessoes, nr_sorteio)
+            except (requests.RequestException, ValueError):
+                metricas.incrementar("tentativas", etapa="requisicao_http", jogo=self.jogo.nome)
+                if i == self.tentativas - 1:
+                    raise
+                await asyncio.sleep(self.backoff * 2**i)
+
+    def tratar_local(self, dados):
+        """
+        Extrai o local do sorteio no mesmo formato de LoteriasCaixa.coletar_local.
+
+        :param dados: JSON do sorteio.
+        :return: O local do sorteio como uma string.
+        """
+        local = (dados.get("nomeMunicipioUFSorteio") or "").strip()
+        return local or "Não informado"
+
+    def montar_dicionario(self, dados):
+        """
+        Converte o JSON da API no dicionário usado por DbSorteios.create.
+
+        :param dados: JSON do sorteio.
+        :return: Dicionário com os valores do sorteio.
+        """
+        data_sorteio = dados["dataApuracao"]
+        dicionario = {"nr_sorteio": int(dados["numero"])}
+        if self.jogo.mega_da_virada:
+            dicionario["mega_da_virada"] = eh_mega_da_virada(data_sorteio)
+        dicionario["data_sorteio"] = data_sorteio
+        for sufixo in self.jogo.sufixos:
+            dicionario[f"dezenas{sufixo}"] = ", ".join(sorted(dados[self.chaves_dezenas[sufixo]]))
+        dicionario["local_do_sorteio"] = self.tratar_local(dados)
+        for coluna_ganhadores, coluna_premio in self.faixas.values():
+            dicionario[coluna_ganhadores] = 0
+            dicionario[coluna_premio] = 0.0
+        for rateio in dados.get("listaRateioPremio") or []:
+            colunas = self.faixas.get(rateio.get("faixa"))
+            if colunas is None:
+                continue
+            coluna_ganhadores, coluna_premio = colunas
+            ganhadores = int(rateio.get("numeroDeGanhadores") or 0)
+            dicionario[coluna_ganhadores] = ganhadores
+            dicionario[coluna_premio] = (
+                float(rateio.get("valorPremio") or 0.0) if ganhadores else 0.0
+            )
+        return dicionario
+
+    async def coletar_sorteios(self, sessoes, numeros):
+        """
+        Coleta concorrentemente uma lista de sorteios. Um sorteio que falha depois de todas
+        as tentativas é registrado no registro de falhas em vez de interromper os demais.
+
+        :param sessoes: SessoesHttp da coleta.
+        :param numeros: Números dos sorteios.
+        :return: Lista de dicionários dos sorteios coletados, na ordem de numeros.
+        """
+        semaforo = asyncio.Semaphore(self.concorrencia)
+        resultados = await asyncio.gather(
+            *(self.buscar_sorteio(sessoes, semaforo, nr_sorteio) for nr_sorteio in numeros),
+            return_exceptions=True,
+        )
+        dicionarios = []
+        for nr_sorteio, dados in zip(numeros, resultados):
+            try:
+                if isinstance(dados, Exception):
+                    raise dados
+                dicionarios.append(self.montar_dicionario(dados))
+            except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+                self.registrar_falha(nr_sorteio, e)
+        return dicionarios
+
+    async def coletar_intervalos(self, sessoes, intervalos):
+        """
+        Coleta concorrentemente os sorteios de uma lista de intervalos.
+
+        :param sessoes: SessoesHttp da coleta.
+        :param intervalos: Lista de tuplas (inicio, fim), inclusivas.
+        :return: Lista de dicionários ordenada pelo número do sorteio.
+        """
+        numeros = [nr for inicio, fim in intervalos for nr in range(inicio, fim + 1)]
+        return await self.coletar_sorteios(sessoes, numeros)
+
+    async def coletar_nr_mais_recente(self, sessoes):
+        """
+        Coleta o número do sorteio mais recente, com as mesmas tentativas e backoff dos sorteios.
+
+        :param sessoes: SessoesHttp da coleta.
+        :return: Número do sorteio mais recente.
+        """
+        dados = await self.buscar_sorteio(sessoes, asyncio.Semaphore(1), None)
+        return int(dados["numero"])
+
+    def obter_repositorio(self):
+        """
+        Retorna o repositório do banco de dados, criando-o na primeira chamada.
+
+        :return: Instância de DbSorteios do jogo.
+        """
+        if self.repository is None:
+            self.repository = DbSorteios(
+                criar_engine(config.caminho_db),
+                tamanho_lote=config.tamanho_lote,
+                caminho_colunar=config.caminho_colunar if self.jogo is MEGA_SENA else None,
+                jogo=self.jogo,
+            )
+        return self.repository
+
+    def coletar_intervalos_pendentes(self, mais_recente):
+        """
+        Consulta o banco de dados e retorna os intervalos de sorteios que ainda faltam,
+        deixando de fora os sorteios com falha cujo backoff ainda não passou.
+
+        :param mais_recente: O número do sorteio mais recente.
+        :return: Lista de tuplas (inicio, fim) a serem coletadas.
+        """
+        repository = self.obter_repositorio()
+        agora = time.time()
+        adiados = [
+            falha["nr_sorteio"]
+            for falha in repository.coletar_falhas()
+            if falha["proxima_tentativa"] > agora
+        ]
+        return repository.coletar_intervalos_faltantes(mais_recente, ignorar=adiados)
+
+    def registrar_falha(self, nr_sorteio, erro):
+        """
+        Registra no banco um sorteio que continuou falhando, com backoff para a próxima tentativa.
+
+        :param nr_sorteio: Número do sorteio.
+        :param erro: O erro da última tentativa.
+        """
+        tentativas = self.obter_repositorio().registrar_falha(
+            nr_sorteio, f"{type(erro).__name__}: {erro}", config.backoff_falhas, config.backoff_maximo_falhas
+        )
+        metricas.incrementar("falhas_sorteio", jogo=self.jogo.nome)
+        logging.warning(
+            "%s %d falhou (%d vezes), adiado: %s", self.jogo.nome, nr_sorteio, tentativas, erro
+        )
+
+    def inserir_no_db(self, dicionarios):
+        """
+        Insere os dados coletados no banco de dados SQLite em uma única transação.
+
+        :param dicionarios: Lista de dicionários a serem inseridos no banco de dados.
+        """
+        self.obter_repositorio().create_many(dicionarios)
+
+    def coletar_dados(self):
+        """
+        Orquestra a coleta via HTTP dos sorteios que ainda não estão no banco, gravando
+        a cada config.tamanho_lote sorteios para que uma interrupção perca no máximo um lote.
+        Todos os lotes usam o mesmo pool de threads e sessões, encerrado ao final.
+        """
+        with self.abrir_sessoes() as sessoes:
+            asyncio.run(self.coletar_pendentes(sessoes))
+
+    async def coletar_pendentes(self, sessoes):
+        """
+        Coleta e grava, em lotes de config.tamanho_lote, os sorteios que faltam até o mais recente.
+
+        :param sessoes: SessoesHttp da coleta.
+        """
+        mais_recente = await self.coletar_nr_mais_recente(sessoes)
+        intervalos = self.coletar_intervalos_pendentes(mais_recente)
+        numeros = [nr for inicio, fim in intervalos for nr in range(inicio, fim + 1)]
+        for i in range(0, len(numeros), config.tamanho_lote):
+            lote = numeros[i : i + config.tamanho_lote]
+            self.inserir_no_db(await self.coletar_sorteios(sessoes, lote))
@@ -0,0 +1,270 @@
+"""
+Arquivo binário colunar com os sorteios, para leitores que só precisam de arrays NumPy.
+
+Formato (little-endian):
+    cabeçalho de 64 bytes: MAGICO (8 bytes), versão (uint16), reservado (uint16),
+        quantidade de linhas (uint32), capacidade em linhas (uint32), zeros até 64 bytes;
+    uma coluna após a outra, na ordem de COLUNAS, cada uma com espaço para capacidade
+        linhas. A capacidade é múltipla de 8, então todas as colunas ficam alinhadas.
+
+O leitor abre o arquivo com mmap e expõe cada coluna como uma view NumPy sobre o
+mapeamento, sem cópia, e as páginas são compartilhadas entre os processos que abrem
+o mesmo arquivo. Sorteios novos são acrescentados no lugar, no espaço reservado pela
+capacidade, e a quantidade do cabeçalho só muda depois que as linhas estão gravadas:
+as linhas existentes nunca mudam, então um leitor aberto continua vendo as que havia
+na abertura. As demais atualizações (capacidade esgotada, regravação completa) gravam
+uma nova versão e a renomeiam sobre a anterior.
+"""
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from src.arquivo import gravar_atomico
+
+MAGICO = b"MEGACOL\x00"
+VERSAO = 1
+TAMANHO_CABECALHO = 64
+_CABECALHO = struct.Struct("<8sHHII")
+
+# (nome, tipo, largura): as colunas de 8 bytes vêm primeiro para manter o alinhamento
+COLUNAS = (
+    ("premios", np.dtype("<f8"), 3),  # seis, cinco e quatro acertos
+    ("dezenas_bitmask", np.dtype("<u8"), 1),
+    ("nr_sorteio", np.dtype("<i4"), 1),
+    ("data_ordinal", np.dtype("<i4"), 1),
+    ("ganhadores", np.dtype("<i4"), 3),  # seis, cinco e quatro acertos
+    ("mega_da_virada", np.dtype("u1"), 1),
+    ("dezenas", np.dtype("u1"), 6),
+)
+
+_FAIXAS = ("seis", "cinco", "quatro")
+
+
+def _layout(capacidade):
+    """
+    Yields:
+        tuple: (nome, tipo, largura, offset) de cada coluna para a capacidade informada.
+    """
+    offset = TAMANHO_CABECALHO
+    for nome, tipo, largura in COLUNAS:
+        yield nome, tipo, largura, offset
+        offset += capacidade * tipo.itemsize * largura
+
+
+def _capacidade_para(quantidade):
+    return max(1024, -(-quantidade // 1024) * 1024)
+
+
+def montar_colunas(linhas):
+    """
+    Converte registros da tabela sorteios em arrays no formato do arquivo colunar.
+
+    Args:
+        linhas (Iterable[Mapping]): Registros com as colunas de DataBase, incluindo
+            dezenas_bitmask e data_ordinal, em ordem crescente de nr_sorteio.
+
+    Returns:
+        dict[str, np.ndarray]: Um array por coluna de COLUNAS.
+    """
+    linhas = list(linhas)
+    return {
+        "premios": np.array(
+            [[linha[f"premio_{faixa}_dezenas"] for faixa in _FAIXAS] for linha in linhas],
+            dtype="<f8",
+        ).reshape(-1, 3),
+        "dezenas_bitmask": np.array([linha["dezenas_bitmask"] for linha in linhas], dtype="<u8"),
+        "nr_sorteio": np.array([linha["nr_sorteio"] for linha in linhas], dtype="<i4"),
+        "data_ordinal": np.array([linha["data_ordinal"] for linha in linhas], dtype="<i4"),
+        "ganhadores": np.array(
+            [[linha[f"ganhadores_{faixa}_dezenas"] for faixa in _FAIXAS] for linha in linhas],
+            dtype="<i4",
+        ).reshape(-1, 3),
+        "mega_da_virada": np.array([bool(linha["mega_da_virada"]) for linha in linhas], dtype="u1"),
+        "dezenas": np.array(
+            [[int(d) for d in linha["dezenas"].split(",")] for linha in linhas], dtype="u1"
+        ).reshape(-1, 6),
+    }
+
+
+def _serializar(colunas, capacidade):
+    quantidade = len(colunas["nr_sorteio"])
+    dados = bytearray(TAMANHO_CABECALHO)
+    dados[: _CABECALHO.size] = _CABECALHO.pack(MAGICO, VERSAO, 0, quantidade, capacidade)
+    for nome, tipo, largura, _ in _layout(capacidade):
+        coluna = np.zeros((capacidade, largura), dtype=tipo)
+        coluna[:quantidade] = np.asarray(colunas[nome], dtype=tipo).reshape(quantidade, largura)
+        dados += coluna.tobytes()
+    return bytes(dados)
+
+
+def gravar_colunar(caminho, colunas, capacidade=None):
+    """
+    Grava o arquivo colunar inteiro, substituindo o anterior de forma atômica.
+
+    Args:
+        caminho (str): Caminho do arquivo.
+        colunas (dict[str, np.ndarray]): Arrays como os de montar_colunas.
+        capacidade (int): Quantidade de linhas reservadas (padrão é o próximo múltiplo de 1024).
+    """
+    quantidade = len(colunas["nr_sorteio"])
+    capacidade = capacidade or _capacidade_para(quantidade)
+    gravar_atomico(caminho, _serializar(colunas, capacidade))
+
+
+def ler_cabecalho(dados, tamanho_arquivo=None):
+    """
+    Args:
+        dados (bytes | mmap.mmap): Conteúdo do arquivo colunar, ou só o cabeçalho.
+        tamanho_arquivo (int): Tamanho do arquivo, se dados tiver só o cabeçalho
+            (padrão é len(dados)).
+
+    Returns:
+        tuple[int, int]: Quantidade de linhas e capacidade.
+
+    Raises:
+        ValueError: Se o conteúdo não for um arquivo colunar desta versão.
+    """
+    if len(dados) < TAMANHO_CABECALHO:
+        raise ValueError("Arquivo colunar truncado.")
+    magico, versao, _, quantidade, capacidade = _CABECALHO.unpack_from(dados)
+    if magico != MAGICO or versao != VERSAO:
+        raise ValueError("Arquivo colunar com formato ou versão desconhecidos.")
+    tamanho = TAMANHO_CABECALHO + sum(capacidade * tipo.itemsize * largura for _, tipo, largura in COLUNAS)
+    if (len(dados) if tamanho_arquivo is None else tamanho_arquivo) < tamanho or quantidade > capacidade:
+        raise ValueError("Arquivo colunar truncado.")
+    return quantidade, capacidade
+
+
+def acrescentar_colunar(caminho, colunas):
+    """
+    Acrescenta linhas ao fim do arquivo colunar. Só é possível se todas as linhas novas
+    vierem depois da última linha gravada.
+
+    Com capacidade livre, as linhas são gravadas no lugar e depois a quantidade do
+    cabeçalho, com custo proporcional só às linhas novas. Sem capacidade, o arquivo é
+    regravado por completo, com o dobro das linhas de capacidade, de forma atômica: o
+    custo dessa regravação é proporcional a todo o histórico, mas amortizado entre as
+    gravações seguintes.
+
+    Args:
+        caminho (str): Caminho do arquivo.
+        colunas (dict[str, np.ndarray]): Arrays das linhas novas, em ordem crescente de nr_sorteio.
+
+    Returns:
+        bool: False se o arquivo não existe, é inválido ou as linhas estão fora de ordem;
+            nesse caso ele deve ser regravado por completo com gravar_colunar.
+    """
+    novas = len(colunas["nr_sorteio"])
+    if novas == 0:
+        return True
+    nr_novos = np.asarray(colunas["nr_sorteio"])
+    if np.any(np.diff(nr_novos) <= 0):
+        return False
+    try:
+        descritor = os.open(caminho, os.O_RDWR)
+    except OSError:
+        return False
+    try:
+        try:
+            quantidade, capacidade = ler_cabecalho(
+                os.pread(descritor, TAMANHO_CABECALHO, 0), os.fstat(descritor).st_size
+            )
+        except ValueError:
+            return False
+        offsets = {nome: offset for nome, _, _, offset in _layout(capacidade)}
+        if quantidade:
+            (ultimo,) = struct.unpack("<i", os.pread(descritor, 4, offsets["nr_sorteio"] + 4 * (quantidade - 1)))
+            if nr_novos[0] <= ultimo:
+                return False
+
+        if quantidade + novas > capacidade:
+            dados = os.pread(descritor, os.fstat(descritor).st_size, 0)
+            juntas = {
+                nome: np.concatenate([
+                    np.frombuffer(dados, dtype=tipo, count=quantidade * largura, offset=offset).reshape(
+                        quantidade, largura
+                    ),
+                    np.asarray(colunas[nome], dtype=tipo).reshape(novas, largura),
+                ])
+                for nome, tipo, largura, offset in _layout(capacidade)
+            }
+            gravar_colunar(caminho, juntas, _capacidade_para(2 * (quantidade + novas)))
+            return True
+
+        # as linhas antes do cabeçalho: um leitor que abrir o arquivo no meio da gravação
+        # ainda vê a quantidade anterior
+        for nome, tipo, largura, offset in _layout(capacidade):
+            valores = np.asarray(colunas[nome], dtype=tipo).reshape(novas, largura).tobytes()
+            os.pwrite(descritor, valores, offset + quantidade * tipo.itemsize * largura)
+        os.pwrite(descritor, _CABECALHO.pack(MAGICO, VERSAO, 0, quantidade + novas, capacidade), 0)
+        return True
+    finally:
+        os.close(descritor)
+
+
+class ArquivoColunar:
+    """
+    Leitor do arquivo colunar por mmap, com as colunas como views NumPy somente leitura.
+
+    Atributos:
+        quantidade (int): Quantidade de sorteios.
+        nr_sorteio (np.ndarray): Números dos sorteios (int32), em ordem crescente.
+        data_ordinal (np.ndarray): Datas como date.toordinal() (int32).
+        mega_da_virada (np.ndarray): 1 nos sorteios da Mega da Virada (uint8).
+        dezenas (np.ndarray): Dezenas de cada sorteio, sorteios × 6 (uint8).
+        dezenas_bitmask (np.ndarray): Máscaras de bits das dezenas (uint64).
+        ganhadores (np.ndarray): Ganhadores de seis, cinco e quatro acertos, sorteios × 3 (int32).
+        premios (np.ndarray): Prêmios de seis, cinco e quatro acertos, sorteios × 3 (float64).
+    """
+
+    def __init__(self, caminho):
+        """
+        Args:
+            caminho (str): Caminho do arquivo colunar.
+        """
+        self.caminho = Path(caminho)
+        with open(self.caminho, "rb") as arquivo:
+            self._identidade = self._identificar(os.fstat(arquivo.fileno()))
+            self._mmap = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self.quantidade, capacidade = ler_cabecalho(self._mmap)
+        for nome, tipo, largura, offset in _layout(capacidade):
+            coluna = np.frombuffer(self._mmap, dtype=tipo, count=self.quantidade * largura, offset=offset)
+            setattr(self, nome, coluna.reshape(self.quantidade, largura) if largura > 1 else coluna)
+
+    @staticmethod
+    def _identificar(estado):
+        return estado.st_ino, estado.st_size, estado.st_mtime_ns
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def __len__(self):
+        return self.quantidade
+
+    def desatualizado(self):
+        """
+        Returns:
+            bool: True se o arquivo em disco foi substituído ou recebeu linhas depois da abertura.
+        """
+        try:
+            if self._identificar(os.stat(self.caminho)) != self._identidade:
+                return True
+        except FileNotFoundError:
+            return True
+        # um acréscimo no lugar pode não mudar o mtime (resolução do relógio do sistema de
+        # arquivos), mas muda a quantidade no cabeçalho, visível pelo próprio mapeamento
+        return ler_cabecalho(self._mmap)[0] != self.quantidade
+
+    def fechar(self):
+        """
+        Libera o mapeamento. As views obtidas deste leitor não podem ser usadas depois.
+        """
+        for nome, _, _ in COLUNAS:
+            self.__dict__.pop(nome, None)
+        self._mmap.close()
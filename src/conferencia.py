@@ -0,0 +1,273 @@
+import csv
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+
+import numpy as np
+from sqlalchemy import select
+
+from src.database import DataBase, calcular_bitmask
+
+MIN_DEZENAS_APOSTA = 6
+MAX_DEZENAS_APOSTA = 15
+
+# Faixas premiadas, na ordem das colunas de premios: quadra, quina e sena.
+FAIXAS = (4, 5, 6)
+
+# MULTIPLICADORES[k, h, f] = apostas simples de 6 dezenas com FAIXAS[f] acertos contidas
+# em uma aposta de k dezenas que acertou h dezenas do sorteio.
+MULTIPLICADORES = np.array(
+    [
+        [
+            [comb(h, j) * comb(k - h, 6 - j) if h <= k else 0 for j in FAIXAS]
+            for h in range(MAX_DEZENAS_APOSTA + 1)
+        ]
+        for k in range(MAX_DEZENAS_APOSTA + 1)
+    ],
+    dtype=np.float64,
+)
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def contar_bits(valores):
+    """
+    Conta os bits ligados de cada elemento de um array uint64.
+
+    Args:
+        valores (np.ndarray): Array uint64.
+
+    Returns:
+        np.ndarray: Quantidade de bits ligados (uint8), com o mesmo formato da entrada.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(valores)
+    x = valores - ((valores >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return ((x * _H01) >> np.uint64(56)).astype(np.uint8)
+
+
+def montar_apostas(apostas):
+    """
+    Converte apostas em máscaras de bits, validando a quantidade de dezenas.
+
+    Args:
+        apostas (Iterable[Iterable[int]]): Dezenas de cada aposta.
+
+    Returns:
+        np.ndarray: Máscaras de bits (uint64) das apostas.
+    """
+    mascaras = []
+    for aposta in apostas:
+        dezenas = set(aposta)
+        if not MIN_DEZENAS_APOSTA <= len(dezenas) <= MAX_DEZENAS_APOSTA:
+            raise ValueError(f"Aposta com {len(dezenas)} dezenas distintas: {sorted(dezenas)}")
+        if min(dezenas) < 1 or max(dezenas) > 60:
+            raise ValueError(f"Aposta com dezena fora de 1 a 60: {sorted(dezenas)}")
+        mascaras.append(calcular_bitmask(dezenas))
+    return np.array(mascaras, dtype=np.uint64)
+
+
+def ler_apostas_csv(caminho, tamanho_lote=100_000):
+    """
+    Lê um CSV de apostas em lotes, sem carregar o arquivo inteiro na memória.
+
+    Cada linha tem as dezenas de uma aposta separadas por vírgula, ponto e vírgula
+    ou espaço. Linhas vazias e sem dígitos (como um cabeçalho) são ignoradas.
+
+    Args:
+        caminho (str): Caminho do arquivo CSV.
+        tamanho_lote (int): Quantidade de apostas por lote.
+
+    Yields:
+        np.ndarray: Máscaras de bits (uint64) de cada lote.
+    """
+    lote = []
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        for linha in csv.reader(arquivo, delimiter=";"):
+            dezenas = [int(d) for d in re.findall(r"\d+", " ".join(linha))]
+            if not dezenas:
+                continue
+            lote.append(dezenas)
+            if len(lote) >= tamanho_lote:
+                yield montar_apostas(lote)
+                lote = []
+    if lote:
+        yield montar_apostas(lote)
+
+
+def _conferir(mascaras_sorteios, premios, apostas):
+    acertos = contar_bits(apostas[:, None] & mascaras_sorteios[None, :])
+    # pares (aposta, sorteio) premiados são raros: o restante do cálculo usa só eles
+    linhas, colunas = np.nonzero(acertos >= FAIXAS[0])
+    qtd_acertos = acertos[linhas, colunas]
+    qtd_dezenas = contar_bits(apostas[linhas]).astype(np.intp)
+    valores = (MULTIPLICADORES[qtd_dezenas, qtd_acertos] * premios[colunas]).sum(axis=1)
+    quantidade = len(apostas)
+    return {
+        "quadras": np.bincount(linhas[qtd_acertos == 4], minlength=quantidade),
+        "quinas": np.bincount(linhas[qtd_acertos == 5], minlength=quantidade),
+        "senas": np.bincount(linhas[qtd_acertos >= 6], minlength=quantidade),
+        "premio_total": np.bincount(linhas, weights=valores, minlength=quantidade),
+    }
+
+
+def _juntar(resultados):
+    resultados = list(resultados)
+    chaves = ("quadras", "quinas", "senas", "premio_total")
+    if not resultados:
+        return {chave: np.zeros(0) for chave in chaves}
+    return {chave: np.concatenate([r[chave] for r in resultados]) for chave in chaves}
+
+
+_conferidor_processo = None
+
+
+def _iniciar_processo(mascaras_sorteios, premios):
+    global _conferidor_processo
+    _conferidor_processo = (mascaras_sorteios, premios)
+
+
+def _conferir_no_processo(apostas):
+    return _conferir(*_conferidor_processo, apostas)
+
+
+class ConferidorApostas:
+    """
+    Confere lotes de apostas contra todo o histórico de sorteios usando máscaras de bits.
+
+    Para cada aposta conta em quantos sorteios ela faria quadra, quina ou sena e
+    soma o valor histórico dos prêmios (premio_*_dezenas), desdobrando apostas de
+    7 a 15 dezenas nas apostas simples de 6 dezenas que elas contêm.
+
+    Atributos:
+        mascaras_sorteios (np.ndarray): Máscaras de bits (uint64) dos sorteios.
+        premios (np.ndarray): Prêmios de quadra, quina e sena de cada sorteio (sorteios × 3).
+    """
+
+    def __init__(self, mascaras_sorteios, premios, celulas_por_chunk=250_000):
+        """
+        Args:
+            mascaras_sorteios (array-like): Máscaras de bits dos sorteios.
+            premios (array-like): Prêmios de quadra, quina e sena de cada sorteio.
+            celulas_por_chunk (int): Limite de apostas × sorteios processados de uma vez,
+                que controla o uso de memória.
+        """
+        self.mascaras_sorteios = np.asarray(mascaras_sorteios, dtype=np.uint64)
+        self.premios = np.asarray(premios, dtype=np.float64).reshape(-1, len(FAIXAS))
+        self.celulas_por_chunk = celulas_por_chunk
+
+    @classmethod
+    def carregar(cls, repository, **kwargs):
+        """
+        Carrega as máscaras e os prêmios dos sorteios do banco.
+
+        Args:
+            repository (DbSorteios): Repositório do banco de sorteios.
+
+        Returns:
+            ConferidorApostas: Conferidor com todo o histórico.
+        """
+        stmt = select(
+            DataBase.dezenas_bitmask,
+            DataBase.premio_quatro_dezenas,
+            DataBase.premio_cinco_dezenas,
+            DataBase.premio_seis_dezenas,
+        ).order_by(DataBase.nr_sorteio)
+        with repository.engine.connect() as conn:
+            linhas = conn.execute(stmt).all()
+        mascaras = [linha[0] for linha in linhas]
+        premios = [linha[1:] for linha in linhas]
+        return cls(mascaras, premios, **kwargs)
+
+    @classmethod
+    def de_arquivo_colunar(cls, arquivo, **kwargs):
+        """
+        Carrega as máscaras e os prêmios do arquivo colunar, sem consultar o banco.
+
+        Args:
+            arquivo (ArquivoColunar): Arquivo colunar aberto.
+
+        Returns:
+            ConferidorApostas: Conferidor com todo o histórico.
+        """
+        # o arquivo guarda os prêmios de seis, cinco e quatro acertos; aqui a ordem é a de FAIXAS
+        return cls(arquivo.dezenas_bitmask, arquivo.premios[:, ::-1], **kwargs)
+
+    @property
+    def tamanho_chunk(self):
+        return max(1, self.celulas_por_chunk // max(1, len(self.mascaras_sorteios)))
+
+    def dividir(self, apostas):
+        for i in range(0, len(apostas), self.tamanho_chunk):
+            yield apostas[i : i + self.tamanho_chunk]
+
+    def resultados(self, chunks, processos=None):
+        """
+        Confere uma sequência de chunks de apostas, opcionalmente em um pool de processos.
+
+        No pool, no máximo 2 × processos chunks ficam pendentes, então chunks vindos de um
+        gerador são lidos conforme o consumo e a memória não cresce com o total de apostas.
+
+        Args:
+            chunks (Iterable[np.ndarray]): Máscaras de bits das apostas de cada chunk.
+            processos (int): Quantidade de processos (None ou 1 usa apenas o processo atual).
+
+        Yields:
+            dict: Resultado de cada chunk, na ordem de entrada.
+        """
+        if not processos or processos <= 1:
+            for chunk in chunks:
+                yield _conferir(self.mascaras_sorteios, self.premios, chunk)
+            return
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            initializer=_iniciar_processo,
+            initargs=(self.mascaras_sorteios, self.premios),
+        ) as executor:
+            pendentes = deque()
+            for chunk in chunks:
+                pendentes.append(executor.submit(_conferir_no_processo, chunk))
+                if len(pendentes) >= 2 * processos:
+                    yield pendentes.popleft().result()
+            while pendentes:
+                yield pendentes.popleft().result()
+
+    def conferir(self, apostas, processos=None):
+        """
+        Confere as apostas contra todos os sorteios.
+
+        Args:
+            apostas (np.ndarray): Máscaras de bits (uint64) das apostas, como em montar_apostas.
+            processos (int): Quantidade de processos para dividir os chunks.
+
+        Returns:
+            dict: Arrays por aposta com 'quadras', 'quinas', 'senas' (quantidade de sorteios
+                com 4, 5 e 6 acertos) e 'premio_total'.
+        """
+        apostas = np.asarray(apostas, dtype=np.uint64)
+        return _juntar(self.resultados(self.dividir(apostas), processos))
+
+    def conferir_csv(self, caminho, tamanho_lote=100_000, processos=None):
+        """
+        Confere as apostas de um CSV lendo-o em lotes.
+
+        Args:
+            caminho (str): Caminho do CSV, no formato de ler_apostas_csv.
+            tamanho_lote (int): Quantidade de apostas lidas por vez.
+            processos (int): Quantidade de processos, como em conferir.
+
+        Yields:
+            dict: Resultado de conferir para cada chunk, na ordem do arquivo.
+        """
+        chunks = (
+            chunk
+            for apostas in ler_apostas_csv(caminho, tamanho_lote)
+            for chunk in self.dividir(apostas)
+        )
+        yield from self.resultados(chunks, processos)
@@ -1,5 +1,76 @@
 class Config:
     url = r"https://loterias.caixa.gov.br/Paginas/Mega-Sena.aspx"
+    url_api = r"https://servicebus2.caixa.gov.br/portaldeloterias/api/megasena"
+    # jogos coletados (ver src/jogos.py); cada um tem suas tabelas no mesmo banco e todos
+    # compartilham os config.navegadores navegadores
+    jogos = ('megasena',)
     caminho_db = 'db_sorteios.db'
+    # cópia colunar dos sorteios para leitura por mmap (src/colunar.py), atualizada a cada gravação; None desativa
+    caminho_colunar = 'sorteios.bin'
+    # coleta só os sorteios que faltam no banco em vez de recriá-lo do zero
+    incremental = True
+    tamanho_lote = 500
+    # arquivo com os textos de cada página coletada pelo navegador, para reprocessar sem ele (None
+    # desativa); a coleta pela API JSON (coletor = 'http') não arquiva as respostas
+    caminho_arquivo = 'arquivo_sorteios'
+    # navegadores em paralelo na coleta via Selenium, cada um com um shard dos sorteios
+    navegadores = 1
+    # lê todos os campos do sorteio com um único execute_script
+    extracao_por_script = True
+    # intervalo, em segundos, entre as consultas de espera pela transição de página
+    intervalo_espera = 0.05
+    # chromedriver local; None resolve com o webdriver-manager ao abrir o primeiro navegador
+    caminho_chromedriver = None
+    navegador_headless = True
+    # 'eager' volta do driver.get no DOMContentLoaded, sem esperar imagens e outros recursos
+    estrategia_carregamento = 'eager'
+    # recursos bloqueados no navegador; 'css' também pode ser bloqueado, mas as esperas por
+    # visibilidade (loading, resultados) dependem das folhas de estilo da página real
+    bloquear_recursos = ('imagens', 'fontes', 'analytics')
+    # perfil do Chrome reaproveitado entre execuções (None usa um perfil temporário)
+    diretorio_perfil = 'perfil_chrome'
+    # parsing e gravação no banco em threads próprias, ligadas ao navegador por filas limitadas
+    pipeline = True
+    tamanho_fila = 256
+    # sorteio que continua falhando é registrado em falhas_coleta e pulado; a espera até a
+    # próxima tentativa começa em backoff_falhas segundos e dobra a cada falha, até backoff_maximo_falhas
+    backoff_falhas = 10
+    backoff_maximo_falhas = 6 * 3600
+    # falhas seguidas que fazem o navegador ser reiniciado, e reinícios por execução antes de abortar
+    falhas_consecutivas = 3
+    reinicios_navegador = 5
+    # 'navegador' (Selenium) ou 'http' (API JSON, sem navegador)
+    coletor = 'navegador'
+    requisicoes_simultaneas = 16
+    tentativas_http = 5
+    backoff_http = 0.5
+    # modo daemon (python -m src.daemon): calendário de sorteios da Mega-Sena, no horário de Brasília
+    dias_sorteio = (1, 3, 5)  # terça, quinta e sábado (0 é segunda-feira)
+    horario_sorteio = '20:00'
+    fuso_sorteio = -3  # horas em relação ao UTC
+    # sorteios especiais todo ano ('MM-DD', a Mega da Virada) e concursos extras avulsos ('AAAA-MM-DD')
+    sorteios_especiais = ('12-31',)
+    sorteios_extras = ()
+    # a página é consultada do horário do sorteio até janela_publicacao segundos depois
+    janela_publicacao = 4 * 3600
+    # atraso esperado entre o sorteio e a publicação do resultado, reajustado a cada publicação observada
+    atraso_publicacao = 30 * 60
+    # intervalo entre consultas: fator_consulta vezes a distância até a publicação esperada, entre os limites
+    fator_consulta = 0.1
+    intervalo_consulta_minimo = 10
+    intervalo_consulta_maximo = 300
+    # o daemon dorme em trechos de até intervalo_batimento segundos, atualizando o arquivo de saúde entre eles
+    intervalo_batimento = 60
+    caminho_saude = 'saude_daemon.json'
+    # erros seguidos nas consultas a partir dos quais o daemon se declara não saudável
+    erros_saude = 5
+    # API de leitura (python -m src.api_leitura): endereço de escuta e intervalo, em segundos,
+    # entre as verificações de sorteios novos no banco
+    endereco_api = '127.0.0.1'
+    porta_api = 8080
+    intervalo_recarga_api = 1.0
+    # métricas de cada execução: texto para o textfile collector do Prometheus e resumo JSON (None desativa)
+    caminho_metricas = 'metricas.prom'
+    caminho_resumo = 'resumo_execucao.json'
 
 config = Config()
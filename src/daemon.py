@@ -0,0 +1,506 @@
+"""
+Coleta contínua dos sorteios da Mega-Sena, com o navegador aberto entre um sorteio e outro.
+
+O daemon conhece o calendário dos sorteios (config.dias_sorteio, config.horario_sorteio,
+config.sorteios_especiais e config.sorteios_extras). Fora das janelas de publicação ele só
+dorme, acordando a cada config.intervalo_batimento segundos para atualizar o arquivo de
+saúde. Do horário de um sorteio até config.janela_publicacao segundos depois, ele recarrega
+a página de resultados em intervalos que encurtam perto do horário esperado de publicação
+e se alongam longe dele, e grava o sorteio assim que ele aparece. As esperas entre
+consultas também são divididas em trechos de config.intervalo_batimento segundos.
+
+Uso:
+    python -m src.daemon [--url URL] [--saude CAMINHO]
+    python -m src.daemon --verificar   # sai com 0 se o daemon estiver vivo e saudável
+
+Para testar sem esperar os sorteios reais, use ferramentas.relogio_falso.RelogioFalso e a
+página do servidor stub (ferramentas.servidor_stub) em --url.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+from sqlalchemy import select
+
+from src.arquivo import gravar_atomico
+from src.coleta_de_dados import LoteriasCaixa
+from src.config import config
+from src.database import calcular_data_ordinal
+from src.metricas import metricas
+
+
+class Relogio:
+    """
+    Relógio do sistema. O daemon só consulta a hora e dorme por meio deste objeto, para
+    que os testes possam trocá-lo por ferramentas.relogio_falso.RelogioFalso.
+    """
+
+    def agora(self):
+        """
+        Returns:
+            datetime: O momento atual, com fuso (UTC).
+        """
+        return datetime.now(timezone.utc)
+
+    def dormir(self, segundos, interromper=None):
+        """
+        Args:
+            segundos (float): Tempo a dormir.
+            interromper (threading.Event): Acorda antes se o evento for sinalizado.
+        """
+        if interromper is None:
+            time.sleep(segundos)
+        else:
+            interromper.wait(segundos)
+
+
+class CalendarioSorteios:
+    """
+    Calendário de sorteios: regulares em dias fixos da semana, especiais todo ano na mesma
+    data e extras avulsos, todos no mesmo horário.
+    """
+
+    def __init__(self, dias_semana, horario, especiais=(), extras=(), fuso=0):
+        """
+        Args:
+            dias_semana (Iterable[int]): Dias da semana dos sorteios regulares (0 é segunda-feira).
+            horario (str): Horário dos sorteios, 'HH:MM'.
+            especiais (Iterable[str]): Datas dos sorteios que acontecem todo ano, 'MM-DD'.
+            extras (Iterable[str]): Datas dos sorteios avulsos, 'AAAA-MM-DD'.
+            fuso (float): Fuso do horário, em horas em relação ao UTC.
+        """
+        self.dias_semana = frozenset(dias_semana)
+        self.horas, self.minutos = (int(parte) for parte in horario.split(":"))
+        self.especiais = frozenset(especiais)
+        self.extras = frozenset(date.fromisoformat(extra) for extra in extras)
+        self.fuso = timezone(timedelta(hours=fuso))
+
+    @classmethod
+    def da_configuracao(cls):
+        """
+        Returns:
+            CalendarioSorteios: O calendário descrito em config.
+        """
+        return cls(
+            config.dias_sorteio,
+            config.horario_sorteio,
+            config.sorteios_especiais,
+            config.sorteios_extras,
+            config.fuso_sorteio,
+        )
+
+    def tem_sorteio(self, dia):
+        """
+        Args:
+            dia (date): Data no fuso do calendário.
+
+        Returns:
+            bool: True se há sorteio no dia.
+        """
+        return dia.weekday() in self.dias_semana or dia.strftime("%m-%d") in self.especiais or dia in self.extras
+
+    def _horario_em(self, dia):
+        return datetime(dia.year, dia.month, dia.day, self.horas, self.minutos, tzinfo=self.fuso)
+
+    def anterior(self, momento):
+        """
+        Args:
+            momento (datetime): Momento com fuso.
+
+        Returns:
+            datetime | None: O último sorteio até momento, inclusive (None se não houver no
+                último ano).
+        """
+        dia = momento.astimezone(self.fuso).date()
+        for _ in range(367):
+            if self.tem_sorteio(dia) and self._horario_em(dia) <= momento:
+                return self._horario_em(dia)
+            dia -= timedelta(days=1)
+        return None
+
+    def proximo(self, momento):
+        """
+        Args:
+            momento (datetime): Momento com fuso.
+
+        Returns:
+            datetime | None: O primeiro sorteio depois de momento (None se não houver no
+                próximo ano).
+        """
+        dia = momento.astimezone(self.fuso).date()
+        for _ in range(367):
+            if self.tem_sorteio(dia) and self._horario_em(dia) > momento:
+                return self._horario_em(dia)
+            dia += timedelta(days=1)
+        return None
+
+
+class DaemonSorteios:
+    """
+    Coleta contínua com o navegador aberto e consultas guiadas pelo calendário de sorteios.
+
+    Atributos:
+        estado (str): 'iniciando', 'aguardando', 'consultando', 'coletando', 'erro' ou 'parado'.
+        ultimo_sorteio (int | None): Sorteio mais recente visto na página.
+        sorteio_esperado (datetime | None): Sorteio do calendário que o daemon espera ver publicado.
+        atendido (datetime | None): Último sorteio do calendário já gravado ou dado como não publicado.
+        atraso_publicacao (float): Atraso esperado, em segundos, entre o sorteio e a publicação,
+            reajustado a cada publicação observada.
+        erros_seguidos (int): Consultas com erro desde a última que deu certo.
+    """
+
+    # peso de cada publicação observada na média móvel do atraso de publicação
+    peso_atraso = 0.3
+
+    def __init__(self, coletor=None, calendario=None, relogio=None, caminho_saude=None):
+        """
+        Args:
+            coletor (LoteriasCaixa): Coletor usado nas consultas (padrão é o da Mega-Sena).
+            calendario (CalendarioSorteios): Padrão é o de config.
+            relogio (Relogio): Padrão é o relógio do sistema.
+            caminho_saude (str): Arquivo de saúde (padrão é config.caminho_saude; '' desativa).
+        """
+        self.coletor = coletor or LoteriasCaixa()
+        self.calendario = calendario or CalendarioSorteios.da_configuracao()
+        self.relogio = relogio or Relogio()
+        self.caminho_saude = config.caminho_saude if caminho_saude is None else caminho_saude
+        self.driver = None
+        self.estado = "iniciando"
+        self.inicio = None
+        self.ultimo_sorteio = None
+        self.sorteio_esperado = None
+        self.atendido = None
+        self.proxima_consulta = None
+        self.atraso_publicacao = float(config.atraso_publicacao)
+        self.erros_seguidos = 0
+        self.ultimo_erro = None
+        # a primeira consulta coleta o que faltar no banco, fora das janelas de publicação
+        self.sincronizar = True
+        # sorteio cuja janela já teve uma consulta sem ele, para medir o atraso da publicação
+        self._consultado_sem_sorteio = None
+        self._parar = threading.Event()
+        self._trava_saude = threading.Lock()
+
+    def parar(self):
+        """
+        Pede ao daemon que pare ao fim do ciclo atual (seguro para chamar de um signal handler).
+        """
+        self._parar.set()
+
+    def executar(self, ate=None):
+        """
+        Roda os ciclos até parar ser chamado, fechando o navegador ao final.
+
+        Args:
+            ate (datetime): Para também quando o relógio passar deste momento (útil com o relógio falso).
+        """
+        self.inicio = self.relogio.agora()
+        logging.info("daemon da %s iniciado (pid %d)", self.coletor.jogo.titulo, os.getpid())
+        try:
+            while not self._parar.is_set() and (ate is None or self.relogio.agora() < ate):
+                espera = self.ciclo()
+                self.proxima_consulta = self.relogio.agora() + timedelta(seconds=espera)
+                self.dormir(espera)
+        finally:
+            self.estado = "parado"
+            self._fechar_navegador()
+            self.registrar_saude()
+            logging.info("daemon parado")
+
+    def dormir(self, segundos):
+        """
+        Dorme até o próximo ciclo em trechos de no máximo config.intervalo_batimento segundos,
+        gravando o arquivo de saúde antes de cada um: as esperas entre consultas podem passar
+        do limite de idade do batimento usado por verificar_saude.
+
+        Args:
+            segundos (float): Tempo total a dormir.
+        """
+        restante = segundos
+        while True:
+            self.registrar_saude()
+            trecho = min(restante, config.intervalo_batimento)
+            self.relogio.dormir(trecho, self._parar)
+            restante -= trecho
+            if restante <= 0 or self._parar.is_set():
+                return
+
+    def ciclo(self):
+        """
+        Executa um passo: na janela de um sorteio ainda não gravado, consulta a página;
+        fora dela, só confere se a janela anterior terminou sem publicação.
+
+        Returns:
+            float: Segundos até o próximo ciclo.
+        """
+        agora = self.relogio.agora()
+        sorteio = self.calendario.anterior(agora)
+        janela = timedelta(seconds=config.janela_publicacao)
+        if sorteio is not None and sorteio != self.atendido and agora <= sorteio + janela:
+            self.sorteio_esperado = sorteio
+            if not self._gravado(sorteio):
+                self.estado = "consultando"
+                self.tentar_consultar()
+                agora = self.relogio.agora()
+            if not self._gravado(sorteio):
+                self._consultado_sem_sorteio = sorteio
+                return self.intervalo_consulta(agora, sorteio)
+            self._marcar_publicado(sorteio, agora)
+        else:
+            esperado = self.sorteio_esperado
+            if esperado is not None and esperado != self.atendido and agora > esperado + janela:
+                logging.warning("sorteio de %s não publicado na janela de consulta", esperado.date())
+                metricas.incrementar("sorteios_nao_publicados", jogo=self.coletor.jogo.nome)
+                self.atendido = esperado
+            if self.sincronizar:
+                self.estado = "consultando"
+                self.tentar_consultar()
+                agora = self.relogio.agora()
+
+        self.estado = "erro" if self.erros_seguidos else "aguardando"
+        self.sorteio_esperado = self.calendario.proximo(agora)
+        espera = config.intervalo_batimento
+        if self.sorteio_esperado is not None:
+            metricas.definir(
+                "proximo_sorteio_timestamp", self.sorteio_esperado.timestamp(), jogo=self.coletor.jogo.nome
+            )
+            espera = min(espera, (self.sorteio_esperado - agora).total_seconds())
+        if self.sincronizar:
+            espera = min(espera, config.intervalo_consulta_maximo)
+        return max(espera, 0.0)
+
+    def intervalo_consulta(self, agora, sorteio):
+        """
+        Intervalo até a próxima consulta na janela de um sorteio: uma fração
+        (config.fator_consulta) da distância até a publicação esperada, dentro dos limites
+        de config.
+
+        Args:
+            agora (datetime): Momento atual.
+            sorteio (datetime): Horário do sorteio.
+
+        Returns:
+            float: Segundos até a próxima consulta.
+        """
+        esperado = sorteio + timedelta(seconds=self.atraso_publicacao)
+        distancia = abs((esperado - agora).total_seconds())
+        return min(
+            max(config.fator_consulta * distancia, config.intervalo_consulta_minimo),
+            config.intervalo_consulta_maximo,
+        )
+
+    def consultar(self):
+        """
+        Recarrega a página de resultados, lê o sorteio mais recente e coleta o que falta
+        no banco, inclusive os sorteios do registro de falhas com backoff vencido. Abre o
+        navegador na primeira consulta e o mantém aberto para as seguintes.
+
+        Returns:
+            int: O número do sorteio mais recente.
+        """
+        if self.driver is None:
+            self.driver = self.coletor.abrir_navegador()
+        with metricas.medir("consulta_daemon", jogo=self.coletor.jogo.nome):
+            self.coletor.acessar_site_loterias_caixa(self.driver)
+            mais_recente = self.coletor.esperar_sorteio(self.driver, lambda nr_sorteio: True, timer=30)
+        intervalos = self.coletor.coletar_intervalos_pendentes(mais_recente)
+        intervalos += self.coletor.intervalos_de_falhas_vencidas(mais_recente)
+        if intervalos:
+            self.estado = "coletando"
+            logging.info(
+                "coletando %d sorteios até o %d", sum(fim - inicio + 1 for inicio, fim in intervalos), mais_recente
+            )
+            with self._batimento_em_segundo_plano():
+                self.driver = self.coletor.coletar_intervalos(self.driver, sorted(intervalos))
+        self.ultimo_sorteio = mais_recente
+        metricas.definir("ultimo_sorteio", mais_recente, jogo=self.coletor.jogo.nome)
+        return mais_recente
+
+    def tentar_consultar(self):
+        """
+        Executa consultar sem deixar o erro derrubar o daemon: o erro é registrado e, se a
+        sessão do navegador caiu, o navegador é fechado para a próxima consulta abrir outro.
+
+        Returns:
+            bool: True se a consulta deu certo.
+        """
+        try:
+            self.consultar()
+        except Exception as e:
+            # se a coleta reiniciou o navegador antes de falhar, o aberto agora é o novo
+            if self.coletor.navegador is not None:
+                self.driver = self.coletor.navegador
+            self.erros_seguidos += 1
+            self.ultimo_erro = f"{type(e).__name__}: {getattr(e, 'msg', None) or e}"
+            metricas.incrementar("consultas_daemon", resultado="erro", jogo=self.coletor.jogo.nome)
+            logging.exception("consulta falhou (%d seguidas): %s", self.erros_seguidos, self.ultimo_erro)
+            if isinstance(e, WebDriverException) and not isinstance(e, self.coletor.erros_sorteio):
+                self._fechar_navegador()
+            return False
+        finally:
+            # o limite de reinícios do coletor vale para cada consulta, não para a vida do daemon
+            self.coletor.reinicios = 0
+            self.coletor.navegador = None
+        self.erros_seguidos = 0
+        self.sincronizar = False
+        metricas.incrementar("consultas_daemon", resultado="ok", jogo=self.coletor.jogo.nome)
+        return True
+
+    def _gravado(self, sorteio):
+        # o banco tem algum sorteio na data do sorteio esperado ou depois dela; consulta a tabela
+        # direto porque o cache de read só é descartado pelas escritas do próprio repositório,
+        # e o sorteio pode ter sido gravado por outro processo
+        repository = self.coletor.obter_repositorio()
+        stmt = (
+            select(repository.tabela.c.nr_sorteio)
+            .where(repository.tabela.c.data_ordinal >= calcular_data_ordinal(sorteio.date()))
+            .limit(1)
+        )
+        with repository.engine.connect() as conn:
+            return conn.execute(stmt).first() is not None
+
+    def _marcar_publicado(self, sorteio, agora):
+        self.atendido = sorteio
+        metricas.incrementar("sorteios_publicados", jogo=self.coletor.jogo.nome)
+        if self._consultado_sem_sorteio != sorteio:
+            logging.info("sorteio de %s já estava no banco", sorteio.date())
+            return
+        atraso = (agora - sorteio).total_seconds()
+        self.atraso_publicacao += self.peso_atraso * (atraso - self.atraso_publicacao)
+        metricas.definir("atraso_publicacao_segundos", self.atraso_publicacao, jogo=self.coletor.jogo.nome)
+        logging.info(
+            "sorteio %s de %s gravado %.0f s após o horário do sorteio (atraso esperado agora: %.0f s)",
+            self.ultimo_sorteio, sorteio.date(), atraso, self.atraso_publicacao,
+        )
+
+    def _fechar_navegador(self):
+        driver, self.driver = self.driver, None
+        if driver is not None:
+            try:
+                self.coletor.fechar_navegador(driver)
+            except WebDriverException as e:
+                logging.warning("erro ao fechar o navegador: %r", e)
+
+    @contextmanager
+    def _batimento_em_segundo_plano(self):
+        # uma coleta longa (a primeira, com o banco vazio) não pode parar o batimento
+        parar = threading.Event()
+
+        def bater():
+            while not parar.wait(config.intervalo_batimento):
+                self.registrar_saude()
+
+        thread = threading.Thread(target=bater, name="batimento-daemon", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            parar.set()
+            thread.join()
+
+    def saude(self):
+        """
+        Returns:
+            dict: Estado do daemon gravado no arquivo de saúde.
+        """
+        agora = self.relogio.agora()
+
+        def iso(momento):
+            return momento.isoformat() if momento is not None else None
+
+        return {
+            "pid": os.getpid(),
+            "jogo": self.coletor.jogo.nome,
+            "estado": self.estado,
+            "inicio": iso(self.inicio),
+            "batimento": iso(agora),
+            "batimento_epoch": agora.timestamp(),
+            "ultimo_sorteio": self.ultimo_sorteio,
+            "ultimo_coletado": self.coletor.ultimo_coletado,
+            "sorteio_esperado": iso(self.sorteio_esperado),
+            "proxima_consulta": iso(self.proxima_consulta),
+            "atraso_publicacao_s": self.atraso_publicacao,
+            "erros_seguidos": self.erros_seguidos,
+            "ultimo_erro": self.ultimo_erro,
+        }
+
+    def registrar_saude(self):
+        """
+        Grava o arquivo de saúde e exporta as métricas, substituindo os arquivos de forma atômica.
+        """
+        saude = self.saude()
+        metricas.definir("batimento_daemon_timestamp", saude["batimento_epoch"], jogo=saude["jogo"])
+        metricas.definir("erros_seguidos_daemon", self.erros_seguidos, jogo=saude["jogo"])
+        with self._trava_saude:
+            try:
+                if self.caminho_saude:
+                    gravar_atomico(
+                        self.caminho_saude, json.dumps(saude, indent=2, ensure_ascii=False).encode("utf-8")
+                    )
+                metricas.exportar(
+                    config.caminho_metricas, config.caminho_resumo,
+                    status=self.estado, coletor="daemon", jogos=[self.coletor.jogo.nome],
+                )
+            except OSError as e:
+                logging.exception(e)
+
+
+def verificar_saude(caminho=None, limite=None, agora=None):
+    """
+    Confere o arquivo de saúde de um daemon, para sondas de liveness e health checks.
+
+    Args:
+        caminho (str): Arquivo de saúde (padrão é config.caminho_saude).
+        limite (float): Idade máxima do batimento em segundos (padrão é 3 × config.intervalo_batimento).
+        agora (float): Momento atual em epoch (padrão é time.time()).
+
+    Returns:
+        tuple[bool, str]: Se o daemon está vivo e saudável, e o motivo.
+    """
+    caminho = caminho or config.caminho_saude
+    limite = 3 * config.intervalo_batimento if limite is None else limite
+    agora = time.time() if agora is None else agora
+    try:
+        saude = json.loads(Path(caminho).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        return False, f"arquivo de saúde ilegível: {e}"
+    if saude["estado"] == "parado":
+        return False, "daemon parado"
+    idade = agora - saude["batimento_epoch"]
+    if idade > limite:
+        return False, f"sem batimento há {idade:.0f} s (pid {saude['pid']})"
+    if saude["erros_seguidos"] >= config.erros_saude:
+        return False, f"{saude['erros_seguidos']} consultas seguidas com erro: {saude['ultimo_erro']}"
+    return True, f"{saude['estado']}, último sorteio {saude['ultimo_sorteio']}, batimento há {idade:.0f} s"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coleta contínua dos sorteios da Mega-Sena.")
+    parser.add_argument("--url", help="página de resultados (por exemplo, a do servidor stub)")
+    parser.add_argument("--saude", default=config.caminho_saude, help="arquivo de saúde")
+    parser.add_argument(
+        "--verificar", action="store_true", help="confere o arquivo de saúde e sai com 0 se o daemon estiver saudável"
+    )
+    args = parser.parse_args()
+    if args.verificar:
+        saudavel, motivo = verificar_saude(args.saude)
+        print(motivo)
+        sys.exit(0 if saudavel else 1)
+
+    logging.basicConfig(format="%(asctime)s %(message)s", level=logging.INFO)
+    coletor = LoteriasCaixa()
+    if args.url:
+        coletor.url = args.url
+    daemon = DaemonSorteios(coletor, caminho_saude=args.saude)
+    for sinal in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sinal, lambda *_: daemon.parar())
+    daemon.executar()
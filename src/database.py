@@ -1,9 +1,44 @@
-from sqlalchemy import String, insert, select, update, delete
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    bindparam,
+    create_engine,
+    event,
+    func,
+    inspect,
+    or_,
+    select,
+    update,
+    delete,
+)
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
 
+from src import colunar
+from src.jogos import MEGA_SENA, obter_jogo
+from src.metricas import metricas
+
 # Cria uma classe base para declarar modelos de dados.
 Base = declarative_base()
 
+# Serializa as atualizações do arquivo colunar entre repositórios do mesmo processo.
+_trava_colunar = threading.RLock()
+
+# Serializa a definição das tabelas dos demais jogos em Base.metadata.
+_trava_tabelas = threading.Lock()
+
 class DataBase(Base):
     """
     Classe que representa a tabela de sorteios no banco de dados.
@@ -21,8 +56,14 @@ class DataBase(Base):
         premio_cinco_dezenas (float): Valor do prêmio para cinco dezenas.
         ganhadores_quatro_dezenas (int): Quantidade de ganhadores com quatro dezenas.
         premio_quatro_dezenas (float): Valor do prêmio para quatro dezenas.
+        dezenas_bitmask (int): Dezenas como máscara de 64 bits (bit n-1 ligado para a dezena n).
+        data_ordinal (int): Data do sorteio como date.toordinal(), para filtros por intervalo.
     """
     __tablename__ = 'sorteios'
+    __table_args__ = (
+        Index('ix_sorteios_data_ordinal', 'data_ordinal'),
+        Index('ix_sorteios_mega_da_virada', 'mega_da_virada'),
+    )
 
     nr_sorteio: Mapped[int] = mapped_column(primary_key=True)
     mega_da_virada: Mapped[bool] = mapped_column()
@@ -35,103 +76,654 @@ class DataBase(Base):
     premio_cinco_dezenas: Mapped[float] = mapped_column()
     ganhadores_quatro_dezenas: Mapped[int] = mapped_column()
     premio_quatro_dezenas: Mapped[float] = mapped_column()
+    dezenas_bitmask: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    data_ordinal: Mapped[int] = mapped_column(nullable=True)
+
+class DezenaSorteio(Base):
+    """
+    Classe que representa a tabela normalizada com uma linha por dezena sorteada.
+
+    Atributos:
+        __tablename__ (str): Nome da tabela no banco de dados.
+        nr_sorteio (int): Número do sorteio.
+        dezena (int): Dezena sorteada (1 a 60).
+    """
+    __tablename__ = 'sorteio_dezenas'
+    __table_args__ = (Index('ix_sorteio_dezenas_dezena', 'dezena', 'nr_sorteio'),)
+
+    nr_sorteio: Mapped[int] = mapped_column(
+        ForeignKey('sorteios.nr_sorteio', ondelete='CASCADE'), primary_key=True
+    )
+    dezena: Mapped[int] = mapped_column(primary_key=True)
+
+class FalhaColeta(Base):
+    """
+    Classe que representa o registro de sorteios cuja coleta falhou e será tentada de novo.
+
+    Atributos:
+        __tablename__ (str): Nome da tabela no banco de dados.
+        nr_sorteio (int): Número do sorteio.
+        tentativas (int): Quantidade de coletas que falharam.
+        ultimo_erro (str): Mensagem do último erro.
+        proxima_tentativa (float): Momento (epoch, em segundos) a partir do qual o sorteio pode ser coletado de novo.
+    """
+    __tablename__ = 'falhas_coleta'
+
+    nr_sorteio: Mapped[int] = mapped_column(primary_key=True)
+    tentativas: Mapped[int] = mapped_column()
+    ultimo_erro: Mapped[str] = mapped_column(String(500))
+    proxima_tentativa: Mapped[float] = mapped_column()
+
+def tabela_sorteios(jogo):
+    """
+    Retorna a tabela de sorteios de um jogo. A Mega-Sena usa a tabela de DataBase; os
+    demais jogos têm uma tabela própria com as colunas de jogo.colunas, data_ordinal e,
+    se as dezenas couberem em um inteiro de 64 bits, dezenas_bitmask (do primeiro sorteio).
+
+    Args:
+        jogo (Jogo): Definição do jogo.
+
+    Returns:
+        sqlalchemy.Table: Tabela registrada em Base.metadata.
+    """
+    if jogo is MEGA_SENA:
+        return DataBase.__table__
+    with _trava_tabelas:
+        tabela = Base.metadata.tables.get(jogo.tabela)
+        if tabela is not None:
+            return tabela
+        colunas = [Column('nr_sorteio', Integer, primary_key=True)]
+        if jogo.mega_da_virada:
+            colunas.append(Column('mega_da_virada', Boolean))
+        colunas.append(Column('data_sorteio', String(10)))
+        colunas.extend(
+            Column(f'dezenas{sufixo}', String(4 * jogo.dezenas_por_sorteio)) for sufixo in jogo.sufixos
+        )
+        colunas.append(Column('local_do_sorteio', String(150)))
+        for ganhadores, premio in jogo.colunas_premiacao():
+            colunas.extend((Column(ganhadores, Integer), Column(premio, Float)))
+        if jogo.maior_dezena < 64:
+            colunas.append(Column('dezenas_bitmask', BigInteger, nullable=True))
+        colunas.append(Column('data_ordinal', Integer, nullable=True))
+        return Table(
+            jogo.tabela, Base.metadata, *colunas,
+            Index(f'ix_{jogo.tabela}_data_ordinal', 'data_ordinal'),
+        )
+
+def tabela_falhas(jogo):
+    """
+    Retorna a tabela do registro de falhas de um jogo, com as colunas de FalhaColeta.
+
+    Args:
+        jogo (Jogo): Definição do jogo.
+
+    Returns:
+        sqlalchemy.Table: Tabela registrada em Base.metadata.
+    """
+    if jogo is MEGA_SENA:
+        return FalhaColeta.__table__
+    with _trava_tabelas:
+        tabela = Base.metadata.tables.get(jogo.tabela_falhas)
+        if tabela is None:
+            tabela = FalhaColeta.__table__.to_metadata(Base.metadata, name=jogo.tabela_falhas)
+        return tabela
+
+def apagar_sorteios(engine, jogo):
+    """
+    Remove as tabelas de sorteios de um jogo (e sorteio_dezenas, na Mega-Sena), sem mexer
+    nas dos outros jogos gravados no mesmo banco nem no registro de falhas.
+
+    Args:
+        engine: Instância do SQLAlchemy Engine.
+        jogo (Jogo): Definição do jogo.
+    """
+    with engine.begin() as conn:
+        if jogo is MEGA_SENA:
+            DezenaSorteio.__table__.drop(conn, checkfirst=True)
+        tabela_sorteios(jogo).drop(conn, checkfirst=True)
+
+def converter_dezenas(dezenas):
+    """
+    Converte as dezenas para uma lista de inteiros.
+
+    Args:
+        dezenas (str | Iterable[int]): Dezenas como '01, 02, ...' ou como inteiros.
+
+    Returns:
+        list[int]: Dezenas como inteiros.
+    """
+    if isinstance(dezenas, str):
+        return [int(dezena) for dezena in dezenas.split(',') if dezena.strip()]
+    if isinstance(dezenas, int):
+        return [dezenas]
+    return [int(dezena) for dezena in dezenas]
+
+def calcular_bitmask(dezenas):
+    """
+    Calcula a máscara de bits das dezenas (bit n-1 ligado para a dezena n).
+
+    Args:
+        dezenas (str | Iterable[int]): Dezenas como '01, 02, ...' ou como inteiros.
+
+    Returns:
+        int: Máscara de bits.
+    """
+    mascara = 0
+    for dezena in converter_dezenas(dezenas):
+        mascara |= 1 << (dezena - 1)
+    return mascara
+
+def calcular_data_ordinal(data_sorteio):
+    """
+    Converte a data do sorteio para o número ordinal de date.toordinal().
+
+    Args:
+        data_sorteio (str | date): Data como 'dd/mm/aaaa' ou datetime.date.
+
+    Returns:
+        int: Ordinal da data.
+    """
+    if isinstance(data_sorteio, date):
+        return data_sorteio.toordinal()
+    dia, mes, ano = data_sorteio.split('/')
+    return date(int(ano), int(mes), int(dia)).toordinal()
+
+def criar_engine(caminho_db):
+    """
+    Cria a engine do SQLite com pragmas adequados a cargas em lote.
+
+    Args:
+        caminho_db (str): Caminho do arquivo do banco de dados.
+
+    Returns:
+        sqlalchemy.engine.Engine: Engine configurada.
+    """
+    engine = create_engine(f"sqlite:///{caminho_db}", future=True)
+
+    @event.listens_for(engine, "connect")
+    def configurar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    return engine
 
 class DbSorteios:
     """
-    Classe para realizar operações no banco de dados de sorteios.
+    Classe para realizar operações no banco de dados de sorteios de um jogo.
 
     Atributos:
         engine: Instância do SQLAlchemy Engine para se conectar ao banco de dados.
+        jogo (Jogo): Jogo cujos sorteios são lidos e gravados.
+        tabela (sqlalchemy.Table): Tabela de sorteios do jogo.
+        tabela_falhas (sqlalchemy.Table): Tabela do registro de falhas do jogo.
     """
-    def __init__(self, engine):
+    # filtros de read que não são colunas da tabela
+    FILTROS_ESPECIAIS = ('data_inicio', 'data_fim', 'contem_dezenas')
+
+    def __init__(self, engine, tamanho_lote=500, tamanho_fetch=500, tamanho_cache=128, limite_linhas_cache=5000,
+                 caminho_colunar=None, jogo=None):
         """
         Inicializa a classe com uma instância de engine do SQLAlchemy e cria a tabela se não existir.
 
         Args:
             engine: Instância do SQLAlchemy Engine.
+            tamanho_lote (int): Quantidade de registros acumulados antes de uma escrita em lote.
+            tamanho_fetch (int): Quantidade de linhas buscadas por vez nas leituras.
+            tamanho_cache (int): Quantidade de consultas mantidas no cache LRU de read.
+            limite_linhas_cache (int): Consultas com mais linhas que isso não são guardadas no cache.
+            caminho_colunar (str): Arquivo colunar (ver src.colunar) mantido em dia a cada escrita;
+                None desativa. Só disponível para a Mega-Sena.
+            jogo (str | Jogo): Jogo do repositório (padrão é a Mega-Sena).
+
+        Raises:
+            ValueError: Se caminho_colunar for informado para outro jogo.
         """
+        self.jogo = obter_jogo(jogo)
+        if caminho_colunar and self.jogo is not MEGA_SENA:
+            raise ValueError("O arquivo colunar só está disponível para a Mega-Sena.")
         self.engine = engine
-        Base.metadata.create_all(self.engine)
+        self.tamanho_lote = tamanho_lote
+        self.tamanho_fetch = tamanho_fetch
+        self.tamanho_cache = tamanho_cache
+        self.limite_linhas_cache = limite_linhas_cache
+        self.caminho_colunar = caminho_colunar
+        self.buffer = []
+        self._cache = OrderedDict()
+        self._consultas = {}
+        self._geracao = 0
+        self._trava_cache = threading.Lock()
+        self.tabela = tabela_sorteios(self.jogo)
+        self.tabela_falhas = tabela_falhas(self.jogo)
+        # só a tabela da Mega-Sena tem as dezenas normalizadas em sorteio_dezenas
+        self.normalizado = self.tabela is DataBase.__table__
+        tabelas = [self.tabela, self.tabela_falhas]
+        if self.normalizado:
+            tabelas.append(DezenaSorteio.__table__)
+        Base.metadata.create_all(self.engine, tables=tabelas)
+        self.migrar()
+        if caminho_colunar and not self._colunar_em_dia():
+            self.exportar_colunar()
+
+    def migrar(self):
+        """
+        Atualiza bancos criados com o schema antigo: adiciona as colunas dezenas_bitmask e
+        data_ordinal, cria os índices e preenche as colunas novas e a tabela sorteio_dezenas.
+        """
+        tabela = self.tabela
+        derivadas = [nome for nome in ('dezenas_bitmask', 'data_ordinal') if nome in tabela.c]
+        existentes = {coluna['name'] for coluna in inspect(self.engine).get_columns(tabela.name)}
+        with self.engine.begin() as conn:
+            for nome in derivadas:
+                if nome not in existentes:
+                    conn.exec_driver_sql(f'ALTER TABLE {tabela.name} ADD COLUMN {nome} INTEGER')
+            for indice in tabela.indexes:
+                indice.create(conn, checkfirst=True)
+
+            pendentes = conn.execute(
+                select(tabela.c.nr_sorteio, tabela.c.dezenas, tabela.c.data_sorteio).where(
+                    or_(*(tabela.c[nome].is_(None) for nome in derivadas))
+                )
+            ).all()
+            if pendentes:
+                self.invalidar_cache()
+                self._gravar_colunas_derivadas(conn, [
+                    {'nr_sorteio': nr_sorteio, 'dezenas': dezenas, 'data_sorteio': data_sorteio}
+                    for nr_sorteio, dezenas, data_sorteio in pendentes
+                ])
+        if pendentes and self.caminho_colunar:
+            self.exportar_colunar()
+
+    def _gravar_colunas_derivadas(self, conn, dicionarios):
+        """
+        Recalcula dezenas_bitmask, data_ordinal e as linhas de sorteio_dezenas dos registros.
+        """
+        derivadas = [nome for nome in ('dezenas_bitmask', 'data_ordinal') if nome in self.tabela.c]
+        stmt = (
+            update(self.tabela)
+            .where(self.tabela.c.nr_sorteio == bindparam('b_nr_sorteio'))
+            .values({nome: bindparam(f'b_{nome}') for nome in derivadas})
+        )
+        for i in range(0, len(dicionarios), self.tamanho_lote):
+            lote = dicionarios[i : i + self.tamanho_lote]
+            conn.execute(
+                stmt,
+                [
+                    {
+                        'b_nr_sorteio': dicionario['nr_sorteio'],
+                        **{f'b_{nome}': valor for nome, valor in self._derivadas(dicionario).items()},
+                    }
+                    for dicionario in lote
+                ],
+            )
+            self._gravar_dezenas(conn, lote)
+
+    def _derivadas(self, dicionario):
+        """
+        Calcula, para um registro, as colunas derivadas que a tabela do jogo tem.
+        """
+        derivadas = {'data_ordinal': calcular_data_ordinal(dicionario['data_sorteio'])}
+        if 'dezenas_bitmask' in self.tabela.c:
+            derivadas['dezenas_bitmask'] = calcular_bitmask(dicionario['dezenas'])
+        return derivadas
+
+    def _gravar_dezenas(self, conn, dicionarios):
+        """
+        Substitui as linhas de sorteio_dezenas dos registros informados (só na Mega-Sena).
+        """
+        if not self.normalizado:
+            return
+        conn.execute(
+            delete(DezenaSorteio).where(
+                DezenaSorteio.nr_sorteio.in_([d['nr_sorteio'] for d in dicionarios])
+            )
+        )
+        linhas = [
+            {'nr_sorteio': dicionario['nr_sorteio'], 'dezena': dezena}
+            for dicionario in dicionarios
+            for dezena in converter_dezenas(dicionario['dezenas'])
+        ]
+        if linhas:
+            conn.execute(insert(DezenaSorteio), linhas)
+
+    def _upsert(self):
+        """
+        Monta o INSERT que atualiza o registro existente em caso de conflito no nr_sorteio.
+        """
+        stmt = insert(self.tabela)
+        colunas = {
+            coluna.name: stmt.excluded[coluna.name]
+            for coluna in self.tabela.columns
+            if coluna.name != 'nr_sorteio'
+        }
+        return stmt.on_conflict_do_update(index_elements=[self.tabela.c.nr_sorteio], set_=colunas)
 
     def create(self, dicionario):
         """
-        Insere um novo registro na tabela.
+        Insere um novo registro na tabela, ou atualiza o existente com o mesmo nr_sorteio.
 
         Args:
             dicionario (dict): Dicionário contendo os valores a serem inseridos na tabela.
         """
-        stmt = insert(DataBase).values(
-            nr_sorteio=dicionario['nr_sorteio'],
-            mega_da_virada=dicionario['mega_da_virada'],
-            data_sorteio=dicionario['data_sorteio'],
-            dezenas=dicionario['dezenas'],
-            local_do_sorteio=dicionario['local_do_sorteio'],
-            ganhadores_seis_dezenas=dicionario['ganhadores_seis_dezenas'],
-            premio_seis_dezenas=dicionario['premio_seis_dezenas'],
-            ganhadores_cinco_dezenas=dicionario['ganhadores_cinco_dezenas'],
-            premio_cinco_dezenas=dicionario['premio_cinco_dezenas'],
-            ganhadores_quatro_dezenas=dicionario['ganhadores_quatro_dezenas'],
-            premio_quatro_dezenas=dicionario['premio_quatro_dezenas']
-        )
+        self.create_many([dicionario])
+
+    def create_many(self, dicionarios):
+        """
+        Insere (ou atualiza) vários registros em uma única transação, com executemany
+        em lotes de tamanho_lote, e remove os sorteios gravados do registro de falhas.
 
+        Args:
+            dicionarios (list[dict]): Dicionários contendo os valores a serem inseridos na tabela.
+        """
+        colunas = self.tabela.columns.keys()
+        linhas = [{**dicionario, **self._derivadas(dicionario)} for dicionario in dicionarios]
+        linhas = [{coluna: linha[coluna] for coluna in colunas} for linha in linhas]
+        if not linhas:
+            return
+        stmt = self._upsert()
+
+        with metricas.medir("gravar_db", jogo=self.jogo.nome), self.engine.begin() as conn:
+            for i in range(0, len(linhas), self.tamanho_lote):
+                lote = linhas[i : i + self.tamanho_lote]
+                conn.execute(stmt, lote)
+                self._gravar_dezenas(conn, lote)
+                conn.execute(
+                    delete(self.tabela_falhas).where(
+                        self.tabela_falhas.c.nr_sorteio.in_([linha['nr_sorteio'] for linha in lote])
+                    )
+                )
+        metricas.incrementar("linhas_gravadas", len(linhas), jogo=self.jogo.nome)
+        self.invalidar_cache()
+        self._atualizar_colunar(linhas)
+
+    def exportar_colunar(self, caminho=None):
+        """
+        Regrava o arquivo colunar com todos os sorteios do banco.
+
+        Args:
+            caminho (str): Arquivo de destino (padrão é caminho_colunar).
+        """
+        caminho = caminho or self.caminho_colunar
+        colunas = [
+            coluna for coluna in self.tabela.columns
+            if coluna.name not in ('data_sorteio', 'local_do_sorteio')
+        ]
+        stmt = select(*colunas).order_by(self.tabela.c.nr_sorteio)
+        with _trava_colunar, metricas.medir("gravar_colunar", jogo=self.jogo.nome):
+            with self.engine.connect() as conn:
+                linhas = conn.execute(stmt).mappings().all()
+            colunar.gravar_colunar(caminho, colunar.montar_colunas(linhas))
+
+    def _colunar_em_dia(self):
+        """
+        Confere se o arquivo colunar existe e tem a mesma quantidade de sorteios e o mesmo
+        último sorteio que o banco (o banco pode ter sido alterado sem o arquivo).
+        """
+        try:
+            arquivo = colunar.ArquivoColunar(self.caminho_colunar)
+        except (OSError, ValueError):
+            return False
+        try:
+            ultimo_arquivo = int(arquivo.nr_sorteio[-1]) if arquivo.quantidade else None
+            quantidade_arquivo = arquivo.quantidade
+        finally:
+            arquivo.fechar()
         with self.engine.connect() as conn:
-            conn.execute(stmt)
-            conn.commit()
+            quantidade, ultimo = conn.execute(
+                select(func.count(), func.max(self.tabela.c.nr_sorteio))
+            ).one()
+        return (quantidade, ultimo) == (quantidade_arquivo, ultimo_arquivo)
+
+    def _atualizar_colunar(self, linhas):
+        """
+        Acrescenta as linhas gravadas ao arquivo colunar, ou o regrava inteiro se elas
+        não vierem todas depois do último sorteio do arquivo.
+        """
+        if not self.caminho_colunar:
+            return
+        linhas = sorted(linhas, key=lambda linha: linha['nr_sorteio'])
+        with _trava_colunar:
+            with metricas.medir("gravar_colunar", jogo=self.jogo.nome):
+                acrescentado = colunar.acrescentar_colunar(self.caminho_colunar, colunar.montar_colunas(linhas))
+            if not acrescentado:
+                self.exportar_colunar()
+
+    def adicionar(self, dicionario):
+        """
+        Acumula um registro no buffer e grava o lote quando ele atinge tamanho_lote.
+
+        Args:
+            dicionario (dict): Dicionário contendo os valores a serem inseridos na tabela.
+        """
+        self.buffer.append(dicionario)
+        if len(self.buffer) >= self.tamanho_lote:
+            self.descarregar()
+
+    def descarregar(self):
+        """
+        Grava no banco os registros pendentes no buffer.
+        """
+        pendentes, self.buffer = self.buffer, []
+        self.create_many(pendentes)
 
     def coletar_todos_sorteios(self):
         """
         Coleta todos os números de sorteios armazenados.
 
         Returns:
-            sqlalchemy.engine.result.ResultProxy: Resultado da consulta.
+            Iterator[sqlalchemy.engine.Row]: Linhas com o nr_sorteio, lidas sob demanda.
         """
-        stmt = select(DataBase.nr_sorteio)
+        stmt = self._consultas.get('coletar_todos_sorteios')
+        if stmt is None:
+            stmt = self._consultas['coletar_todos_sorteios'] = select(self.tabela.c.nr_sorteio)
+        return self._ler(stmt, {}, ('coletar_todos_sorteios',))
 
+    def invalidar_cache(self):
+        """
+        Descarta as consultas guardadas no cache de read.
+        """
+        with self._trava_cache:
+            self._geracao += 1
+            self._cache.clear()
+
+    def _ler(self, stmt, parametros, chave_cache):
+        """
+        Devolve as linhas da consulta pelo cache ou, se não estiverem nele, lendo-as do banco
+        em blocos de tamanho_fetch. A conexão fica aberta apenas enquanto as linhas são
+        consumidas e o resultado só vai para o cache se for lido até o fim.
+        """
+        with self._trava_cache:
+            linhas = self._cache.get(chave_cache)
+            if linhas is not None:
+                self._cache.move_to_end(chave_cache)
+                return iter(linhas)
+            geracao = self._geracao
+        return self._ler_do_banco(stmt, parametros, chave_cache, geracao)
+
+    def _ler_do_banco(self, stmt, parametros, chave_cache, geracao):
+        lidas = []
         with self.engine.connect() as conn:
-            return conn.execute(stmt)
+            resultado = conn.execution_options(yield_per=self.tamanho_fetch).execute(stmt, parametros)
+            for linha in resultado:
+                if lidas is not None:
+                    lidas.append(linha)
+                    if len(lidas) > self.limite_linhas_cache:
+                        lidas = None
+                yield linha
+
+        if lidas is None or self.tamanho_cache <= 0:
+            return
+        with self._trava_cache:
+            if geracao == self._geracao:
+                self._cache[chave_cache] = tuple(lidas)
+                self._cache.move_to_end(chave_cache)
+                while len(self._cache) > self.tamanho_cache:
+                    self._cache.popitem(last=False)
+
+    def coletar_intervalos_faltantes(self, limite, ignorar=()):
+        """
+        Calcula os intervalos de sorteios ausentes entre 1 e limite, incluindo
+        buracos na sequência e o trecho após o último sorteio armazenado.
+
+        Args:
+            limite (int): Número do sorteio mais recente.
+            ignorar (Iterable[int]): Sorteios tratados como presentes, mesmo que não estejam no banco.
+
+        Returns:
+            list[tuple[int, int]]: Intervalos (inicio, fim), inclusivos, em ordem crescente.
+        """
+        stmt = (
+            select(self.tabela.c.nr_sorteio)
+            .where(self.tabela.c.nr_sorteio <= limite)
+            .order_by(self.tabela.c.nr_sorteio)
+        )
+
+        with self.engine.connect() as conn:
+            existentes = conn.execute(stmt).scalars().all()
+        if ignorar:
+            existentes = sorted(set(existentes).union(nr for nr in ignorar if nr <= limite))
+
+        intervalos = []
+        esperado = 1
+        for nr_sorteio in existentes:
+            if nr_sorteio > esperado:
+                intervalos.append((esperado, nr_sorteio - 1))
+            esperado = nr_sorteio + 1
+        if esperado <= limite:
+            intervalos.append((esperado, limite))
+        return intervalos
+
+    def registrar_falha(self, nr_sorteio, erro, backoff, backoff_maximo, agora=None):
+        """
+        Registra uma coleta que falhou e adia a próxima tentativa do sorteio com backoff
+        exponencial: backoff segundos na primeira falha, dobrando a cada nova falha.
+
+        Args:
+            nr_sorteio (int): Número do sorteio.
+            erro (str): Mensagem do erro.
+            backoff (float): Espera, em segundos, depois da primeira falha.
+            backoff_maximo (float): Espera máxima, em segundos.
+            agora (float): Momento atual em epoch (padrão é time.time()).
+
+        Returns:
+            int: Quantidade de falhas registradas para o sorteio.
+        """
+        agora = time.time() if agora is None else agora
+        falhas = self.tabela_falhas
+        with self.engine.begin() as conn:
+            tentativas = conn.execute(
+                select(falhas.c.tentativas).where(falhas.c.nr_sorteio == nr_sorteio)
+            ).scalar() or 0
+            tentativas += 1
+            valores = {
+                'nr_sorteio': nr_sorteio,
+                'tentativas': tentativas,
+                'ultimo_erro': erro[:500],
+                'proxima_tentativa': agora + min(backoff * 2 ** (tentativas - 1), backoff_maximo),
+            }
+            stmt = insert(falhas).values(valores)
+            conn.execute(stmt.on_conflict_do_update(index_elements=[falhas.c.nr_sorteio], set_=valores))
+        return tentativas
+
+    def coletar_falhas(self, vencidas_ate=None):
+        """
+        Lista os sorteios do registro de falhas.
+
+        Args:
+            vencidas_ate (float): Se informado, retorna só as falhas com proxima_tentativa até este momento (epoch).
+
+        Returns:
+            list[dict]: Registros com nr_sorteio, tentativas, ultimo_erro e proxima_tentativa, por nr_sorteio.
+        """
+        falhas = self.tabela_falhas
+        stmt = select(*falhas.columns).order_by(falhas.c.nr_sorteio)
+        if vencidas_ate is not None:
+            stmt = stmt.where(falhas.c.proxima_tentativa <= vencidas_ate)
+        with self.engine.connect() as conn:
+            return [dict(linha) for linha in conn.execute(stmt).mappings()]
 
     def read(self, dicionario=None):
         """
         Lê registros da tabela com base em critérios fornecidos.
 
+        Além das colunas, aceita os filtros 'data_inicio' e 'data_fim' (datas 'dd/mm/aaaa'
+        ou datetime.date, inclusivas) e, na Mega-Sena, 'contem_dezenas' (dezenas que o sorteio
+        deve conter), que usam os índices de data_ordinal e de sorteio_dezenas.
+
+        As linhas são lidas sob demanda, em blocos de tamanho_fetch, e guardadas em um cache
+        LRU por critérios, descartado a cada escrita feita por esta instância.
+
         Args:
             dicionario (dict): Dicionário contendo critérios de consulta.
 
         Returns:
-            sqlalchemy.engine.result.ResultProxy: Resultado da consulta.
-        """
-        stmt = select(DataBase)
-
-        if dicionario:
-            for chave, value in dicionario.items():
-                match chave:
-                    case 'nr_sorteio':
-                        stmt = stmt.where(DataBase.nr_sorteio == value)
-                    case 'mega_da_virada':
-                        stmt = stmt.where(DataBase.mega_da_virada == value)
-                    case 'data_sorteio':
-                        stmt = stmt.where(DataBase.data_sorteio == value)
-                    case 'dezenas':
-                        stmt = stmt.where(DataBase.dezenas == value)
-                    case 'local_do_sorteio':
-                        stmt = stmt.where(DataBase.local_do_sorteio == value)
-                    case 'ganhadores_seis_dezenas':
-                        stmt = stmt.where(DataBase.ganhadores_seis_dezenas == value)
-                    case 'premio_seis_dezenas':
-                        stmt = stmt.where(DataBase.premio_seis_dezenas == value)
-                    case 'ganhadores_cinco_dezenas':
-                        stmt = stmt.where(DataBase.ganhadores_cinco_dezenas == value)
-                    case 'premio_cinco_dezenas':
-                        stmt = stmt.where(DataBase.premio_cinco_dezenas == value)
-                    case 'ganhadores_quatro_dezenas':
-                        stmt = stmt.where(DataBase.ganhadores_quatro_dezenas == value)
-                    case 'premio_quatro_dezenas':
-                        stmt = stmt.where(DataBase.premio_quatro_dezenas == value)
-                    case _:
-                        continue
+            Iterator[sqlalchemy.engine.Row]: Linhas da consulta.
 
-        with self.engine.connect() as conn:
-            return conn.execute(stmt)
+        Raises:
+            ValueError: Se 'contem_dezenas' for usado em um jogo sem a tabela sorteio_dezenas.
+        """
+        filtros = self._normalizar_filtros(dicionario)
+        chaves = tuple(
+            (chave, len(valor)) if chave == 'contem_dezenas' else chave for chave, valor in filtros
+        )
+        stmt = self._consultas.get(chaves)
+        if stmt is None:
+            stmt = self._consultas[chaves] = self._montar_consulta(chaves)
+
+        parametros = {}
+        for chave, valor in filtros:
+            if chave == 'contem_dezenas':
+                parametros['contem_dezenas'] = list(valor)
+                parametros['qtd_contem_dezenas'] = len(valor)
+            else:
+                parametros[chave] = valor
+        return self._ler(stmt, parametros, ('read', filtros))
+
+    def _normalizar_filtros(self, dicionario):
+        """
+        Converte os critérios de read em uma tupla ordenada e imutável, que serve tanto de
+        chave do cache quanto de parâmetros da consulta. Critérios desconhecidos são ignorados.
+        """
+        colunas = self.tabela.columns.keys()
+        filtros = []
+        for chave, value in (dicionario or {}).items():
+            match chave:
+                case 'data_inicio' | 'data_fim':
+                    value = calcular_data_ordinal(value)
+                case 'contem_dezenas':
+                    if not self.normalizado:
+                        raise ValueError(f"O filtro contem_dezenas não está disponível para a {self.jogo.titulo}.")
+                    value = tuple(sorted(set(converter_dezenas(value))))
+                case _ if chave not in colunas:
+                    continue
+            filtros.append((chave, value))
+        return tuple(sorted(filtros))
+
+    def _montar_consulta(self, chaves):
+        """
+        Monta o SELECT de read com parâmetros nomeados, para ser reaproveitado por todas as
+        consultas com o mesmo conjunto de critérios.
+        """
+        stmt = select(self.tabela)
+        for chave in chaves:
+            match chave:
+                case 'data_inicio':
+                    stmt = stmt.where(self.tabela.c.data_ordinal >= bindparam('data_inicio'))
+                case 'data_fim':
+                    stmt = stmt.where(self.tabela.c.data_ordinal <= bindparam('data_fim'))
+                case ('contem_dezenas', _):
+                    sorteios_com_dezenas = (
+                        select(DezenaSorteio.nr_sorteio)
+                        .where(DezenaSorteio.dezena.in_(bindparam('contem_dezenas', expanding=True)))
+                        .group_by(DezenaSorteio.nr_sorteio)
+                        .having(func.count() == bindparam('qtd_contem_dezenas'))
+                    )
+                    stmt = stmt.where(self.tabela.c.nr_sorteio.in_(sorteios_com_dezenas))
+                case _:
+                    stmt = stmt.where(self.tabela.columns[chave] == bindparam(chave))
+        return stmt
 
     def update(self, sorteio: int, dicionario):
         """
@@ -142,11 +734,21 @@ class DbSorteios:
             dicionario (dict): Dicionário contendo os novos valores.
 
         """
-        stmt = update(DataBase).values(dicionario).where(DataBase.nr_sorteio == sorteio)
+        valores = dict(dicionario)
+        if 'dezenas' in valores and 'dezenas_bitmask' in self.tabela.c:
+            valores['dezenas_bitmask'] = calcular_bitmask(valores['dezenas'])
+        if 'data_sorteio' in valores:
+            valores['data_ordinal'] = calcular_data_ordinal(valores['data_sorteio'])
+        stmt = update(self.tabela).values(valores).where(self.tabela.c.nr_sorteio == sorteio)
 
         with self.engine.connect() as conn:
             conn.execute(stmt)
+            if 'dezenas' in valores:
+                self._gravar_dezenas(conn, [{'nr_sorteio': sorteio, 'dezenas': valores['dezenas']}])
             conn.commit()
+        self.invalidar_cache()
+        if self.caminho_colunar:
+            self.exportar_colunar()
 
     def delete(self, sorteio):
         """
@@ -155,8 +757,13 @@ class DbSorteios:
         Args:
             sorteio: Número do sorteio a ser excluído.
         """
-        stmt = delete(DataBase).where(DataBase.nr_sorteio == sorteio)
+        stmt = delete(self.tabela).where(self.tabela.c.nr_sorteio == sorteio)
 
         with self.engine.connect() as conn:
+            if self.normalizado:
+                conn.execute(delete(DezenaSorteio).where(DezenaSorteio.nr_sorteio == sorteio))
             conn.execute(stmt)
             conn.commit()
+        self.invalidar_cache()
+        if self.caminho_colunar:
+            self.exportar_colunar()
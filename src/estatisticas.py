@@ -0,0 +1,220 @@
+import numpy as np
+from sqlalchemy import select
+
+from src.database import DataBase
+
+QTD_DEZENAS = 60
+
+# Deslocamentos usados para abrir a máscara de bits em 60 colunas.
+_BITS = np.arange(QTD_DEZENAS, dtype=np.uint64)
+
+
+def mascaras_para_matriz(mascaras):
+    """
+    Converte máscaras de bits de dezenas em uma matriz de indicadores.
+
+    Args:
+        mascaras (array-like): Máscaras de bits (bit n-1 ligado para a dezena n).
+
+    Returns:
+        np.ndarray: Matriz sorteios × 60 (uint8) com 1 nas dezenas sorteadas.
+    """
+    mascaras = np.asarray(mascaras, dtype=np.uint64).reshape(-1, 1)
+    return ((mascaras >> _BITS) & np.uint64(1)).astype(np.uint8)
+
+
+def dezenas_para_matriz(dezenas):
+    """
+    Converte um array de dezenas em uma matriz de indicadores.
+
+    Args:
+        dezenas (np.ndarray): Array sorteios × 6 com as dezenas (1 a 60).
+
+    Returns:
+        np.ndarray: Matriz sorteios × 60 (uint8) com 1 nas dezenas sorteadas.
+    """
+    dezenas = np.asarray(dezenas, dtype=np.intp)
+    matriz = np.zeros((len(dezenas), QTD_DEZENAS), dtype=np.uint8)
+    matriz[np.arange(len(dezenas))[:, None], dezenas - 1] = 1
+    return matriz
+
+
+class EstatisticasSorteios:
+    """
+    Estatísticas vetorizadas sobre o histórico de sorteios.
+
+    Guarda o histórico como um array denso sorteios × 6 (uint8) e mantém
+    frequências, coocorrências, última aparição e somas acumuladas, que são
+    atualizadas incrementalmente em adicionar em vez de recalculadas.
+
+    Atributos:
+        nr_sorteios (np.ndarray): Números dos sorteios, em ordem crescente.
+        dezenas (np.ndarray): Dezenas de cada sorteio, sorteios × 6 (uint8).
+    """
+
+    def __init__(self, nr_sorteios=None, dezenas=None):
+        """
+        Args:
+            nr_sorteios (array-like): Números dos sorteios, em ordem crescente.
+            dezenas (array-like): Dezenas de cada sorteio, sorteios × 6.
+        """
+        self.nr_sorteios = np.zeros(0, dtype=np.int64)
+        self.dezenas = np.zeros((0, 6), dtype=np.uint8)
+        self._frequencias = np.zeros(QTD_DEZENAS, dtype=np.int64)
+        self._coocorrencia = np.zeros((QTD_DEZENAS, QTD_DEZENAS), dtype=np.int64)
+        self._ultima_aparicao = np.full(QTD_DEZENAS, -1, dtype=np.int64)
+        # _acumulado[i] = quantidade de aparições de cada dezena nos i primeiros sorteios
+        self._acumulado = np.zeros((1, QTD_DEZENAS), dtype=np.int32)
+        if nr_sorteios is not None:
+            self.adicionar(nr_sorteios, dezenas)
+
+    @classmethod
+    def carregar(cls, repository):
+        """
+        Carrega o histórico da tabela sorteios com uma única consulta.
+
+        Args:
+            repository (DbSorteios): Repositório do banco de sorteios.
+
+        Returns:
+            EstatisticasSorteios: Estatísticas do histórico completo.
+        """
+        stmt = select(DataBase.nr_sorteio, DataBase.dezenas_bitmask).order_by(
+            DataBase.nr_sorteio
+        )
+        with repository.engine.connect() as conn:
+            linhas = conn.execute(stmt).all()
+        if not linhas:
+            return cls()
+        nr_sorteios, mascaras = zip(*linhas)
+        matriz = mascaras_para_matriz(mascaras)
+        dezenas = np.nonzero(matriz)[1].reshape(-1, 6) + 1
+        return cls(nr_sorteios, dezenas)
+
+    @classmethod
+    def de_arquivo_colunar(cls, arquivo):
+        """
+        Carrega o histórico do arquivo colunar, sem consultar o banco.
+
+        Args:
+            arquivo (ArquivoColunar): Arquivo colunar aberto.
+
+        Returns:
+            EstatisticasSorteios: Estatísticas do histórico completo.
+        """
+        return cls(arquivo.nr_sorteio, arquivo.dezenas)
+
+    @property
+    def quantidade(self):
+        return len(self.nr_sorteios)
+
+    def adicionar(self, nr_sorteios, dezenas):
+        """
+        Acrescenta novos sorteios ao histórico, atualizando as estatísticas incrementalmente.
+
+        Args:
+            nr_sorteios (array-like): Números dos novos sorteios, maiores que os existentes.
+            dezenas (array-like): Dezenas dos novos sorteios, novos × 6.
+
+        Raises:
+            ValueError: Se os sorteios não forem posteriores aos existentes, não tiverem uma
+                linha de dezenas cada ou alguma dezena estiver fora de 1 a 60.
+        """
+        nr_sorteios = np.asarray(nr_sorteios, dtype=np.int64).reshape(-1)
+        dezenas = np.asarray(dezenas, dtype=np.int64).reshape(-1, 6)
+        if len(nr_sorteios) == 0:
+            return
+        if self.quantidade and nr_sorteios[0] <= self.nr_sorteios[-1]:
+            raise ValueError("Os sorteios adicionados devem ser posteriores aos existentes.")
+        if len(dezenas) != len(nr_sorteios):
+            raise ValueError(f"{len(nr_sorteios)} sorteios com {len(dezenas)} linhas de dezenas.")
+        # conferido antes da conversão para uint8, que daria a volta em valores fora da faixa
+        fora = (dezenas < 1) | (dezenas > QTD_DEZENAS)
+        if fora.any():
+            linha = int(np.argmax(fora.any(axis=1)))
+            raise ValueError(
+                f"Dezenas devem estar entre 1 e {QTD_DEZENAS}: {dezenas[linha].tolist()} "
+                f"(sorteio {nr_sorteios[linha]})."
+            )
+        dezenas = dezenas.astype(np.uint8)
+
+        matriz = dezenas_para_matriz(dezenas)
+        inicio = self.quantidade
+        self._frequencias += matriz.sum(axis=0, dtype=np.int64)
+        # o produto em float32 usa BLAS e é exato para contagens abaixo de 2**24
+        indicadores = matriz.astype(np.float32)
+        self._coocorrencia += (indicadores.T @ indicadores).astype(np.int64)
+        aparicoes = matriz.any(axis=0)
+        ultima = len(matriz) - 1 - np.argmax(matriz[::-1], axis=0)
+        self._ultima_aparicao[aparicoes] = inicio + ultima[aparicoes]
+        self._acumulado = np.concatenate(
+            [self._acumulado, self._acumulado[-1] + np.cumsum(matriz, axis=0, dtype=np.int32)]
+        )
+        self.nr_sorteios = np.concatenate([self.nr_sorteios, nr_sorteios])
+        self.dezenas = np.concatenate([self.dezenas, dezenas])
+
+    def frequencias(self):
+        """
+        Returns:
+            np.ndarray: Quantidade de aparições de cada dezena (índice 0 = dezena 1).
+        """
+        return self._frequencias.copy()
+
+    def coocorrencia(self):
+        """
+        Returns:
+            np.ndarray: Matriz 60 × 60 com a quantidade de sorteios em que cada par saiu junto.
+                A diagonal é a frequência de cada dezena.
+        """
+        return self._coocorrencia.copy()
+
+    def atrasos(self):
+        """
+        Returns:
+            np.ndarray: Sorteios desde a última aparição de cada dezena
+                (0 se saiu no último; quantidade total se nunca saiu).
+        """
+        return np.where(
+            self._ultima_aparicao < 0,
+            self.quantidade,
+            self.quantidade - 1 - self._ultima_aparicao,
+        )
+
+    def frequencias_janela(self, tamanho):
+        """
+        Frequências nos últimos sorteios.
+
+        Args:
+            tamanho (int): Quantidade de sorteios da janela.
+
+        Returns:
+            np.ndarray: Quantidade de aparições de cada dezena na janela.
+
+        Raises:
+            ValueError: Se tamanho não estiver entre 1 e a quantidade de sorteios.
+        """
+        self._verificar_janela(tamanho)
+        return self._acumulado[-1] - self._acumulado[-1 - tamanho]
+
+    def frequencias_moveis(self, tamanho):
+        """
+        Frequências em janelas deslizantes sobre todo o histórico.
+
+        Args:
+            tamanho (int): Quantidade de sorteios de cada janela.
+
+        Returns:
+            np.ndarray: Matriz (sorteios - tamanho + 1) × 60; a linha i cobre os
+                sorteios i a i + tamanho - 1.
+
+        Raises:
+            ValueError: Se tamanho não estiver entre 1 e a quantidade de sorteios.
+        """
+        self._verificar_janela(tamanho)
+        return self._acumulado[tamanho:] - self._acumulado[:-tamanho]
+
+    def _verificar_janela(self, tamanho):
+        if not 1 <= tamanho <= self.quantidade:
+            raise ValueError(
+                f"O tamanho da janela deve estar entre 1 e {self.quantidade} (quantidade de sorteios): {tamanho}."
+            )
@@ -0,0 +1,303 @@
+"""
+Exporta a tabela sorteios em blocos para Parquet, Arrow IPC ou CSV comprimido com gzip.
+
+As dezenas viram as colunas dezena_1 a dezena_6 (inteiros) e a data vira um tipo
+data. A memória usada depende só do tamanho do bloco, não do total de linhas.
+Parquet e Arrow exigem o pacote opcional pyarrow.
+
+Uso:
+    python -m src.exportacao --formato parquet --destino sorteios.parquet
+    python -m src.exportacao --formato csv --destino exportacoes/ --incremental
+"""
+import argparse
+import csv
+import gzip
+import json
+import logging
+import os
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import or_, select
+
+from src.arquivo import gravar_atomico
+from src.config import config
+from src.database import DataBase, DbSorteios, criar_engine
+
+EXTENSOES = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv.gz"}
+
+COLUNAS = (
+    "nr_sorteio",
+    "data_sorteio",
+    "mega_da_virada",
+    *(f"dezena_{i}" for i in range(1, 7)),
+    "local_do_sorteio",
+    "ganhadores_seis_dezenas",
+    "premio_seis_dezenas",
+    "ganhadores_cinco_dezenas",
+    "premio_cinco_dezenas",
+    "ganhadores_quatro_dezenas",
+    "premio_quatro_dezenas",
+)
+
+_EPOCA = date(1970, 1, 1).toordinal()
+
+
+def ler_blocos(repository, tamanho_bloco=1000, apos_sorteio=0, incluir=()):
+    """
+    Lê os sorteios em ordem, em blocos de colunas.
+
+    Args:
+        repository (DbSorteios): Repositório do banco de sorteios.
+        tamanho_bloco (int): Quantidade de linhas por bloco.
+        apos_sorteio (int): Lê apenas os sorteios com número maior que este...
+        incluir (Iterable[tuple[int, int]]): ...e os dos intervalos (inicio, fim) informados.
+
+    Yields:
+        dict: {coluna: lista de valores} com as colunas de COLUNAS; data_sorteio em
+            dias desde 1970-01-01.
+    """
+    stmt = (
+        select(
+            DataBase.nr_sorteio,
+            DataBase.data_ordinal,
+            DataBase.mega_da_virada,
+            DataBase.dezenas,
+            DataBase.local_do_sorteio,
+            DataBase.ganhadores_seis_dezenas,
+            DataBase.premio_seis_dezenas,
+            DataBase.ganhadores_cinco_dezenas,
+            DataBase.premio_cinco_dezenas,
+            DataBase.ganhadores_quatro_dezenas,
+            DataBase.premio_quatro_dezenas,
+        )
+        .where(
+            or_(
+                DataBase.nr_sorteio > apos_sorteio,
+                *(DataBase.nr_sorteio.between(inicio, fim) for inicio, fim in incluir),
+            )
+        )
+        .order_by(DataBase.nr_sorteio)
+    )
+    with repository.engine.connect() as conn:
+        resultado = conn.execution_options(yield_per=tamanho_bloco).execute(stmt)
+        for linhas in resultado.partitions():
+            bloco = {coluna: [] for coluna in COLUNAS}
+            for linha in linhas:
+                bloco["nr_sorteio"].append(linha.nr_sorteio)
+                bloco["data_sorteio"].append(linha.data_ordinal - _EPOCA)
+                bloco["mega_da_virada"].append(bool(linha.mega_da_virada))
+                for i, dezena in enumerate(linha.dezenas.split(","), start=1):
+                    bloco[f"dezena_{i}"].append(int(dezena))
+                for coluna in COLUNAS[9:]:
+                    bloco[coluna].append(getattr(linha, coluna))
+            yield bloco
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Exportar para Parquet ou Arrow requer o pacote pyarrow.") from e
+    return pyarrow
+
+
+def _schema_arrow(pa):
+    return pa.schema(
+        [
+            ("nr_sorteio", pa.int32()),
+            ("data_sorteio", pa.date32()),
+            ("mega_da_virada", pa.bool_()),
+            *((f"dezena_{i}", pa.uint8()) for i in range(1, 7)),
+            ("local_do_sorteio", pa.string()),
+            ("ganhadores_seis_dezenas", pa.int32()),
+            ("premio_seis_dezenas", pa.float64()),
+            ("ganhadores_cinco_dezenas", pa.int32()),
+            ("premio_cinco_dezenas", pa.float64()),
+            ("ganhadores_quatro_dezenas", pa.int32()),
+            ("premio_quatro_dezenas", pa.float64()),
+        ]
+    )
+
+
+def _escrever_parquet(blocos, destino):
+    pa = _importar_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = _schema_arrow(pa)
+    with pq.ParquetWriter(destino, schema) as escritor:
+        for bloco in blocos:
+            escritor.write_batch(pa.record_batch(bloco, schema=schema))
+
+
+def _escrever_arrow(blocos, destino):
+    pa = _importar_pyarrow()
+
+    schema = _schema_arrow(pa)
+    with pa.OSFile(str(destino), "wb") as saida, pa.ipc.new_file(saida, schema) as escritor:
+        for bloco in blocos:
+            escritor.write_batch(pa.record_batch(bloco, schema=schema))
+
+
+def _escrever_csv(blocos, destino):
+    with gzip.open(destino, "wt", newline="", encoding="utf-8") as saida:
+        escritor = csv.writer(saida)
+        escritor.writerow(COLUNAS)
+        for bloco in blocos:
+            bloco["data_sorteio"] = [
+                date.fromordinal(dias + _EPOCA).isoformat() for dias in bloco["data_sorteio"]
+            ]
+            escritor.writerows(zip(*(bloco[coluna] for coluna in COLUNAS)))
+
+
+ESCRITORES = {"parquet": _escrever_parquet, "arrow": _escrever_arrow, "csv": _escrever_csv}
+
+
+def exportar(repository, formato, destino, tamanho_bloco=1000, apos_sorteio=0, incluir=(), ao_exportar=None):
+    """
+    Exporta os sorteios para um arquivo.
+
+    Args:
+        repository (DbSorteios): Repositório do banco de sorteios.
+        formato (str): 'parquet', 'arrow' ou 'csv' (gzip).
+        destino (str): Caminho do arquivo de saída.
+        tamanho_bloco (int): Quantidade de linhas lidas e escritas por vez.
+        apos_sorteio (int): Exporta apenas os sorteios com número maior que este...
+        incluir (Iterable[tuple[int, int]]): ...e os dos intervalos (inicio, fim) informados.
+        ao_exportar (Callable[[list[int]], None]): Chamada com os números de cada bloco exportado.
+
+    Returns:
+        tuple[int, int]: Quantidade de linhas exportadas e maior nr_sorteio exportado
+            (apos_sorteio se nenhuma linha foi exportada).
+    """
+    if formato not in ESCRITORES:
+        raise ValueError(f"Formato desconhecido: {formato}. Use {', '.join(ESCRITORES)}.")
+    totais = {"linhas": 0, "ultimo": apos_sorteio}
+
+    def contar(blocos):
+        for bloco in blocos:
+            if bloco["nr_sorteio"]:
+                totais["linhas"] += len(bloco["nr_sorteio"])
+                totais["ultimo"] = max(totais["ultimo"], bloco["nr_sorteio"][-1])
+                if ao_exportar is not None:
+                    ao_exportar(bloco["nr_sorteio"])
+            yield bloco
+
+    ESCRITORES[formato](contar(ler_blocos(repository, tamanho_bloco, apos_sorteio, incluir)), destino)
+    return totais["linhas"], totais["ultimo"]
+
+
+class _Lacunas:
+    """
+    Acompanha, durante uma exportação incremental, quais números candidatos não foram
+    exportados: os intervalos faltantes da exportação anterior e tudo acima da marca.
+    Recebe os números exportados em ordem crescente e guarda só os intervalos.
+    """
+
+    def __init__(self, faltantes, marca):
+        self.candidatos = [tuple(intervalo) for intervalo in sorted(faltantes)] + [(marca + 1, None)]
+        self.indice = 0
+        self.esperado = self.candidatos[0][0]
+        self.lacunas = []
+        self.primeiro = None
+        self.ultimo = None
+
+    def __call__(self, numeros):
+        for nr_sorteio in numeros:
+            if self.primeiro is None:
+                self.primeiro = nr_sorteio
+            self.ultimo = nr_sorteio
+            while True:
+                inicio, fim = self.candidatos[self.indice]
+                self.esperado = max(self.esperado, inicio)
+                if fim is not None and nr_sorteio > fim:
+                    if self.esperado <= fim:
+                        self.lacunas.append((self.esperado, fim))
+                    self.indice += 1
+                    continue
+                if nr_sorteio > self.esperado:
+                    self.lacunas.append((self.esperado, nr_sorteio - 1))
+                self.esperado = nr_sorteio + 1
+                break
+
+    def restantes(self):
+        """
+        Returns:
+            list[tuple[int, int]]: Intervalos candidatos que não foram exportados, abaixo do
+                maior número exportado (acima dele nada falta: é a nova marca).
+        """
+        lacunas = list(self.lacunas)
+        for inicio, fim in self.candidatos[self.indice:]:
+            if fim is None:
+                break
+            inicio = max(inicio, self.esperado)
+            if inicio <= fim:
+                lacunas.append((inicio, fim))
+        return lacunas
+
+
+def exportar_incremental(repository, formato, diretorio, tamanho_bloco=1000):
+    """
+    Exporta apenas os sorteios que nenhuma exportação anterior incluiu.
+
+    Cada execução gera diretorio/sorteios_<primeiro>_<ultimo>.<ext>, com o menor e o maior
+    número exportados nela, e atualiza a marca guardada em diretorio/.marca_<formato>.json
+    só depois que o arquivo estiver completo.
+    A marca tem o maior número exportado e os intervalos abaixo dele que ainda faltavam
+    no banco, para que sorteios preenchidos depois (lacunas, falhas coletadas de novo)
+    entrem na exportação seguinte.
+
+    Args:
+        repository (DbSorteios): Repositório do banco de sorteios.
+        formato (str): 'parquet', 'arrow' ou 'csv' (gzip).
+        diretorio (str): Diretório das exportações.
+        tamanho_bloco (int): Quantidade de linhas lidas e escritas por vez.
+
+    Returns:
+        Path | None: Arquivo gerado, ou None se não havia sorteios novos.
+    """
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    caminho_marca = diretorio / f".marca_{formato}.json"
+    marca, faltantes = 0, []
+    if caminho_marca.exists():
+        conteudo = json.loads(caminho_marca.read_text(encoding="utf-8"))
+        marca, faltantes = conteudo["ultimo_nr_sorteio"], conteudo.get("faltantes", [])
+
+    lacunas = _Lacunas(faltantes, marca)
+    temporario = diretorio / f".exportando_{os.getpid()}{EXTENSOES[formato]}"
+    try:
+        linhas, ultimo = exportar(
+            repository, formato, temporario, tamanho_bloco, marca, faltantes, ao_exportar=lacunas
+        )
+        if not linhas:
+            return None
+        destino = diretorio / f"sorteios_{lacunas.primeiro}_{lacunas.ultimo}{EXTENSOES[formato]}"
+        versao = 1
+        while destino.exists():
+            versao += 1
+            destino = diretorio / f"sorteios_{lacunas.primeiro}_{lacunas.ultimo}_{versao}{EXTENSOES[formato]}"
+        os.replace(temporario, destino)
+    finally:
+        temporario.unlink(missing_ok=True)
+
+    marca = {"ultimo_nr_sorteio": ultimo, "faltantes": lacunas.restantes()}
+    gravar_atomico(caminho_marca, json.dumps(marca).encode("utf-8"))
+    logging.info("exportação %s: %d sorteios em %s", formato, linhas, destino)
+    return destino
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(asctime)s %(message)s", level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Exporta a tabela de sorteios.")
+    parser.add_argument("--formato", choices=sorted(ESCRITORES), required=True)
+    parser.add_argument("--destino", required=True, help="arquivo, ou diretório com --incremental")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--tamanho-bloco", type=int, default=1000)
+    args = parser.parse_args()
+
+    repository = DbSorteios(criar_engine(config.caminho_db))
+    if args.incremental:
+        exportar_incremental(repository, args.formato, args.destino, args.tamanho_bloco)
+    else:
+        exportar(repository, args.formato, args.destino, args.tamanho_bloco)
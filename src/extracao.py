@@ -0,0 +1,195 @@
+"""
+Funções puras que convertem os textos da página de resultados nos valores de um sorteio.
+
+Não dependem do Selenium: recebem as strings já lidas do DOM, seja elemento a
+elemento ou de uma só vez pelo script de extração.
+"""
+from src.jogos import MEGA_SENA
+
+# Lê, em uma única chamada, o innerText de todos os nós de cada XPath recebido.
+SCRIPT_EXTRACAO = """
+const xpaths = arguments[0];
+const resultado = {};
+for (const [chave, xpath] of Object.entries(xpaths)) {
+    const nos = document.evaluate(
+        xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    const textos = [];
+    for (let i = 0; i < nos.snapshotLength; i++) {
+        textos.push(nos.snapshotItem(i).innerText.trim());
+    }
+    resultado[chave] = textos;
+}
+return resultado;
+"""
+
+# Lê o título do sorteio e se o overlay de loading está visível, em uma única chamada.
+SCRIPT_ESTADO = """
+const primeiro = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const numero = primeiro(arguments[0]);
+const loading = primeiro(arguments[1]);
+const carregando = !!loading
+    && loading.getClientRects().length > 0
+    && getComputedStyle(loading).visibility !== "hidden";
+return [numero ? numero.innerText.trim() : null, carregando];
+"""
+
+# Retorna o tempo, em ms, até o DOMContentLoaded da navegação atual (null se indisponível).
+SCRIPT_CARREGAMENTO = """
+const navegacao = performance.getEntriesByType("navigation")[0];
+return navegacao ? navegacao.domContentLoadedEventEnd : null;
+"""
+
+def campos_extracao(jogo=MEGA_SENA):
+    """
+    Lista os campos da tabela de locators lidos pelo script de extração para um jogo.
+
+    :param jogo: Definição do jogo (padrão é a Mega-Sena).
+    :return: Tupla com as chaves dos campos.
+    """
+    campos = ["numero_do_sorteio"]
+    campos.extend(f"dezenas{sufixo}" for sufixo in jogo.sufixos)
+    campos.append("local")
+    for sufixo in jogo.sufixos:
+        for faixa in jogo.faixas:
+            campos.extend((f"{faixa}_acertos{sufixo}", f"{faixa}_acertos{sufixo}2"))
+    return tuple(campos)
+
+
+# Campos da tabela de locators lidos pelo script de extração na Mega-Sena.
+CAMPOS_EXTRACAO = campos_extracao(MEGA_SENA)
+
+# Ordem dos valores devolvidos por montar_valores na Mega-Sena, igual às colunas de DataBase.
+COLUNAS = MEGA_SENA.colunas
+
+
+def extrair_nr_sorteio(texto_sorteio):
+    """
+    Extrai o número do sorteio de um texto como 'Concurso 1 (11/03/1996)'.
+
+    :param texto_sorteio: Texto do título do sorteio.
+    :return: Número do sorteio em formato Integer.
+    """
+    return int(
+        texto_sorteio[texto_sorteio.index(" ") + 1 : texto_sorteio.index("(") - 1]
+    )
+
+
+def extrair_data_sorteio(texto_sorteio):
+    """
+    Extrai a data de um texto como 'Concurso 1 (11/03/1996)'.
+
+    :param texto_sorteio: Texto do título do sorteio.
+    :return: A data do sorteio no formato de string.
+    """
+    return texto_sorteio[texto_sorteio.index("(") + 1 : texto_sorteio.index(")")]
+
+
+def eh_mega_da_virada(data_sorteio):
+    """
+    Indica se o sorteio é da Mega da Virada (31/12 a partir de 2008).
+
+    :param data_sorteio: Data no formato 'dd/mm/aaaa'.
+    :return: True se for Mega da Virada.
+    """
+    return data_sorteio.startswith("31/12") and int(data_sorteio[-4:]) >= 2008
+
+
+def extrair_local(texto_local):
+    """
+    Extrai o local de um texto como 'Sorteio realizado no ESPAÇO DA SORTE em SÃO PAULO, SP'.
+
+    :param texto_local: Texto do parágrafo de local.
+    :return: O local do sorteio como uma string.
+    """
+    try:
+        return texto_local[texto_local.index(" em ") + 4 :]
+    except ValueError:
+        return "Não informado"
+
+
+def tratar_texto_acertos(texto):
+    """
+    Analisa e extrai informações sobre ganhadores e prêmios de acordo com o texto fornecido.
+
+    :param texto: O texto que contém informações sobre ganhadores e prêmios.
+    :return: Uma tupla contendo a quantidade de ganhadores e o valor do prêmio.
+    """
+    texto = texto[texto.index("\n") + 1 :]
+    if texto == "Não houve ganhadores":
+        return 0, 0.0
+    qtd_ganhadores = int(texto[: texto.index(" ")].replace(".", ""))
+    premio = float(
+        texto[texto.rindex(" ") + 1 :].replace(".", "").replace(",", ".")
+    )
+    return qtd_ganhadores, premio
+
+
+def _primeiro_texto(campos, chave):
+    textos = campos.get(chave) or []
+    if not textos:
+        raise ValueError(f"Campo '{chave}' não encontrado na página.")
+    return textos[0]
+
+
+def _texto_faixa(campos, faixa, sufixo):
+    texto = _primeiro_texto(campos, f"{faixa}_acertos{sufixo}")
+    if "\n" not in texto:
+        texto = _primeiro_texto(campos, f"{faixa}_acertos{sufixo}2")
+    return texto
+
+
+def verificar_campos(campos, jogo=MEGA_SENA):
+    """
+    Confere, sem converter os textos, se os campos trazem tudo o que montar_valores usa.
+
+    :param campos: Dicionário {campo: [textos]} com as chaves de campos_extracao(jogo).
+    :param jogo: Definição do jogo (padrão é a Mega-Sena).
+    :return: O número do sorteio.
+    """
+    texto_sorteio = _primeiro_texto(campos, "numero_do_sorteio")
+    for chave in (*(f"dezenas{sufixo}" for sufixo in jogo.sufixos), "local"):
+        _primeiro_texto(campos, chave)
+    for sufixo in jogo.sufixos:
+        for faixa in jogo.faixas:
+            _texto_faixa(campos, faixa, sufixo)
+    return extrair_nr_sorteio(texto_sorteio)
+
+
+def montar_valores(campos, jogo=MEGA_SENA):
+    """
+    Monta a tupla de valores de um sorteio a partir do retorno do SCRIPT_EXTRACAO.
+
+    :param campos: Dicionário {campo: [textos]} com as chaves de campos_extracao(jogo).
+    :param jogo: Definição do jogo (padrão é a Mega-Sena).
+    :return: Tupla na ordem de jogo.colunas (na Mega-Sena, o formato de LoteriasCaixa.coletar_valores).
+    """
+    texto_sorteio = _primeiro_texto(campos, "numero_do_sorteio")
+    data_sorteio = extrair_data_sorteio(texto_sorteio)
+    valores = [extrair_nr_sorteio(texto_sorteio)]
+    if jogo.mega_da_virada:
+        valores.append(eh_mega_da_virada(data_sorteio))
+    valores.append(data_sorteio)
+    for sufixo in jogo.sufixos:
+        dezenas = campos.get(f"dezenas{sufixo}") or []
+        if not dezenas:
+            raise ValueError(f"Campo 'dezenas{sufixo}' não encontrado na página.")
+        valores.append(", ".join(dezenas))
+    valores.append(extrair_local(_primeiro_texto(campos, "local")))
+    for sufixo in jogo.sufixos:
+        for faixa in jogo.faixas:
+            valores.extend(tratar_texto_acertos(_texto_faixa(campos, faixa, sufixo)))
+    return tuple(valores)
+
+
+def montar_dicionario(valores, jogo=MEGA_SENA):
+    """
+    Converte a tupla de montar_valores no dicionário usado por DbSorteios.
+
+    :param valores: Tupla de valores do sorteio.
+    :param jogo: Definição do jogo (padrão é a Mega-Sena).
+    :return: Dicionário {coluna: valor}.
+    """
+    return dict(zip(jogo.colunas, valores))
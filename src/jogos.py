@@ -0,0 +1,176 @@
+"""
+Definições dos jogos das Loterias Caixa que podem ser coletados.
+
+Cada Jogo descreve o que muda de um jogo para outro: endereços da página e da API,
+tabelas no banco, quantidade de dezenas, faixas de premiação e os XPaths que não
+seguem o padrão da página de resultados. O restante do coletor é o mesmo para
+todos os jogos.
+"""
+from pathlib import Path
+
+from src.config import config
+
+# Sufixo das colunas e campos de cada sorteio do concurso (a Dupla Sena tem dois).
+SUFIXOS_SORTEIO = ("", "_segundo")
+
+
+class Jogo:
+    """
+    Definição de um jogo.
+
+    Atributos:
+        nome (str): Identificador usado na configuração, nos nomes das tabelas e nas métricas.
+        titulo (str): Nome do jogo para exibição.
+        url (str): Página de resultados.
+        url_api (str): URL base da API JSON.
+        dezenas_por_sorteio (int): Quantidade de dezenas sorteadas.
+        maior_dezena (int): As dezenas vão de 1 a maior_dezena.
+        faixas (tuple[str]): Faixas de premiação, da maior para a menor, pela quantidade de
+            acertos por extenso; dão nome às colunas ganhadores_<faixa>_dezenas e premio_<faixa>_dezenas.
+        sorteios (int): Sorteios por concurso.
+        mega_da_virada (bool): Se a tabela tem a coluna mega_da_virada.
+        xpaths (dict[str, str]): XPaths que diferem dos de LoteriasCaixa.locators.
+        tabela (str): Tabela de sorteios no banco.
+        tabela_falhas (str): Tabela do registro de falhas no banco.
+    """
+
+    def __init__(self, nome, titulo, url, url_api, dezenas_por_sorteio, maior_dezena, faixas,
+                 sorteios=1, mega_da_virada=False, xpaths=None, tabela=None, tabela_falhas=None):
+        self.nome = nome
+        self.titulo = titulo
+        self.url = url
+        self.url_api = url_api
+        self.dezenas_por_sorteio = dezenas_por_sorteio
+        self.maior_dezena = maior_dezena
+        self.faixas = tuple(faixas)
+        self.sorteios = sorteios
+        self.mega_da_virada = mega_da_virada
+        self.xpaths = dict(xpaths or {})
+        self.tabela = tabela or f"sorteios_{nome}"
+        self.tabela_falhas = tabela_falhas or f"falhas_coleta_{nome}"
+
+    def __repr__(self):
+        return f"Jogo({self.nome!r})"
+
+    @property
+    def sufixos(self):
+        """
+        Returns:
+            tuple[str]: Sufixo das colunas de cada sorteio do concurso.
+        """
+        return SUFIXOS_SORTEIO[: self.sorteios]
+
+    def colunas_premiacao(self):
+        """
+        Returns:
+            list[tuple[str, str]]: (coluna de ganhadores, coluna de prêmio) de cada faixa de
+                cada sorteio, na ordem das faixas da API.
+        """
+        return [
+            (f"ganhadores_{faixa}_dezenas{sufixo}", f"premio_{faixa}_dezenas{sufixo}")
+            for sufixo in self.sufixos
+            for faixa in self.faixas
+        ]
+
+    @property
+    def colunas(self):
+        """
+        Returns:
+            tuple[str]: Colunas na ordem dos valores devolvidos por extracao.montar_valores.
+        """
+        colunas = ["nr_sorteio"]
+        if self.mega_da_virada:
+            colunas.append("mega_da_virada")
+        colunas.append("data_sorteio")
+        colunas.extend(f"dezenas{sufixo}" for sufixo in self.sufixos)
+        colunas.append("local_do_sorteio")
+        for ganhadores, premio in self.colunas_premiacao():
+            colunas.extend((ganhadores, premio))
+        return tuple(colunas)
+
+    def caminho_proprio(self, caminho):
+        """
+        Deriva, de um caminho da configuração, o caminho usado por este jogo: a Mega-Sena
+        usa o próprio caminho e os demais jogos acrescentam o nome ao fim ('arquivo_sorteios'
+        vira 'arquivo_sorteios_quina').
+
+        Args:
+            caminho (str | None): Caminho da configuração.
+
+        Returns:
+            str | None: Caminho do jogo (None se caminho for None).
+        """
+        if not caminho or self is MEGA_SENA:
+            return caminho
+        caminho = Path(caminho)
+        return str(caminho.with_name(f"{caminho.stem}_{self.nome}{caminho.suffix}"))
+
+
+MEGA_SENA = Jogo(
+    nome="megasena",
+    titulo="Mega-Sena",
+    url=config.url,
+    url_api=config.url_api,
+    dezenas_por_sorteio=6,
+    maior_dezena=60,
+    faixas=("seis", "cinco", "quatro"),
+    mega_da_virada=True,
+    tabela="sorteios",
+    tabela_falhas="falhas_coleta",
+)
+
+LOTOFACIL = Jogo(
+    nome="lotofacil",
+    titulo="Lotofácil",
+    url=r"https://loterias.caixa.gov.br/Paginas/Lotofacil.aspx",
+    url_api=r"https://servicebus2.caixa.gov.br/portaldeloterias/api/lotofacil",
+    dezenas_por_sorteio=15,
+    maior_dezena=25,
+    faixas=("quinze", "quatorze", "treze", "doze", "onze"),
+)
+
+QUINA = Jogo(
+    nome="quina",
+    titulo="Quina",
+    url=r"https://loterias.caixa.gov.br/Paginas/Quina.aspx",
+    url_api=r"https://servicebus2.caixa.gov.br/portaldeloterias/api/quina",
+    dezenas_por_sorteio=5,
+    maior_dezena=80,
+    faixas=("cinco", "quatro", "tres", "duas"),
+)
+
+# O segundo sorteio usa o mesmo layout do primeiro no bloco seguinte da página.
+DUPLA_SENA = Jogo(
+    nome="duplasena",
+    titulo="Dupla Sena",
+    url=r"https://loterias.caixa.gov.br/Paginas/Dupla-Sena.aspx",
+    url_api=r"https://servicebus2.caixa.gov.br/portaldeloterias/api/duplasena",
+    dezenas_por_sorteio=6,
+    maior_dezena=50,
+    faixas=("seis", "cinco", "quatro", "tres"),
+    sorteios=2,
+    xpaths={"dezenas_segundo": '//*[@id="ulDezenas2"]//li'},
+)
+
+JOGOS = {jogo.nome: jogo for jogo in (MEGA_SENA, LOTOFACIL, QUINA, DUPLA_SENA)}
+
+
+def obter_jogo(jogo):
+    """
+    Args:
+        jogo (str | Jogo | None): Nome de um jogo de JOGOS, o próprio Jogo ou None.
+
+    Returns:
+        Jogo: A definição do jogo (a Mega-Sena se jogo for None).
+
+    Raises:
+        ValueError: Se o nome não for de um jogo conhecido.
+    """
+    if jogo is None:
+        return MEGA_SENA
+    if isinstance(jogo, Jogo):
+        return jogo
+    try:
+        return JOGOS[jogo]
+    except KeyError:
+        raise ValueError(f"Jogo desconhecido: {jogo!r} (conhecidos: {', '.join(JOGOS)}).") from None
@@ -0,0 +1,217 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from src.arquivo import gravar_atomico
+
+# prefixo comum a todos os jogos; o jogo de cada série vai no rótulo jogo
+PREFIXO = "loterias"
+# rótulo jogo das séries que não pertencem a um jogo só (um recurso do processo inteiro)
+TODOS_JOGOS = "todos"
+
+# Limites superiores, em segundos, dos buckets dos histogramas.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histograma:
+    """
+    Histograma de durações com buckets fixos, como os do Prometheus.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.quantidade = 0
+        self.soma = 0.0
+        self.minimo = None
+        self.maximo = None
+
+    def observar(self, valor):
+        self.buckets[bisect_left(BUCKETS, valor)] += 1
+        self.quantidade += 1
+        self.soma += valor
+        self.minimo = valor if self.minimo is None else min(self.minimo, valor)
+        self.maximo = valor if self.maximo is None else max(self.maximo, valor)
+
+    def quantil(self, q):
+        """
+        Estima um quantil interpolando linearmente dentro do bucket em que ele cai,
+        como o histogram_quantile do Prometheus, limitado ao mínimo e ao máximo observados.
+
+        :param q: Quantil entre 0 e 1.
+        :return: Valor estimado em segundos, ou None se não houver observações.
+        """
+        if not self.quantidade:
+            return None
+        alvo = q * self.quantidade
+        acumulado, inferior = 0, 0.0
+        for limite, contagem in zip(BUCKETS, self.buckets):
+            if contagem and acumulado + contagem >= alvo:
+                estimado = inferior + (limite - inferior) * (alvo - acumulado) / contagem
+                return min(max(estimado, self.minimo), self.maximo)
+            acumulado += contagem
+            inferior = limite
+        return self.maximo
+
+    def resumo(self):
+        return {
+            "quantidade": self.quantidade,
+            "soma_s": self.soma,
+            "media_s": self.soma / self.quantidade if self.quantidade else None,
+            "min_s": self.minimo,
+            "p50_s": self.quantil(0.5),
+            "p95_s": self.quantil(0.95),
+            "max_s": self.maximo,
+        }
+
+
+def _formatar_rotulos(rotulos, extra=None):
+    pares = list(rotulos) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{chave}="{valor}"' for chave, valor in pares) + "}"
+
+
+class Metricas:
+    """
+    Registro de histogramas de duração, contadores e medidores, exportável como arquivo
+    texto do Prometheus e como resumo JSON da execução.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.histogramas = {}
+        self.contadores = {}
+        self.medidores = {}
+        self.inicio = time.time()
+
+    @staticmethod
+    def _chave(nome, rotulos):
+        return nome, tuple(sorted(rotulos.items()))
+
+    def observar(self, nome, segundos, **rotulos):
+        """
+        Registra uma duração no histograma nome{rotulos}.
+        """
+        chave = self._chave(nome, rotulos)
+        with self._trava:
+            histograma = self.histogramas.get(chave)
+            if histograma is None:
+                histograma = self.histogramas[chave] = Histograma()
+            histograma.observar(segundos)
+
+    @contextmanager
+    def medir(self, nome, **rotulos):
+        """
+        Mede a duração do bloco no histograma nome{rotulos}, inclusive se ele levantar exceção.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, **rotulos)
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        """
+        Soma valor ao contador nome{rotulos}.
+        """
+        chave = self._chave(nome, rotulos)
+        with self._trava:
+            self.contadores[chave] = self.contadores.get(chave, 0) + valor
+
+    def definir(self, nome, valor, **rotulos):
+        """
+        Define o valor atual do medidor nome{rotulos}.
+        """
+        chave = self._chave(nome, rotulos)
+        with self._trava:
+            self.medidores[chave] = valor
+
+    def histograma(self, nome, **rotulos):
+        """
+        :return: O histograma nome{rotulos}, ou None se não houver observações.
+        """
+        return self.histogramas.get(self._chave(nome, rotulos))
+
+    def limpar(self):
+        with self._trava:
+            self.histogramas.clear()
+            self.contadores.clear()
+            self.medidores.clear()
+            self.inicio = time.time()
+
+    def texto_prometheus(self):
+        """
+        :return: As métricas no formato texto de exposição do Prometheus.
+        """
+        linhas = []
+        with self._trava:
+            tipos_escritos = set()
+            for (nome, rotulos), histograma in sorted(self.histogramas.items()):
+                metrica = f"{PREFIXO}_{nome}_segundos"
+                if metrica not in tipos_escritos:
+                    linhas.append(f"# TYPE {metrica} histogram")
+                    tipos_escritos.add(metrica)
+                acumulado = 0
+                for limite, contagem in zip(BUCKETS + ("+Inf",), histograma.buckets):
+                    acumulado += contagem
+                    linhas.append(
+                        f"{metrica}_bucket{_formatar_rotulos(rotulos, ('le', limite))} {acumulado}"
+                    )
+                linhas.append(f"{metrica}_sum{_formatar_rotulos(rotulos)} {histograma.soma}")
+                linhas.append(f"{metrica}_count{_formatar_rotulos(rotulos)} {histograma.quantidade}")
+            for (nome, rotulos), valor in sorted(self.contadores.items()):
+                metrica = f"{PREFIXO}_{nome}_total"
+                if metrica not in tipos_escritos:
+                    linhas.append(f"# TYPE {metrica} counter")
+                    tipos_escritos.add(metrica)
+                linhas.append(f"{metrica}{_formatar_rotulos(rotulos)} {valor}")
+            for (nome, rotulos), valor in sorted(self.medidores.items()):
+                metrica = f"{PREFIXO}_{nome}"
+                if metrica not in tipos_escritos:
+                    linhas.append(f"# TYPE {metrica} gauge")
+                    tipos_escritos.add(metrica)
+                linhas.append(f"{metrica}{_formatar_rotulos(rotulos)} {valor}")
+        return "\n".join(linhas) + "\n"
+
+    def resumo(self, **extras):
+        """
+        :param extras: Campos adicionais do resumo (por exemplo, o status da execução).
+        :return: Dicionário com a duração da execução, os histogramas, os contadores e os medidores.
+        """
+        with self._trava:
+            return {
+                "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.inicio)),
+                "duracao_s": time.time() - self.inicio,
+                **extras,
+                "histogramas": {
+                    nome + _formatar_rotulos(rotulos): histograma.resumo()
+                    for (nome, rotulos), histograma in sorted(self.histogramas.items())
+                },
+                "contadores": {
+                    nome + _formatar_rotulos(rotulos): valor
+                    for (nome, rotulos), valor in sorted(self.contadores.items())
+                },
+                "medidores": {
+                    nome + _formatar_rotulos(rotulos): valor
+                    for (nome, rotulos), valor in sorted(self.medidores.items())
+                },
+            }
+
+    def exportar(self, caminho_prometheus=None, caminho_json=None, **extras):
+        """
+        Grava as métricas nos arquivos informados, substituindo-os de forma atômica.
+
+        :param caminho_prometheus: Arquivo texto para o textfile collector do Prometheus.
+        :param caminho_json: Arquivo do resumo JSON da execução.
+        :param extras: Campos adicionais do resumo JSON.
+        """
+        if caminho_prometheus:
+            gravar_atomico(caminho_prometheus, self.texto_prometheus().encode("utf-8"))
+        if caminho_json:
+            conteudo = json.dumps(self.resumo(**extras), indent=2, ensure_ascii=False)
+            gravar_atomico(caminho_json, conteudo.encode("utf-8"))
+
+
+metricas = Metricas()
@@ -0,0 +1,170 @@
+import logging
+import queue
+import threading
+from time import monotonic, perf_counter
+
+from src import extracao
+from src.jogos import MEGA_SENA
+from src.metricas import metricas
+
+# Marca o fim dos itens de uma fila.
+_FIM = object()
+
+
+class PipelineSorteios:
+    """
+    Pipeline produtor/consumidor que tira o parsing e a gravação no banco do caminho
+    do navegador.
+
+    O navegador envia os textos lidos de cada página (o dicionário {campo: [textos]}
+    de coletar_campos_por_script) para uma fila limitada. Uma thread guarda os textos
+    no arquivo de páginas e os converte em registros; outra agrupa os registros
+    em lotes e os grava com DbSorteios.create_many. Com as filas cheias, enviar
+    bloqueia o navegador até os estágios seguintes alcançarem.
+
+    Atributos:
+        falhas (list[tuple[int | None, str]]): Sorteios descartados por erro de parsing e a
+            mensagem do erro (número None se nem ele pôde ser lido).
+    """
+
+    def __init__(self, repository, arquivo=None, tamanho_fila=256, tamanho_lote=500, intervalo_gravacao=1.0,
+                 jogo=MEGA_SENA):
+        """
+        Args:
+            repository (DbSorteios): Repositório onde os registros são gravados.
+            arquivo (ArquivoSorteios): Arquivo de páginas onde os textos lidos são guardados (opcional).
+            tamanho_fila (int): Capacidade de cada fila entre os estágios.
+            tamanho_lote (int): Quantidade máxima de registros por gravação.
+            intervalo_gravacao (float): Tempo máximo, em segundos, que um registro espera
+                por outros para formar um lote.
+            jogo (Jogo): Jogo dos sorteios enviados (padrão é a Mega-Sena).
+        """
+        self.repository = repository
+        self.jogo = jogo
+        self.arquivo = arquivo
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_gravacao = intervalo_gravacao
+        self.falhas = []
+        self._campos = queue.Queue(tamanho_fila)
+        self._registros = queue.Queue(tamanho_fila)
+        self._erro = None
+        self._fechado = False
+        self._threads = [
+            threading.Thread(target=self._parsear, name="pipeline-parsing", daemon=True),
+            threading.Thread(target=self._gravar, name="pipeline-gravacao", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def enviar(self, campos):
+        """
+        Enfileira os textos de uma página, bloqueando enquanto a fila estiver cheia.
+
+        Args:
+            campos (dict): {campo: [textos]} com as chaves de extracao.campos_extracao(jogo).
+
+        Raises:
+            RuntimeError: Se o pipeline já foi fechado.
+            Exception: O erro que interrompeu a thread de gravação, se houver.
+        """
+        if self._fechado:
+            raise RuntimeError("O pipeline já foi fechado.")
+        self._verificar_erro()
+        with metricas.medir("espera_fila", jogo=self.jogo.nome):
+            self._campos.put(campos)
+
+    def fechar(self):
+        """
+        Sinaliza o fim dos envios, espera as filas esvaziarem e as threads terminarem.
+
+        Raises:
+            Exception: O erro que interrompeu a thread de gravação, se houver.
+        """
+        if not self._fechado:
+            self._fechado = True
+            self._campos.put(_FIM)
+            for thread in self._threads:
+                thread.join()
+        self._verificar_erro()
+
+    def _verificar_erro(self):
+        if self._erro is not None:
+            raise self._erro
+
+    def _parsear(self):
+        while (campos := self._campos.get()) is not _FIM:
+            if self._erro is not None:
+                continue
+            texto = (campos.get("numero_do_sorteio") or [""])[0]
+            try:
+                nr_sorteio = extracao.extrair_nr_sorteio(texto)
+            except (ValueError, TypeError, AttributeError):
+                nr_sorteio = None
+            try:
+                # arquiva antes de interpretar: as páginas que o parser não entende são as que
+                # src.reparse precisa recuperar depois da correção
+                if self.arquivo is not None and nr_sorteio is not None:
+                    self.arquivo.salvar(nr_sorteio, campos)
+            except Exception as e:
+                self._erro = e
+                logging.exception(e)
+                continue
+            try:
+                valores = extracao.montar_valores(campos, self.jogo)
+            except (ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+                self.falhas.append((nr_sorteio, f"{type(e).__name__}: {e}"))
+                metricas.incrementar("falhas_parsing", jogo=self.jogo.nome)
+                logging.error("sorteio descartado (%s): %r", texto, e)
+                continue
+            try:
+                self._registros.put(extracao.montar_dicionario(valores, self.jogo))
+            except Exception as e:
+                self._erro = e
+                logging.exception(e)
+        self._registros.put(_FIM)
+
+    def _proximo_lote(self):
+        """
+        Espera o primeiro registro e junta os que chegarem até completar tamanho_lote
+        ou passar intervalo_gravacao.
+
+        Returns:
+            tuple[list[dict], bool]: O lote e se o fim da fila foi alcançado.
+        """
+        registro = self._registros.get()
+        if registro is _FIM:
+            return [], True
+        lote = [registro]
+        limite = monotonic() + self.intervalo_gravacao
+        while len(lote) < self.tamanho_lote:
+            try:
+                registro = self._registros.get(timeout=max(0.0, limite - monotonic()))
+            except queue.Empty:
+                break
+            if registro is _FIM:
+                return lote, True
+            lote.append(registro)
+        return lote, False
+
+    def _gravar(self):
+        fim = False
+        while not fim:
+            lote, fim = self._proximo_lote()
+            if not lote or self._erro is not None:
+                # depois de um erro, só esvazia a fila para não travar os outros estágios
+                continue
+            try:
+                inicio = perf_counter()
+                self.repository.create_many(lote)
+                logging.info(
+                    "lote de %d sorteios gravado em %.0f ms", len(lote), 1000 * (perf_counter() - inicio)
+                )
+            except Exception as e:
+                self._erro = e
+                logging.exception(e)
@@ -0,0 +1,153 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from src.metricas import TODOS_JOGOS, metricas
+
+
+class Emprestimo:
+    """
+    Navegador emprestado pelo pool.
+
+    Atributos:
+        vaga (int): Vaga do pool ocupada pelo navegador (0 a tamanho - 1).
+        driver: Instância do driver. Quem substituir o navegador (ao reiniciá-lo, por
+            exemplo) deve atualizar este atributo para o pool receber o novo de volta.
+        pagina (str | None): Página em que o navegador está (None se acabou de ser aberto).
+    """
+
+    def __init__(self, vaga, driver, pagina=None):
+        self.vaga = vaga
+        self.driver = driver
+        self.pagina = pagina
+
+
+class PoolNavegadores:
+    """
+    Conjunto limitado de navegadores compartilhado entre as coletas de vários jogos.
+
+    Os navegadores são abertos sob demanda, até tamanho, e reaproveitados entre as
+    tarefas. Cada um ocupa uma vaga fixa, que o coletor usa, por exemplo, para escolher
+    um diretório de perfil que nenhum outro navegador aberto está usando. Quando todas
+    as vagas estão em uso, obter espera um navegador ser devolvido.
+    """
+
+    def __init__(self, abrir, tamanho, fechar=None):
+        """
+        Args:
+            abrir (Callable[[int], driver]): Abre um navegador para a vaga informada.
+            tamanho (int): Quantidade máxima de navegadores abertos ao mesmo tempo.
+            fechar (Callable[[driver], None]): Fecha um navegador (padrão é driver.quit()).
+        """
+        if tamanho < 1:
+            raise ValueError("O pool precisa de pelo menos um navegador.")
+        self.abrir = abrir
+        self.fechar_navegador = fechar or (lambda driver: driver.quit())
+        self.tamanho = tamanho
+        self._condicao = threading.Condition()
+        self._livres = list(range(tamanho))
+        self._ociosos = []
+        self._fechado = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def obter(self, pagina=None, jogo=TODOS_JOGOS):
+        """
+        Retira um navegador do pool, preferindo um ocioso que já esteja em pagina; sem
+        ociosos, abre um novo em uma vaga livre ou espera um ser devolvido.
+
+        Args:
+            pagina (str): Página que o chamador vai usar.
+            jogo (str): Jogo do chamador, para o rótulo da espera nas métricas.
+
+        Returns:
+            Emprestimo: O navegador emprestado, a ser devolvido com devolver.
+
+        Raises:
+            RuntimeError: Se o pool já foi fechado.
+        """
+        with metricas.medir("espera_navegador", jogo=jogo), self._condicao:
+            while True:
+                if self._fechado:
+                    raise RuntimeError("O pool de navegadores já foi fechado.")
+                if self._ociosos:
+                    indice = next(
+                        (i for i, ocioso in enumerate(self._ociosos) if ocioso.pagina == pagina), -1
+                    )
+                    return self._ociosos.pop(indice)
+                if self._livres:
+                    vaga = self._livres.pop(0)
+                    break
+                self._condicao.wait()
+        try:
+            return Emprestimo(vaga, self.abrir(vaga))
+        except BaseException:
+            self._liberar(vaga)
+            raise
+
+    def devolver(self, emprestimo, descartar=False):
+        """
+        Devolve um navegador ao pool.
+
+        Args:
+            emprestimo (Emprestimo): O navegador retirado com obter.
+            descartar (bool): Fecha o navegador em vez de guardá-lo, liberando a vaga para
+                um novo (use depois de erros, quando o estado dele é desconhecido).
+        """
+        with self._condicao:
+            if not descartar and not self._fechado and emprestimo.driver is not None:
+                self._ociosos.append(emprestimo)
+                self._condicao.notify()
+                return
+        self._descartar(emprestimo)
+
+    @contextmanager
+    def emprestar(self, pagina=None, jogo=TODOS_JOGOS):
+        """
+        Empresta um navegador durante o bloco: devolve-o ao fim ou o descarta se o bloco
+        levantar exceção.
+
+        Args:
+            pagina (str): Página que o chamador vai usar (ver obter).
+            jogo (str): Jogo do chamador (ver obter).
+
+        Yields:
+            Emprestimo: O navegador emprestado.
+        """
+        emprestimo = self.obter(pagina, jogo)
+        try:
+            yield emprestimo
+        except BaseException:
+            self.devolver(emprestimo, descartar=True)
+            raise
+        self.devolver(emprestimo)
+
+    def fechar(self):
+        """
+        Fecha os navegadores ociosos. Os que estiverem emprestados são fechados quando
+        forem devolvidos.
+        """
+        with self._condicao:
+            self._fechado = True
+            ociosos, self._ociosos = self._ociosos, []
+            self._condicao.notify_all()
+        for emprestimo in ociosos:
+            self._descartar(emprestimo)
+
+    def _descartar(self, emprestimo):
+        if emprestimo.driver is not None:
+            try:
+                self.fechar_navegador(emprestimo.driver)
+            except Exception as e:
+                logging.warning("erro ao fechar o navegador da vaga %d: %r", emprestimo.vaga, e)
+        self._liberar(emprestimo.vaga)
+
+    def _liberar(self, vaga):
+        with self._condicao:
+            self._livres.append(vaga)
+            self._livres.sort()
+            self._condicao.notify()
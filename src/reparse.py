@@ -0,0 +1,100 @@
+"""
+Reconstrói o banco de sorteios a partir do arquivo de páginas, sem navegador.
+
+Uso:
+    python -m src.reparse [--jogo NOME] [--processos N] [--manter-db]
+"""
+import argparse
+import logging
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from src import extracao
+from src.arquivo import ArquivoSorteios
+from src.config import config
+from src.database import DbSorteios, apagar_sorteios, criar_engine
+from src.jogos import JOGOS, MEGA_SENA, obter_jogo
+
+# erros de uma página arquivada corrompida ou com textos inesperados: o gzip/JSON do objeto
+# (OSError, EOFError, zlib.error, ValueError) e os textos fora do formato esperado pela extração
+# (ValueError, KeyError, IndexError, TypeError, AttributeError)
+ERROS_PAGINA = (ValueError, KeyError, IndexError, TypeError, AttributeError, OSError, EOFError, zlib.error)
+
+
+def parsear_lote(raiz, itens, nome_jogo=MEGA_SENA.nome):
+    """
+    Lê e interpreta um lote de páginas do arquivo.
+
+    :param raiz: Diretório raiz do arquivo.
+    :param itens: Lista de tuplas (nr_sorteio, hash).
+    :param nome_jogo: Nome do jogo das páginas.
+    :return: Tupla (dicionários, falhas), com falhas como lista de (nr_sorteio, mensagem).
+    """
+    jogo = obter_jogo(nome_jogo)
+    arquivo = ArquivoSorteios(raiz)
+    dicionarios, falhas = [], []
+    for nr_sorteio, hash_conteudo in itens:
+        try:
+            campos = arquivo.carregar_objeto(hash_conteudo)
+            dicionarios.append(extracao.montar_dicionario(extracao.montar_valores(campos, jogo), jogo))
+        except ERROS_PAGINA as e:
+            falhas.append((nr_sorteio, repr(e)))
+    return dicionarios, falhas
+
+
+def reparsear(raiz=None, caminho_db=None, processos=None, recriar=True, jogo=None):
+    """
+    Reprocessa todas as páginas arquivadas em paralelo e grava o resultado no banco.
+
+    :param raiz: Diretório raiz do arquivo (padrão é o arquivo do jogo em config.caminho_arquivo).
+    :param caminho_db: Banco de destino (padrão é config.caminho_db).
+    :param processos: Quantidade de processos (padrão é a quantidade de CPUs).
+    :param recriar: Apaga os sorteios do jogo antes de reconstruí-los.
+    :param jogo: Nome ou definição do jogo (padrão é a Mega-Sena).
+    :return: Lista de (nr_sorteio, mensagem) dos sorteios que não puderam ser interpretados.
+    """
+    jogo = obter_jogo(jogo)
+    raiz = raiz or jogo.caminho_proprio(config.caminho_arquivo)
+    caminho_db = caminho_db or config.caminho_db
+    processos = processos or os.cpu_count() or 1
+
+    inicio = perf_counter()
+    itens = ArquivoSorteios(raiz).listar()
+    tamanho = max(1, -(-len(itens) // (processos * 4)))
+    lotes = [itens[i : i + tamanho] for i in range(0, len(itens), tamanho)]
+
+    engine = criar_engine(caminho_db)
+    if recriar:
+        apagar_sorteios(engine, jogo)
+    repository = DbSorteios(
+        engine,
+        tamanho_lote=config.tamanho_lote,
+        caminho_colunar=config.caminho_colunar if jogo is MEGA_SENA else None,
+        jogo=jogo,
+    )
+
+    falhas = []
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        mapa = executor.map(parsear_lote, [raiz] * len(lotes), lotes, [jogo.nome] * len(lotes))
+        for dicionarios, falhas_lote in mapa:
+            repository.create_many(dicionarios)
+            falhas.extend(falhas_lote)
+
+    for nr_sorteio, mensagem in falhas:
+        logging.warning("sorteio %d não reprocessado: %s", nr_sorteio, mensagem)
+    logging.info(
+        "reparse da %s: %d sorteios em %.2f s", jogo.titulo, len(itens) - len(falhas), perf_counter() - inicio
+    )
+    return falhas
+
+
+if __name__ == "__main__":
+    logging.basicConfig(format="%(asctime)s %(message)s", level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Reconstrói o banco a partir do arquivo de páginas.")
+    parser.add_argument("--jogo", choices=list(JOGOS), default=MEGA_SENA.nome)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--manter-db", action="store_true", help="atualiza o banco existente em vez de recriá-lo")
+    args = parser.parse_args()
+    reparsear(processos=args.processos, recriar=not args.manter_db, jogo=args.jogo)
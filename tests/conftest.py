@@ -0,0 +1,43 @@
+import pytest
+
+from ferramentas.servidor_stub import gerar_respostas, iniciar_servidor
+from src.config import config
+from src.metricas import metricas
+
+
+@pytest.fixture(autouse=True)
+def config_temporaria(tmp_path, monkeypatch):
+    """
+    Direciona os arquivos gravados pela coleta para o diretório temporário do teste e
+    começa cada teste com as métricas zeradas.
+    """
+    monkeypatch.setattr(config, "caminho_db", str(tmp_path / "sorteios.db"))
+    monkeypatch.setattr(config, "caminho_colunar", str(tmp_path / "sorteios.bin"))
+    monkeypatch.setattr(config, "caminho_arquivo", None)
+    monkeypatch.setattr(config, "caminho_saude", str(tmp_path / "saude.json"))
+    monkeypatch.setattr(config, "caminho_metricas", str(tmp_path / "metricas.prom"))
+    monkeypatch.setattr(config, "caminho_resumo", str(tmp_path / "resumo.json"))
+    monkeypatch.setattr(config, "pipeline", False)
+    metricas.limpar()
+    return tmp_path
+
+
+@pytest.fixture
+def respostas(tmp_path):
+    """
+    Diretório com 30 sorteios sintéticos no formato da API.
+    """
+    diretorio = tmp_path / "respostas"
+    gerar_respostas(diretorio, 30)
+    return diretorio
+
+
+@pytest.fixture
+def servidor_stub(respostas):
+    """
+    Servidor stub da API servindo o diretório de respostas.
+    """
+    servidor, _ = iniciar_servidor(respostas)
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
@@ -0,0 +1,106 @@
+import http.client
+import json
+import threading
+from urllib.parse import urlsplit
+
+import pytest
+
+from ferramentas.servidor_stub import gerar_respostas
+from src.api_leitura import ServidorLeitura
+from src.coleta_http import LoteriasCaixaHttp
+from src.config import config
+from src.database import DbSorteios, criar_engine
+
+
+@pytest.fixture
+def sorteios(tmp_path):
+    """
+    Dicionários de 5 sorteios sintéticos no formato de DbSorteios.
+    """
+    diretorio = tmp_path / "respostas"
+    gerar_respostas(diretorio, 5)
+    conversor = LoteriasCaixaHttp()
+    return [
+        conversor.montar_dicionario(json.loads((diretorio / f"{nr}.json").read_text(encoding="utf-8")))
+        for nr in range(1, 6)
+    ]
+
+
+def gravar(dicionarios):
+    repository = DbSorteios(criar_engine(config.caminho_db), caminho_colunar=None)
+    for dicionario in dicionarios:
+        repository.adicionar(dicionario)
+    repository.descarregar()
+    repository.engine.dispose()
+
+
+class Api:
+    def __init__(self):
+        self.servidor = ServidorLeitura(
+            DbSorteios(criar_engine(config.caminho_db)), "127.0.0.1", 0, intervalo_recarga=3600
+        )
+        self.thread = threading.Thread(target=self.servidor.servir, daemon=True)
+        self.thread.start()
+        self.conexao = http.client.HTTPConnection(*urlsplit(self.servidor.url)[1].split(":"))
+
+    def get(self, caminho, **cabecalhos):
+        self.conexao.request("GET", caminho, headers=cabecalhos)
+        resposta = self.conexao.getresponse()
+        resposta.read()
+        return resposta.status, resposta.getheader("ETag"), resposta.getheader("Last-Modified")
+
+    def fechar(self):
+        self.conexao.close()
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+
+@pytest.fixture
+def abrir_api():
+    abertas = []
+
+    def abrir():
+        abertas.append(Api())
+        return abertas[-1]
+
+    yield abrir
+    for api in abertas:
+        api.fechar()
+
+
+def test_validadores_de_sorteio_sem_mudanca_sobrevivem_a_recarga(sorteios, abrir_api):
+    gravar(sorteios[:3])
+    api = abrir_api()
+    status, etag, modificado = api.get("/sorteios/1")
+    assert status == 200
+
+    gravar(sorteios[3:])
+    assert api.servidor.recarregar()
+    assert api.get("/sorteios/1") == (200, etag, modificado)
+    assert api.get("/sorteios/1", **{"If-None-Match": etag})[0] == 304
+    assert api.get("/sorteios/1", **{"If-Modified-Since": modificado})[0] == 304
+    assert api.get("/sorteios/5")[0] == 200
+
+
+def test_validadores_sobrevivem_ao_reinicio(sorteios, abrir_api):
+    gravar(sorteios)
+    status, etag, modificado = abrir_api().get("/sorteios/2")
+    assert status == 200
+
+    api = abrir_api()
+    assert api.get("/sorteios/2") == (200, etag, modificado)
+    assert api.get("/sorteios/2", **{"If-Modified-Since": modificado})[0] == 304
+
+
+def test_sorteio_alterado_muda_os_validadores(sorteios, abrir_api):
+    gravar(sorteios)
+    api = abrir_api()
+    _, etag, _ = api.get("/sorteios/2")
+    _, etag_lista, _ = api.get("/sorteios?inicio=1&fim=3")
+
+    gravar([dict(sorteios[1], local_do_sorteio="BRASÍLIA, DF")])
+    assert api.servidor.recarregar()
+    status, novo_etag, _ = api.get("/sorteios/2", **{"If-None-Match": etag})
+    assert status == 200 and novo_etag != etag
+    assert api.get("/sorteios?inicio=1&fim=3", **{"If-None-Match": etag_lista})[0] == 200
+    assert api.get("/sorteios/1", **{"If-None-Match": api.get("/sorteios/1")[1]})[0] == 304
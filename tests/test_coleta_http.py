@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+
+import requests
+
+from src.coleta_http import LoteriasCaixaHttp
+from src.config import config
+
+
+def ler_sorteios(coletor):
+    return {linha.nr_sorteio: linha for linha in coletor.obter_repositorio().read()}
+
+
+def test_coleta_todos_os_sorteios_do_stub(servidor_stub, respostas):
+    coletor = LoteriasCaixaHttp(url_api=servidor_stub.url_api, backoff=0)
+    coletor.coletar_dados()
+
+    sorteios = ler_sorteios(coletor)
+    assert sorted(sorteios) == list(range(1, 31))
+    dados = json.loads((respostas / "7.json").read_text(encoding="utf-8"))
+    assert sorteios[7].dezenas == ", ".join(dados["listaDezenas"])
+    assert sorteios[7].data_sorteio == dados["dataApuracao"]
+
+
+def test_segunda_coleta_nao_busca_nada(servidor_stub):
+    LoteriasCaixaHttp(url_api=servidor_stub.url_api, backoff=0).coletar_dados()
+
+    coletor = LoteriasCaixaHttp(url_api=servidor_stub.url_api, backoff=0)
+    assert coletor.coletar_intervalos_pendentes(30) == []
+
+
+def test_sorteio_ausente_vai_para_o_registro_de_falhas(servidor_stub, respostas):
+    (respostas / "7.json").unlink()
+    coletor = LoteriasCaixaHttp(url_api=servidor_stub.url_api, tentativas=2, backoff=0)
+    coletor.coletar_dados()
+
+    assert sorted(ler_sorteios(coletor)) == [nr for nr in range(1, 31) if nr != 7]
+    falhas = coletor.obter_repositorio().coletar_falhas()
+    assert [falha["nr_sorteio"] for falha in falhas] == [7]
+    # adiado pelo backoff: não volta na próxima coleta
+    assert coletor.coletar_intervalos_pendentes(30) == []
+
+
+def test_requisicoes_simultaneas_chegam_a_concorrencia(servidor_stub):
+    coletor = LoteriasCaixaHttp(url_api=servidor_stub.url_api, concorrencia=16, backoff=0)
+    buscar_json = coletor.buscar_json
+    trava = threading.Lock()
+    em_andamento = maximo = 0
+
+    def buscar_devagar(sessao, nr_sorteio=None):
+        nonlocal em_andamento, maximo
+        with trava:
+            em_andamento += 1
+            maximo = max(maximo, em_andamento)
+        try:
+            time.sleep(0.1)
+            return buscar_json(sessao, nr_sorteio)
+        finally:
+            with trava:
+                em_andamento -= 1
+
+    coletor.buscar_json = buscar_devagar
+    coletor.coletar_dados()
+
+    assert len(ler_sorteios(coletor)) == 30
+    assert maximo == 16
+
+
+def test_uma_sessao_por_thread_e_um_pool_por_coleta(servidor_stub, monkeypatch):
+    monkeypatch.setattr(config, "tamanho_lote", 5)
+    coletor = LoteriasCaixaHttp(url_api=servidor_stub.url_api, concorrencia=4, backoff=0)
+    criar_sessao = coletor.criar_sessao
+    sessoes_criadas = []
+    buscar_json = coletor.buscar_json
+    sessao_por_thread = {}
+
+    def criar_sessao_contando():
+        sessao = criar_sessao()
+        sessoes_criadas.append(sessao)
+        return sessao
+
+    def buscar_registrando(sessoes, nr_sorteio=None):
+        sessao = sessoes.atual()
+        assert sessao_por_thread.setdefault(threading.get_ident(), sessao) is sessao
+        return buscar_json(sessoes, nr_sorteio)
+
+    coletor.criar_sessao = criar_sessao_contando
+    coletor.buscar_json = buscar_registrando
+    coletor.coletar_dados()
+
+    assert len(ler_sorteios(coletor)) == 30
+    # seis lotes pelas mesmas quatro threads, cada uma com a sua sessão
+    assert len(sessoes_criadas) == len(sessao_por_thread) <= 4
+    assert len({id(sessao) for sessao in sessao_por_thread.values()}) == len(sessao_por_thread)
+
+
+def test_sorteio_mais_recente_com_novas_tentativas(servidor_stub):
+    coletor = LoteriasCaixaHttp(url_api=servidor_stub.url_api, backoff=0)
+    buscar_json = coletor.buscar_json
+    falhas = [requests.ConnectionError("conexão recusada")]
+
+    def buscar_falhando_uma_vez(sessao, nr_sorteio=None):
+        if nr_sorteio is None and falhas:
+            raise falhas.pop()
+        return buscar_json(sessao, nr_sorteio)
+
+    coletor.buscar_json = buscar_falhando_uma_vez
+    coletor.coletar_dados()
+
+    assert not falhas
+    assert len(ler_sorteios(coletor)) == 30
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+
+from src import colunar
+from src.colunar import ArquivoColunar, acrescentar_colunar, gravar_colunar
+
+
+def colunas_sinteticas(inicio, fim):
+    quantidade = fim - inicio + 1
+    nr_sorteios = np.arange(inicio, fim + 1)
+    dezenas = (np.arange(quantidade * 6).reshape(quantidade, 6) % 60 + 1).astype("u1")
+    return {
+        "premios": np.full((quantidade, 3), 10.5),
+        "dezenas_bitmask": np.bitwise_or.reduce(np.uint64(1) << (dezenas.astype(np.uint64) - np.uint64(1)), axis=1),
+        "nr_sorteio": nr_sorteios,
+        "data_ordinal": 729000 + nr_sorteios,
+        "ganhadores": np.ones((quantidade, 3), dtype=int),
+        "mega_da_virada": np.zeros(quantidade, dtype=bool),
+        "dezenas": dezenas,
+    }
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    caminho = tmp_path / "sorteios.bin"
+    gravar_colunar(caminho, colunas_sinteticas(1, 10))
+    return caminho
+
+
+def test_acrescenta_no_lugar_sem_afetar_leitores_abertos(caminho):
+    estado = os.stat(caminho)
+    with ArquivoColunar(caminho) as leitor:
+        assert acrescentar_colunar(caminho, colunas_sinteticas(11, 15))
+
+        # mesmo arquivo, do mesmo tamanho: só as linhas novas e o cabeçalho foram gravados
+        assert (os.stat(caminho).st_ino, os.stat(caminho).st_size) == (estado.st_ino, estado.st_size)
+        assert leitor.quantidade == 10
+        assert leitor.nr_sorteio.tolist() == list(range(1, 11))
+        assert leitor.desatualizado()
+
+    with ArquivoColunar(caminho) as leitor:
+        assert leitor.nr_sorteio.tolist() == list(range(1, 16))
+        assert (leitor.dezenas[10:] == colunas_sinteticas(11, 15)["dezenas"]).all()
+        assert not leitor.desatualizado()
+
+
+def test_capacidade_esgotada_regrava_com_o_dobro(caminho):
+    capacidade = colunar.ler_cabecalho(caminho.read_bytes())[1]
+    assert acrescentar_colunar(caminho, colunas_sinteticas(11, capacidade + 5))
+
+    with ArquivoColunar(caminho) as leitor:
+        assert leitor.nr_sorteio.tolist() == list(range(1, capacidade + 6))
+        assert (leitor.premios == 10.5).all()
+    assert colunar.ler_cabecalho(caminho.read_bytes())[1] >= 2 * (capacidade + 5)
+
+
+def test_linhas_fora_de_ordem_pedem_regravacao(caminho, tmp_path):
+    assert not acrescentar_colunar(caminho, colunas_sinteticas(5, 12))
+    assert not acrescentar_colunar(tmp_path / "inexistente.bin", colunas_sinteticas(1, 2))
+    with ArquivoColunar(caminho) as leitor:
+        assert leitor.quantidade == 10
@@ -0,0 +1,147 @@
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+
+from ferramentas.relogio_falso import RelogioFalso
+from ferramentas.servidor_stub import publicar_sorteio
+from src.coleta_de_dados import LoteriasCaixa
+from src.coleta_http import LoteriasCaixaHttp
+from src.config import config
+from src.daemon import DaemonSorteios, verificar_saude
+from src.database import DbSorteios, criar_engine
+
+BRASILIA = timezone(timedelta(hours=-3))
+
+
+def momento(dia, hora, minuto=0):
+    return datetime(2024, 5, dia, hora, minuto, tzinfo=BRASILIA)
+
+
+class ColetorFalso(LoteriasCaixa):
+    """
+    Coletor do navegador que lê os sorteios da pasta do servidor stub em vez da página.
+    """
+
+    def __init__(self, pasta):
+        super().__init__()
+        self.pasta = pasta
+        self.falhas_acesso = 0
+        self.conversor = LoteriasCaixaHttp()
+
+    def abrir_navegador(self):
+        return object()
+
+    def fechar_navegador(self, driver):
+        pass
+
+    def acessar_site_loterias_caixa(self, driver):
+        if self.falhas_acesso:
+            self.falhas_acesso -= 1
+            raise WebDriverException("sessão caiu")
+
+    def esperar_sorteio(self, driver, condicao, timer=60):
+        return max(int(caminho.stem) for caminho in self.pasta.glob("*.json"))
+
+    def coletar_intervalos(self, driver, intervalos):
+        for inicio, fim in intervalos:
+            for nr_sorteio in range(inicio, fim + 1):
+                dados = json.loads((self.pasta / f"{nr_sorteio}.json").read_text(encoding="utf-8"))
+                self.inserir_no_db(self.conversor.montar_dicionario(dados))
+        self.obter_repositorio().descarregar()
+        return driver
+
+
+class RelogioVerificandoSaude(RelogioFalso):
+    """
+    Relógio falso que confere o arquivo de saúde ao fim de cada dormida, como uma sonda.
+    """
+
+    def __init__(self, inicio):
+        super().__init__(inicio)
+        self.verificacoes = []
+
+    def dormir(self, segundos, interromper=None):
+        super().dormir(segundos, interromper)
+        self.verificacoes.append(verificar_saude(config.caminho_saude, agora=self.atual.timestamp()))
+
+
+def contador(nome, **rotulos):
+    """
+    Lê um contador do arquivo do Prometheus exportado pelo daemon (0 se a série não existe).
+    """
+    rotulos = sorted({"jogo": "megasena", **rotulos}.items())
+    serie = f"loterias_{nome}_total{{" + ",".join(f'{chave}="{valor}"' for chave, valor in rotulos) + "}"
+    for linha in Path(config.caminho_metricas).read_text(encoding="utf-8").splitlines():
+        if linha.startswith(f"{serie} "):
+            return float(linha.split()[-1])
+    return 0
+
+
+def numeros_gravados(coletor):
+    return sorted(linha.nr_sorteio for linha in coletor.obter_repositorio().read())
+
+
+def test_coleta_o_sorteio_publicado_na_janela(respostas):
+    relogio = RelogioFalso(momento(6, 12))  # segunda-feira
+    relogio.agendar(momento(7, 20, 27), lambda: publicar_sorteio(respostas, 31, "07/05/2024"))
+    daemon = DaemonSorteios(ColetorFalso(respostas), relogio=relogio)
+    daemon.executar(ate=momento(8, 12))
+
+    assert numeros_gravados(daemon.coletor) == list(range(1, 32))
+    assert daemon.atendido == momento(7, 20)
+    assert daemon.ultimo_sorteio == 31
+    assert contador("sorteios_publicados") == 1
+    assert contador("sorteios_nao_publicados") == 0
+    # publicado 27 min após o sorteio, antes do atraso esperado de config
+    assert daemon.atraso_publicacao < config.atraso_publicacao
+    assert contador("consultas_daemon", resultado="erro") == 0
+
+
+def test_recupera_da_queda_do_navegador(respostas):
+    relogio = RelogioFalso(momento(7, 19))
+    coletor = ColetorFalso(respostas)
+    relogio.agendar(momento(7, 20, 5), lambda: setattr(coletor, "falhas_acesso", 2))
+    relogio.agendar(momento(7, 20, 41), lambda: publicar_sorteio(respostas, 31, "07/05/2024"))
+    daemon = DaemonSorteios(coletor, relogio=relogio)
+    daemon.executar(ate=momento(8, 1))
+
+    assert numeros_gravados(coletor) == list(range(1, 32))
+    assert contador("consultas_daemon", resultado="erro") == 2
+    assert daemon.erros_seguidos == 0
+    assert contador("sorteios_nao_publicados") == 0
+
+
+def test_janela_sem_publicacao_mantem_o_batimento(respostas):
+    relogio = RelogioVerificandoSaude(momento(11, 19))  # sábado
+    daemon = DaemonSorteios(ColetorFalso(respostas), relogio=relogio)
+    daemon.executar(ate=momento(12, 1))
+
+    assert contador("sorteios_nao_publicados") == 1
+    assert daemon.atendido == momento(11, 20)
+    assert max(relogio.dormidas) <= config.intervalo_batimento
+    assert relogio.verificacoes
+    assert all(saudavel for saudavel, _ in relogio.verificacoes), relogio.verificacoes
+
+
+def test_sorteio_gravado_por_outro_processo(respostas):
+    relogio = RelogioFalso(momento(7, 19))
+    daemon = DaemonSorteios(ColetorFalso(respostas), relogio=relogio)
+
+    def gravar_em_outra_conexao():
+        # popula o cache de leitura do daemon antes da gravação externa
+        numeros_gravados(daemon.coletor)
+        dados = json.loads((respostas / "30.json").read_text(encoding="utf-8"))
+        dados.update(numero=31, dataApuracao="07/05/2024")
+        outro = DbSorteios(criar_engine(config.caminho_db))
+        outro.adicionar(LoteriasCaixaHttp().montar_dicionario(dados))
+        outro.descarregar()
+        outro.engine.dispose()
+
+    relogio.agendar(momento(7, 20, 27), gravar_em_outra_conexao)
+    daemon.executar(ate=momento(8, 1))
+
+    assert daemon.atendido == momento(7, 20)
+    assert contador("sorteios_publicados") == 1
+    assert contador("sorteios_nao_publicados") == 0
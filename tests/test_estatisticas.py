@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.estatisticas import EstatisticasSorteios
+
+DEZENAS = [
+    [4, 5, 30, 33, 41, 52],
+    [9, 37, 39, 41, 43, 49],
+    [10, 11, 29, 30, 36, 47],
+    [1, 5, 6, 27, 42, 59],
+]
+
+
+@pytest.fixture
+def estatisticas():
+    return EstatisticasSorteios(np.arange(1, len(DEZENAS) + 1), DEZENAS)
+
+
+def test_frequencias_janela(estatisticas):
+    frequencias = estatisticas.frequencias_janela(2)
+    assert frequencias.sum() == 12
+    assert frequencias[30 - 1] == 1
+    assert frequencias[41 - 1] == 0
+    assert (estatisticas.frequencias_janela(4) == estatisticas.frequencias()).all()
+
+
+@pytest.mark.parametrize("tamanho", [0, -1, 5])
+def test_janela_fora_do_historico(estatisticas, tamanho):
+    with pytest.raises(ValueError):
+        estatisticas.frequencias_janela(tamanho)
+    with pytest.raises(ValueError):
+        estatisticas.frequencias_moveis(tamanho)
+
+
+def test_frequencias_moveis(estatisticas):
+    moveis = estatisticas.frequencias_moveis(3)
+    assert moveis.shape == (2, 60)
+    assert (moveis[-1] == estatisticas.frequencias_janela(3)).all()
+
+
+@pytest.mark.parametrize("dezena", [0, 61, 256, -1])
+def test_dezena_fora_da_faixa(estatisticas, dezena):
+    with pytest.raises(ValueError):
+        estatisticas.adicionar([5], [[dezena, 2, 3, 4, 5, 6]])
+    assert estatisticas.quantidade == 4
+    assert estatisticas.frequencias().sum() == 24
+
+
+def test_adicionar_exige_uma_linha_por_sorteio(estatisticas):
+    with pytest.raises(ValueError):
+        estatisticas.adicionar([5, 6], [DEZENAS[0]])
@@ -0,0 +1,13 @@
+from src.coleta_http import LoteriasCaixaHttp
+from src.metricas import metricas
+
+
+def test_series_com_prefixo_comum_e_rotulo_do_jogo(servidor_stub):
+    LoteriasCaixaHttp(url_api=servidor_stub.url_api, backoff=0, jogo="quina").coletar_dados()
+
+    texto = metricas.texto_prometheus()
+    series = [linha for linha in texto.splitlines() if not linha.startswith("#")]
+    assert series
+    assert all(linha.startswith("loterias_") for linha in series)
+    assert all('jogo="quina"' in linha for linha in series)
+    assert 'loterias_linhas_gravadas_total{jogo="quina"} 30' in series
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import extracao, reparse
+from src.arquivo import ArquivoSorteios
+from src.coleta_de_dados import LoteriasCaixa
+from src.config import config
+from src.database import DbSorteios, criar_engine
+from src.pipeline import PipelineSorteios
+
+
+def campos_pagina(nr_sorteio, texto_cinco="5 acertos\n1 aposta ganhadora, R$ 54.321,09"):
+    return {
+        "numero_do_sorteio": [f"Concurso {nr_sorteio} (11/03/1996)"],
+        "dezenas": ["04", "05", "30", "33", "41", "52"],
+        "local": ["Sorteio realizado no ESPAÇO DA SORTE em SÃO PAULO, SP"],
+        "seis_acertos": ["6 acertos\nNão houve ganhadores"],
+        "cinco_acertos": [texto_cinco],
+        "quatro_acertos": ["4 acertos\n12.345 apostas ganhadoras, R$ 1.234,56"],
+    }
+
+
+# página com um formato novo do prêmio, que o parser atual não entende
+TEXTO_NOVO = "5 acertos\n1 aposta ganhadora, R$ 54.321,09 cada"
+
+
+tratar_texto_acertos = extracao.tratar_texto_acertos
+
+
+def tratar_texto_acertos_corrigido(texto):
+    return tratar_texto_acertos(texto.removesuffix(" cada"))
+
+
+def premios_cinco(caminho_db):
+    repository = DbSorteios(criar_engine(caminho_db))
+    return {linha.nr_sorteio: linha.premio_cinco_dezenas for linha in repository.read()}
+
+
+def test_pagina_nao_interpretada_pelo_pipeline_e_recuperada_pelo_reparse(tmp_path, monkeypatch):
+    arquivo = ArquivoSorteios(tmp_path / "arquivo")
+    repository = DbSorteios(criar_engine(config.caminho_db))
+    with PipelineSorteios(repository, arquivo=arquivo, intervalo_gravacao=0.01) as pipeline:
+        pipeline.enviar(campos_pagina(1))
+        pipeline.enviar(campos_pagina(2, TEXTO_NOVO))
+
+    assert [nr_sorteio for nr_sorteio, _ in pipeline.falhas] == [2]
+    assert [nr_sorteio for nr_sorteio, _ in arquivo.listar()] == [1, 2]
+    assert premios_cinco(config.caminho_db) == {1: 54321.09}
+
+    # os processos do reparse não veriam a correção feita pelo monkeypatch
+    monkeypatch.setattr(reparse, "ProcessPoolExecutor", ThreadPoolExecutor)
+    assert [nr_sorteio for nr_sorteio, _ in reparse.reparsear(arquivo.raiz, processos=1)] == [2]
+
+    monkeypatch.setattr(extracao, "tratar_texto_acertos", tratar_texto_acertos_corrigido)
+    assert reparse.reparsear(arquivo.raiz, processos=1) == []
+    assert premios_cinco(config.caminho_db) == {1: 54321.09, 2: 54321.09}
+
+
+class DriverFalso:
+    def __init__(self, campos):
+        self.campos = campos
+
+    def execute_script(self, script, *argumentos):
+        return self.campos
+
+
+class LoteriasCaixaSemElementos(LoteriasCaixa):
+    def coletar_campos_por_elemento(self, driver):
+        return driver.campos
+
+
+def test_coletar_valores_arquiva_a_pagina_antes_de_interpretar(tmp_path):
+    loterias = LoteriasCaixaSemElementos()
+    loterias.arquivo = ArquivoSorteios(tmp_path / "arquivo")
+
+    with pytest.raises(ValueError):
+        loterias.coletar_valores(DriverFalso(campos_pagina(3, TEXTO_NOVO)))
+
+    assert loterias.arquivo.carregar(3) == campos_pagina(3, TEXTO_NOVO)